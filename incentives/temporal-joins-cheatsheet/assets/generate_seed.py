@@ -7,20 +7,80 @@
 Creates a seed.sql file with ~200-300 events across 5 heroes over 7 days,
 demonstrating all temporal join patterns with concurrent activities.
 
+The defaults reproduce the published seed.sql byte for byte. Scale mode
+generates load-test data: every hero gets its own seeded RNG stream, so the
+output is identical whatever the number of worker processes. Events are
+streamed: workers spill sorted runs and a k-way merge writes them out, so
+memory stays flat however many events are generated.
+
 Usage:
     uv run generate_seed.py
     # or
     chmod +x generate_seed.py && ./generate_seed.py
+
+    # ~10M events across 20k heroes over a month, on 8 cores
+    uv run generate_seed.py --streams per-hero --heroes 20000 \
+        --start 2025-06-01 --end 2025-06-30 --events-per-hero 500 \
+        --workers 8 -o /tmp/seed_10m.sql.gz
+
+    # Columnar output loads in seconds instead of minutes (needs pyarrow)
+    uv run --with pyarrow generate_seed.py --format parquet
+
+    # 100M-row datasets: heroes advanced in vectorized lockstep blocks,
+    # with the simulator invariants checked on the way out
+    uv run --with numpy --with pyarrow generate_seed.py --engine numpy \
+        --heroes 500000 --events-per-hero 200 --workers 8 --format parquet --validate
+
+    # Nightly growth: save every hero's state, then extend the same output by
+    # another week, simulating and writing only the new events
+    uv run generate_seed.py --streams per-hero --heroes 20000 --events-per-hero 100000 \
+        --format csv -o /tmp/seed.csv --checkpoint /tmp/seed.ckpt
+    uv run generate_seed.py --resume /tmp/seed.ckpt --end 2025-06-14
+
+    # One file per day and entity bucket plus a manifest, loaded into
+    # DuckDB concurrently by load_shards.py (only the shards a query needs)
+    uv run generate_seed.py --streams per-hero --heroes 20000 --end 2025-06-30 --events-per-hero 500 \
+        --workers 8 --format parquet --partition-by-day --entity-buckets 16 -o /tmp/seed_shards
+    uv run load_shards.py /tmp/seed_shards --db /tmp/realm.duckdb --from 2025-06-10 --to 2025-06-12
+
+    # Activity Schema occurrence columns: first-ever and last-before lookups
+    # become plain filters (see occurrence_patterns.sql)
+    uv run generate_seed.py --streams per-hero --heroes 20000 --events-per-hero 500 \
+        --occurrence-columns --format csv -o /tmp/seed_occ.csv
+
+    # Where the time goes: per-phase events/s, per-action simulator cost,
+    # peak RSS, plus folded stacks for a flame graph (or .prof for cProfile)
+    uv run generate_seed.py --streams per-hero --heroes 5000 --profile --profile-dump /tmp/seed.folded
 """
 
+import argparse
+import bisect
+import csv
+import gzip
+import heapq
 import json
+import os
+import pickle
 import random
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from operator import itemgetter
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import BinaryIO, Iterable, Iterator, TextIO
 
 # Seed for reproducibility
-random.seed(42)
+DEFAULT_SEED = 42
 
 # === FANTASY REALM CONSTANTS ===
 
@@ -32,6 +92,17 @@ HEROES = [
     {"id": "hero_005", "name": "Elara Nightbloom", "class": "Ranger"},
 ]
 
+# Building blocks for heroes beyond the five named ones (scale mode)
+HERO_CLASSES = ["Rogue", "Warrior", "Mage", "Paladin", "Ranger"]
+HERO_FIRST_NAMES = [
+    "Aldric", "Brynn", "Celeste", "Doran", "Elara", "Fenwick", "Garrick", "Hilda",
+    "Isolde", "Jorund", "Kael", "Lyra", "Merek", "Nessa", "Orin", "Petra",
+]
+HERO_EPITHETS = [
+    "the Bold", "the Wise", "Ashborn", "Stormrider", "the Quiet", "Flamecrest",
+    "the Wanderer", "Frostvale", "Duskblade", "the Unbroken", "Oakheart", "Silvertongue",
+]
+
 QUESTS = [
     {"id": "quest_goblin", "name": "Clear the Goblin Camp", "difficulty": "easy", "duration_min": 30, "duration_max": 60, "reward_gold": (50, 100), "xp": (100, 200)},
     {"id": "quest_artifact", "name": "Retrieve the Lost Artifact", "difficulty": "medium", "duration_min": 60, "duration_max": 120, "reward_gold": (150, 300), "xp": (300, 500)},
@@ -94,304 +165,2140 @@ SKILLS = [
 START_DATE = datetime(2025, 6, 1, 6, 0, 0)  # Start at 6 AM
 END_DATE = datetime(2025, 6, 7, 23, 59, 59)
 
+# Target ~50-60 events per hero (250-300 total)
+MAX_EVENTS_PER_HERO = 60
+
+# Rows per event batch: the unit of spilling, merging and writing
+BATCH_ROWS = 65_536
+
+# Events per simulated shard; bounds worker memory whatever the total size
+SHARD_EVENTS = 1_000_000
+
+# Events the shared stream buffers before spilling them as a sorted run
+SPILL_EVENTS = 4 * BATCH_ROWS
+# Rows per batch in runs that will be merged: the merge holds one batch per run
+MERGE_BATCH_ROWS = 4_096
+
+# Bump when the layout of checkpoint records changes
+CHECKPOINT_VERSION = 1
+
+# Activity Schema columns added by --occurrence-columns, after `features`,
+# with their DuckDB types
+OCCURRENCE_COLUMNS = {"activity_occurrence": "INTEGER", "activity_repeated_at": "TIMESTAMP"}
+NO_REPEAT = -1  # activity_repeated_at of an entity's latest occurrence of an activity (NULL)
+
+# DuckDB snippet that loads each output format into activity_stream;
+# `{columns}` is where the occurrence columns go, `{types}` their CSV types
+LOAD_SNIPPETS = {
+    "sql": ".read {path}",
+    "parquet": (
+        "CREATE TABLE activity_stream AS\n"
+        "SELECT ts, activity, entity, features::JSON AS features{columns}\n"
+        "FROM read_parquet('{path}');"
+    ),
+    "arrow": (
+        "INSTALL nanoarrow FROM community;\n"
+        "LOAD nanoarrow;\n"
+        "CREATE TABLE activity_stream AS\n"
+        "SELECT ts, activity, entity, features::JSON AS features{columns}\n"
+        "FROM read_arrow('{path}');"
+    ),
+    "csv": (
+        "CREATE TABLE activity_stream AS\n"
+        "SELECT ts, activity, entity, features::JSON AS features{columns}\n"
+        "FROM read_csv('{path}', header = true, columns = {{\n"
+        "    'ts': 'TIMESTAMP', 'activity': 'VARCHAR', 'entity': 'VARCHAR', 'features': 'VARCHAR'{types}\n"
+        "}});"
+    ),
+}
+
+
+def load_snippet(fmt: str, path: Path, occurrences: bool = False) -> str:
+    columns = "".join(f", {name}" for name in OCCURRENCE_COLUMNS) if occurrences else ""
+    types = "".join(f", '{name}': '{kind}'" for name, kind in OCCURRENCE_COLUMNS.items()) if occurrences else ""
+    return LOAD_SNIPPETS[fmt].format(path=path, columns=columns, types=types)
+
+# === EVENT STORAGE ===
+
+# Feature keys of every activity, in the order they appear in the JSON
+ACTIVITY_FEATURES = {
+    "quest_accepted": ("quest_id", "quest_name", "difficulty"),
+    "quest_completed": ("quest_id", "reward_gold", "xp_gained"),
+    "item_pickup": ("item_id", "item_name", "item_rarity"),
+    "level_up": ("new_level", "class"),
+    "battle_start": ("enemy_type", "location"),
+    "battle_end": ("outcome", "damage_taken"),
+    "dungeon_enter": ("dungeon_name", "dungeon_tier"),
+    "dungeon_exit": ("loot_count", "time_spent_minutes"),
+    "skill_learned": ("skill_name", "skill_type"),
+    "party_join": ("party_id", "party_size"),
+}
+ACTIVITIES = list(ACTIVITY_FEATURES)
+ACTIVITY_CODES = {activity: code for code, activity in enumerate(ACTIVITIES)}
+
+# String-valued features draw from fixed vocabularies and are stored as codes;
+# every other feature is an integer column. Being static, the codes agree
+# across worker processes.
+FEATURE_VOCABULARIES = {
+    "quest_id": [q["id"] for q in QUESTS],
+    "quest_name": [q["name"] for q in QUESTS],
+    "difficulty": list(dict.fromkeys(q["difficulty"] for q in QUESTS)),
+    "item_id": [i["id"] for i in ITEMS],
+    "item_name": [i["name"] for i in ITEMS],
+    "item_rarity": list(dict.fromkeys(i["rarity"] for i in ITEMS)),
+    "class": HERO_CLASSES,
+    "enemy_type": [e["type"] for e in ENEMIES],
+    "location": list(dict.fromkeys(loc for e in ENEMIES for loc in e["locations"])),
+    "outcome": ["victory", "retreat"],
+    "dungeon_name": [d["name"] for d in DUNGEONS],
+    "skill_name": [s["name"] for s in SKILLS],
+    "skill_type": list(dict.fromkeys(s["type"] for s in SKILLS)),
+    "party_id": [f"party_{n}" for n in range(100, 1000)],
+}
+FEATURE_CODES = {key: {value: code for code, value in enumerate(vocab)} for key, vocab in FEATURE_VOCABULARIES.items()}
+
+# Pre-rendered '"key":value' JSON fragments, per activity and feature position.
+# A dict maps codes of string features; None marks an integer feature.
+JSON_FRAGMENTS = [
+    [
+        [f"{json.dumps(key)}:{json.dumps(value)}" for value in FEATURE_VOCABULARIES[key]]
+        if key in FEATURE_VOCABULARIES else None
+        for key in keys
+    ]
+    for keys in ACTIVITY_FEATURES.values()
+]
+JSON_KEYS = [[json.dumps(key) + ":" for key in keys] for keys in ACTIVITY_FEATURES.values()]
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(ts: datetime) -> int:
+    return (ts - EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+@lru_cache(maxsize=4096)
+def format_ts(seconds: int) -> str:
+    return from_epoch(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class EventBatch:
+    """Columnar, append-only storage for events.
+
+    `ts` holds epoch seconds, `activity` codes into ACTIVITIES and `entity`
+    codes into the hero roster. Features live in one table per activity with
+    a typed column per key (int64 values or uint16 vocabulary codes); `row`
+    points each event at its row in its activity's table. That is ~30 bytes
+    per event instead of a dataclass, a datetime and a dict.
+
+    With --occurrence-columns, `occurrence` and `repeated_at` (epoch seconds,
+    NO_REPEAT for none) run alongside; otherwise they stay empty.
+    """
+
+    __slots__ = ("ts", "activity", "entity", "row", "features", "occurrence", "repeated_at")
+
+    def __init__(self):
+        self.ts = array("q")
+        self.activity = array("B")
+        self.entity = array("I")
+        self.row = array("I")
+        self.features = [
+            [array("H" if key in FEATURE_VOCABULARIES else "q") for key in keys]
+            for keys in ACTIVITY_FEATURES.values()
+        ]
+        self.occurrence = array("i")
+        self.repeated_at = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def append(self, ts: int, activity: int, entity: int, values: tuple[int, ...]):
+        columns = self.features[activity]
+        self.ts.append(ts)
+        self.activity.append(activity)
+        self.entity.append(entity)
+        self.row.append(len(columns[0]))
+        for column, value in zip(columns, values):
+            column.append(value)
+
+    def values(self, i: int) -> tuple[int, ...]:
+        row = self.row[i]
+        return tuple(column[row] for column in self.features[self.activity[i]])
+
+    def append_from(self, other: "EventBatch", i: int):
+        self.append(other.ts[i], other.activity[i], other.entity[i], other.values(i))
+        if other.occurrence:
+            self.occurrence.append(other.occurrence[i])
+            self.repeated_at.append(other.repeated_at[i])
+
+    def number_occurrences(self, lo: int, hi: int):
+        """Fill the occurrence columns of rows [lo, hi): one entity's journey, in time order.
+
+        A single pass: each row counts its activity, and sets the previous
+        occurrence's repeated_at to its own timestamp. Rows before `lo` must
+        be numbered already.
+        """
+        counts = [0] * len(ACTIVITIES)
+        latest = [-1] * len(ACTIVITIES)
+        ts, activity = self.ts, self.activity
+        occurrence, repeated_at = self.occurrence, self.repeated_at
+        for i in range(lo, hi):
+            code = activity[i]
+            counts[code] += 1
+            occurrence.append(counts[code])
+            repeated_at.append(NO_REPEAT)
+            if latest[code] >= 0:
+                repeated_at[latest[code]] = ts[i]
+            latest[code] = i
+
+    def features_json(self, i: int) -> str:
+        """Features of event `i` exactly as json.dumps(..., separators=(",", ":")) renders them."""
+        activity = self.activity[i]
+        row = self.row[i]
+        parts = []
+        for column, fragments, key in zip(self.features[activity], JSON_FRAGMENTS[activity], JSON_KEYS[activity]):
+            value = column[row]
+            parts.append(fragments[value] if fragments else f"{key}{value}")
+        return "{" + ",".join(parts) + "}"
+
+    def feature_dict(self, i: int) -> dict:
+        activity = self.activity[i]
+        return {
+            key: FEATURE_VOCABULARIES[key][value] if key in FEATURE_VOCABULARIES else value
+            for key, value in zip(ACTIVITY_FEATURES[ACTIVITIES[activity]], self.values(i))
+        }
+
+    def event(self, i: int, entities: list[str]) -> tuple[datetime, str, str, dict]:
+        """Event `i` decoded to (ts, activity, entity, features)."""
+        return from_epoch(self.ts[i]), ACTIVITIES[self.activity[i]], entities[self.entity[i]], self.feature_dict(i)
+
+    def nbytes(self) -> int:
+        columns = [
+            self.ts, self.activity, self.entity, self.row, self.occurrence, self.repeated_at,
+            *(c for cols in self.features for c in cols),
+        ]
+        return sum(c.buffer_info()[1] * c.itemsize for c in columns)
+
+
+@dataclass
+class RunStats:
+    """Summary of a sorted run of events, known before the run is written out."""
+
+    count: int = 0
+    first_ts: datetime | None = None
+    last_ts: datetime | None = None
+    activity_counts: dict = field(default_factory=dict)
+    profile: "Profile | None" = None  # How the run was produced, with --profile
+
+    def add(self, batch: EventBatch):
+        """Count a batch; batches arrive in time order."""
+        if not batch:
+            return
+        self.count += len(batch)
+        if self.first_ts is None:
+            self.first_ts = from_epoch(batch.ts[0])
+        self.last_ts = from_epoch(batch.ts[-1])
+        for code, n in Counter(batch.activity).items():
+            activity = ACTIVITIES[code]
+            self.activity_counts[activity] = self.activity_counts.get(activity, 0) + n
+
+    def merge(self, other: "RunStats"):
+        if other.profile is not None:
+            if self.profile is None:
+                self.profile = Profile()
+            self.profile.merge(other.profile)
+        if not other.count:
+            return
+        self.first_ts = other.first_ts if self.first_ts is None else min(self.first_ts, other.first_ts)
+        self.last_ts = other.last_ts if self.last_ts is None else max(self.last_ts, other.last_ts)
+        self.count += other.count
+        for activity, n in other.activity_counts.items():
+            self.activity_counts[activity] = self.activity_counts.get(activity, 0) + n
+
+
+# === PROFILING ===
+
+# Phases in pipeline order; simulate and spill run in the workers
+PROFILE_PHASES = ("simulate", "spill", "merge", "validate", "partition", "serialize", "write")
+IDLE = -1  # Simulator steps where no action was possible
+_END = object()
+
 
 @dataclass
-class Event:
-    ts: datetime
-    activity: str
-    entity: str
-    features: dict
+class Profile:
+    """Where generation time goes (--profile).
+
+    Phases are timed exclusively: serialize pulls rows out of merge, and is
+    not charged for the merging. Simulator steps are charged to the action
+    they picked, split into deciding (candidate mask and weighted draw) and
+    executing the branch, time step included.
+    """
+
+    phases: dict = field(default_factory=dict)  # phase -> [seconds, events]
+    actions: dict = field(default_factory=dict)  # action code or IDLE -> [steps, decide s, execute s]
+    open: list = field(default_factory=list)  # Seconds spent in nested phases, per open phase
+
+    def charge(self, phase: str, started: float):
+        elapsed = time.perf_counter() - started
+        self.phases.setdefault(phase, [0.0, 0])[0] += elapsed - self.open.pop()
+        if self.open:
+            self.open[-1] += elapsed
+
+    def count(self, phase: str, events: int):
+        self.phases.setdefault(phase, [0.0, 0])[1] += events
+
+    @contextmanager
+    def phase(self, phase: str):
+        self.open.append(0.0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.charge(phase, started)
+
+    def timed(self, phase: str, items: Iterable, events=len) -> Iterator:
+        """Yield `items`, charging the time spent producing them to `phase`."""
+        items = iter(items)
+        while True:
+            self.open.append(0.0)
+            started = time.perf_counter()
+            try:
+                item = next(items, _END)
+            finally:
+                self.charge(phase, started)
+            if item is _END:
+                return
+            self.count(phase, events(item))
+            yield item
+
+    def step(self, action: int, started: float, decided: float, done: float):
+        totals = self.actions.setdefault(action, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += decided - started
+        totals[2] += done - decided
+
+    def merge(self, other: "Profile"):
+        for phase, (seconds, events) in other.phases.items():
+            totals = self.phases.setdefault(phase, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += events
+        for action, (steps, decide, execute) in other.actions.items():
+            totals = self.actions.setdefault(action, [0, 0.0, 0.0])
+            totals[0] += steps
+            totals[1] += decide
+            totals[2] += execute
+
+    def report(self, wall: float, workers: int):
+        print("\nProfile:")
+        print(f"  {'phase':<10} {'seconds':>9} {'events':>12} {'events/s':>12}")
+        for phase in PROFILE_PHASES:
+            if phase in self.phases:
+                seconds, events = self.phases[phase]
+                rate = f"{events / seconds:>12,.0f}" if seconds > 0 else f"{'-':>12}"
+                print(f"  {phase:<10} {seconds:>9.2f} {events:>12,} {rate}")
+        note = f" (simulate and spill are summed over {workers} workers)" if workers > 1 else ""
+        print(f"  {'wall':<10} {wall:>9.2f}{note}")
+        main_rss, worker_rss = peak_rss()
+        if main_rss is not None:
+            workers_note = f", largest worker {worker_rss / 2**20:.1f} MB" if workers > 1 and worker_rss else ""
+            print(f"  peak RSS: {main_rss / 2**20:.1f} MB{workers_note}")
+
+        if not self.actions:
+            return  # The NumPy engine has no per-action branches
+        total = sum(decide + execute for _, decide, execute in self.actions.values())
+        print("\n  Simulator steps by action:")
+        print(f"  {'action':<16} {'steps':>10} {'decide us':>10} {'execute us':>11} {'seconds':>9} {'share':>7}")
+        rows = sorted(self.actions.items(), key=lambda item: -(item[1][1] + item[1][2]))
+        for action, (steps, decide, execute) in rows:
+            name = "(idle)" if action == IDLE else ACTIVITIES[action]
+            print(
+                f"  {name:<16} {steps:>10,} {decide / steps * 1e6:>10.2f} {execute / steps * 1e6:>11.2f} "
+                f"{decide + execute:>9.2f} {(decide + execute) / total:>7.1%}"
+            )
+
+
+def profiled(profile: Profile | None, phase: str):
+    """Time a block as `phase` when profiling."""
+    return profile.phase(phase) if profile is not None else nullcontext()
+
+
+def peak_rss() -> tuple[int | None, int | None]:
+    """Peak resident set size in bytes of this process and of its largest finished worker."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    )
+
+
+class StackSampler:
+    """Samples the main thread's Python stack, for flame graphs.
+
+    Writes the folded format (`outer;inner;leaf count` per line) read by
+    flamegraph.pl, inferno and speedscope. Only this process is sampled.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.counts = Counter()
+        self.thread_id = threading.main_thread().ident
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path: Path):
+        with open(path, "w") as f:
+            for stack, n in sorted(self.counts.items()):
+                f.write(f"{stack} {n}\n")
+
+
+@contextmanager
+def profile_dump(path: Path | None):
+    """Dump cProfile stats (a .prof path) or sampled folded stacks (any other path) of the block."""
+    if path is None:
+        yield
+        return
+    if path.suffix == ".prof":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+        print(f"cProfile stats written to {path} (python -m pstats {path}, or snakeviz)")
+    else:
+        sampler = StackSampler()
+        sampler.thread.start()
+        try:
+            yield
+        finally:
+            sampler.stopped.set()
+            sampler.thread.join()
+            sampler.write(path)
+        print(f"Folded stacks written to {path} ({sum(sampler.counts.values())} samples; flamegraph.pl or speedscope)")
+
+
+# === COMPILED WORLD MODEL ===
+
+QUEST_ACCEPTED, QUEST_COMPLETED, ITEM_PICKUP, LEVEL_UP, BATTLE_START, BATTLE_END, \
+    DUNGEON_ENTER, DUNGEON_EXIT, SKILL_LEARNED, PARTY_JOIN = (ACTIVITY_CODES[a] for a in ACTIVITIES)
+
+# Candidate actions in the order the simulator considers them; a bit per action
+ACTION_ORDER = (
+    ITEM_PICKUP, QUEST_ACCEPTED, QUEST_COMPLETED, DUNGEON_ENTER, DUNGEON_EXIT,
+    BATTLE_START, BATTLE_END, LEVEL_UP, SKILL_LEARNED, PARTY_JOIN,
+)
+ACTION_BITS = {action: 1 << i for i, action in enumerate(ACTION_ORDER)}
+
+OUTCOMES = ("victory", "victory", "victory", "victory", "retreat")  # 80% win
+
+# Enemy difficulties that can show up in a dungeon of each tier
+TIER_DIFFICULTIES = {1: ("easy",), 2: ("easy", "medium"), 3: ("medium", "hard"), 4: ("hard", "legendary")}
+
+
+def action_weight(action: int, no_active_quests: bool, in_dungeon: bool) -> int:
+    """Weight actions based on game logic."""
+    if action == QUEST_ACCEPTED:
+        return 3 if no_active_quests else 1
+    if action == BATTLE_START:
+        return 4 if in_dungeon else 2
+    return {
+        QUEST_COMPLETED: 5,
+        ITEM_PICKUP: 2,
+        BATTLE_END: 8,
+        DUNGEON_ENTER: 2,
+        DUNGEON_EXIT: 4,
+    }.get(action, 1)
+
+
+@dataclass(frozen=True)
+class World:
+    """Lookup tables compiled once from the realm constants.
+
+    Everything is indexed by position in the constant lists, which is also
+    the vocabulary code of the matching feature (quest i has quest_id code i).
+    """
+
+    quest_difficulty: tuple[int, ...]  # quest -> difficulty code
+    quest_gold: tuple[tuple[int, int], ...]
+    quest_xp: tuple[tuple[int, int], ...]
+    item_rarity: tuple[int, ...]  # item -> item_rarity code
+    enemy_locations: tuple[tuple[int, ...], ...]  # enemy -> location codes
+    wild_enemies: tuple[int, ...]  # enemies met outside dungeons
+    dungeon_enemies: tuple[tuple[int, ...], ...]  # dungeon -> enemies met inside
+    dungeon_loot: tuple[tuple[int, int], ...]
+    dungeon_tier: tuple[int, ...]
+    skill_type: tuple[int, ...]  # skill -> skill_type code
+    class_skills: dict  # class name -> skills, in SKILLS order
+    class_code: dict  # class name -> class code
+    outcome_code: dict  # battle outcome -> outcome code
+    # (action mask, no active quests, in dungeon) -> (actions, cumulative weights)
+    action_table: dict
+
+
+def compile_world() -> World:
+    codes = FEATURE_CODES
+    tier_enemies = {
+        tier: tuple(i for i, e in enumerate(ENEMIES) if e["difficulty"] in difficulties)
+        for tier, difficulties in TIER_DIFFICULTIES.items()
+    }
+
+    def enemies_for_tier(tier: int) -> tuple[int, ...]:
+        pool = tier_enemies[min(max(tier, 1), 4)]
+        return pool or tuple(range(len(ENEMIES)))
+
+    action_table = {}
+    for mask in range(1 << len(ACTION_ORDER)):
+        actions = tuple(a for a in ACTION_ORDER if mask & ACTION_BITS[a])
+        for no_active_quests in (False, True):
+            for in_dungeon in (False, True):
+                weights = [action_weight(a, no_active_quests, in_dungeon) for a in actions]
+                action_table[mask, no_active_quests, in_dungeon] = (actions, list(accumulate(weights)))
+
+    return World(
+        quest_difficulty=tuple(codes["difficulty"][q["difficulty"]] for q in QUESTS),
+        quest_gold=tuple(q["reward_gold"] for q in QUESTS),
+        quest_xp=tuple(q["xp"] for q in QUESTS),
+        item_rarity=tuple(codes["item_rarity"][i["rarity"]] for i in ITEMS),
+        enemy_locations=tuple(tuple(codes["location"][loc] for loc in e["locations"]) for e in ENEMIES),
+        wild_enemies=tier_enemies[2],
+        dungeon_enemies=tuple(enemies_for_tier(d["tier"]) for d in DUNGEONS),
+        dungeon_loot=tuple((d["loot_min"], d["loot_max"]) for d in DUNGEONS),
+        dungeon_tier=tuple(d["tier"] for d in DUNGEONS),
+        skill_type=tuple(codes["skill_type"][s["type"]] for s in SKILLS),
+        class_skills={c: tuple(i for i, s in enumerate(SKILLS) if s["class"] == c) for c in HERO_CLASSES},
+        class_code={c: codes["class"][c] for c in HERO_CLASSES},
+        outcome_code=codes["outcome"],
+        action_table=action_table,
+    )
+
 
-    def to_sql(self) -> str:
-        ts_str = self.ts.strftime("%Y-%m-%d %H:%M:%S")
-        features_json = json.dumps(self.features, separators=(",", ":"))
-        # Escape single quotes in JSON
-        features_json = features_json.replace("'", "''")
-        return f"('{ts_str}', '{self.activity}', '{self.entity}', '{features_json}')"
+WORLD = compile_world()
 
 
 @dataclass
 class HeroState:
     hero: dict
-    current_time: datetime
+    current_time: int  # epoch seconds
     level: int = 1
-    active_quests: dict = field(default_factory=dict)  # quest_id -> start_time
-    in_dungeon: dict | None = None  # dungeon info + enter_time
-    in_battle: dict | None = None  # battle info + start_time
-    party_id: str | None = None
+    active_quests: dict = field(default_factory=dict)  # quest -> start time
+    in_dungeon: tuple[int, int] | None = None  # (dungeon, enter time)
+    in_battle: int | None = None  # battle start time
+    party_id: int | None = None  # party_id code
     learned_skills: set = field(default_factory=set)
-    events: list = field(default_factory=list)
-
-    def add_event(self, activity: str, features: dict, time_offset_minutes: int = 0):
-        self.current_time += timedelta(minutes=time_offset_minutes)
-        self.events.append(Event(
-            ts=self.current_time,
-            activity=activity,
-            entity=self.hero["id"],
-            features=features
-        ))
-
-
-def generate_hero_journey(hero: dict) -> list[Event]:
-    """Generate a realistic sequence of events for a single hero."""
-    state = HeroState(
+    events: EventBatch = field(default_factory=EventBatch)
+    entity: int = 0  # roster index, the hero's entity code in `events`
+    event_count: int = 0
+    available_quests: list = field(default_factory=list)  # Completed quests drop out, for variety
+    unlearned: list = field(default_factory=list)  # Class skills not learned yet, in SKILLS order
+
+    def add_event(self, activity: int, values: tuple[int, ...], time_offset_minutes: int = 0):
+        """Record an activity; `values` are its typed feature column values."""
+        self.current_time += time_offset_minutes * 60
+        self.events.append(self.current_time, activity, self.entity, values)
+        self.event_count += 1
+
+    def snapshot(self, rng: random.Random, pending: list) -> tuple:
+        """The checkpoint record of this hero: enough to continue the journey exactly.
+
+        `pending` holds the (ts, activity, values) events already simulated
+        past the end of the window. The RNG's Mersenne Twister words are packed
+        as uint32, ~2.5 KB of the ~2.6 KB a record takes.
+        """
+        version, words, gauss_next = rng.getstate()
+        return (
+            self.current_time, self.level, tuple(self.active_quests.items()), self.in_dungeon, self.in_battle,
+            self.party_id, tuple(sorted(self.learned_skills)), self.event_count,
+            tuple(self.available_quests), tuple(self.unlearned),
+            version, array("I", words).tobytes(), gauss_next, pending,
+        )
+
+    @classmethod
+    def restore(cls, hero: dict, entity: int, record: tuple, events: EventBatch) -> tuple["HeroState", random.Random, list]:
+        """Inverse of snapshot(): the hero's state, its RNG and its pending events."""
+        (current_time, level, active_quests, in_dungeon, in_battle, party_id, learned_skills, event_count,
+         available_quests, unlearned, version, words, gauss_next, pending) = record
+        rng = random.Random()
+        rng.setstate((version, tuple(array("I", words)), gauss_next))
+        state = cls(
+            hero=hero, current_time=current_time, level=level, active_quests=dict(active_quests),
+            in_dungeon=in_dungeon, in_battle=in_battle, party_id=party_id, learned_skills=set(learned_skills),
+            events=events, entity=entity, event_count=event_count,
+            available_quests=list(available_quests), unlearned=list(unlearned),
+        )
+        return state, rng, pending
+
+
+def build_roster(count: int) -> list[dict]:
+    """Return `count` heroes: the five named ones first, then generated ones."""
+    roster = HEROES[:count]
+    for i in range(len(roster), count):
+        first = HERO_FIRST_NAMES[i % len(HERO_FIRST_NAMES)]
+        epithet = HERO_EPITHETS[(i // len(HERO_FIRST_NAMES)) % len(HERO_EPITHETS)]
+        roster.append({
+            "id": f"hero_{i + 1:03d}",
+            "name": f"{first} {epithet}",
+            "class": HERO_CLASSES[i % len(HERO_CLASSES)],
+        })
+    return roster
+
+
+def hero_rng(seed: int, hero: dict) -> random.Random:
+    """Independent RNG stream for one hero, derived from the run seed."""
+    return random.Random(f"{seed}:{hero['id']}")
+
+
+def new_hero_state(hero: dict, rng: random.Random, start: datetime, events: EventBatch, entity: int) -> HeroState:
+    """A hero setting out at a random hour in the first few after `start`."""
+    return HeroState(
         hero=hero,
-        current_time=START_DATE + timedelta(hours=random.randint(0, 4)),
-        level=random.randint(1, 3),
+        current_time=to_epoch(start) + rng.randint(0, 4) * 3600,
+        level=rng.randint(1, 3),
+        events=events,
+        entity=entity,
+        available_quests=list(range(len(QUESTS))),
+        unlearned=list(WORLD.class_skills[hero["class"]]),
     )
 
-    # Track available quests (remove completed ones)
-    available_quests = QUESTS.copy()
 
-    # Target ~50-60 events per hero (250-300 total)
-    max_events_per_hero = 60
+def generate_hero_journey(
+    hero: dict,
+    rng: random.Random,
+    start: datetime = START_DATE,
+    end: datetime = END_DATE,
+    max_events: int = MAX_EVENTS_PER_HERO,
+    events: EventBatch | None = None,
+    entity: int = 0,
+    profile: Profile | None = None,
+    state: HeroState | None = None,
+) -> EventBatch:
+    """Generate a realistic sequence of events for a single hero.
+
+    Events are appended, in time order, to `events` (a new batch if omitted)
+    under entity code `entity`; the batch is returned. Clocks are epoch
+    seconds and the per-step lookups come from the compiled WORLD tables.
+    With a `profile`, every step is timed and charged to its action. A
+    `state` (from new_hero_state() or a checkpoint) continues that journey
+    instead, into its own batch, and is left where the journey stopped.
+    """
+    world = WORLD
+    if state is None:
+        state = new_hero_state(hero, rng, start, events if events is not None else EventBatch(), entity)
+    end_time = to_epoch(end)
+    class_code = world.class_code[hero["class"]]
+    action_table = world.action_table
+    available_quests = state.available_quests
+    unlearned = state.unlearned
+    clock = time.perf_counter
+
+    while state.current_time < end_time and state.event_count < max_events:
+        if profile is not None:
+            started = clock()
+        now = state.current_time
+        in_battle = state.in_battle is not None
+        in_dungeon = state.in_dungeon is not None
 
-    while state.current_time < END_DATE and len(state.events) < max_events_per_hero:
         # Determine what actions are possible
-        actions = []
+        mask = 0
 
         # Can always pick up items (if not in battle)
-        if not state.in_battle:
-            actions.append("item_pickup")
+        if not in_battle:
+            mask |= ACTION_BITS[ITEM_PICKUP]
 
         # Can start a new quest if not maxed out (max 2 concurrent)
-        if len(state.active_quests) < 2 and available_quests and not state.in_battle:
-            actions.append("quest_accepted")
+        if len(state.active_quests) < 2 and available_quests and not in_battle:
+            mask |= ACTION_BITS[QUEST_ACCEPTED]
 
-        # Can complete quest if one is ready
-        ready_quests = [
-            qid for qid, start in state.active_quests.items()
-            if (state.current_time - start).total_seconds() / 60 >= 20
-        ]
+        # Can complete quest if one is ready (at most two are active)
+        ready_quests = [q for q, started in state.active_quests.items() if now - started >= 20 * 60]
         if ready_quests:
-            actions.append("quest_completed")
+            mask |= ACTION_BITS[QUEST_COMPLETED]
 
         # Can enter dungeon if not already in one and not in battle
-        if not state.in_dungeon and not state.in_battle:
-            actions.append("dungeon_enter")
+        if not in_dungeon and not in_battle:
+            mask |= ACTION_BITS[DUNGEON_ENTER]
 
         # Can exit dungeon if in one
-        if state.in_dungeon:
-            time_in = (state.current_time - state.in_dungeon["enter_time"]).total_seconds() / 60
-            if time_in >= 15:
-                actions.append("dungeon_exit")
-
-        # Can start battle if not in one
-        if not state.in_battle:
-            actions.append("battle_start")
+        if in_dungeon and now - state.in_dungeon[1] >= 15 * 60:
+            mask |= ACTION_BITS[DUNGEON_EXIT]
 
-        # Can end battle if in one
-        if state.in_battle:
-            time_in = (state.current_time - state.in_battle["start_time"]).total_seconds() / 60
-            if time_in >= 2:
-                actions.append("battle_end")
+        # Can start battle if not in one, end it if in one
+        if not in_battle:
+            mask |= ACTION_BITS[BATTLE_START]
+        elif now - state.in_battle >= 2 * 60:
+            mask |= ACTION_BITS[BATTLE_END]
 
         # Can level up occasionally
-        if random.random() < 0.05:
-            actions.append("level_up")
+        if rng.random() < 0.05:
+            mask |= ACTION_BITS[LEVEL_UP]
 
         # Can learn skill if leveled up enough
-        hero_skills = [s for s in SKILLS if s["class"] == hero["class"]]
-        unlearned = [s for s in hero_skills if s["id"] not in state.learned_skills]
-        if unlearned and state.level >= 2 and random.random() < 0.1:
-            actions.append("skill_learned")
+        if unlearned and state.level >= 2 and rng.random() < 0.1:
+            mask |= ACTION_BITS[SKILL_LEARNED]
 
         # Can join party occasionally
-        if not state.party_id and random.random() < 0.03:
-            actions.append("party_join")
-
-        if not actions:
-            state.current_time += timedelta(minutes=random.randint(5, 15))
+        if state.party_id is None and rng.random() < 0.03:
+            mask |= ACTION_BITS[PARTY_JOIN]
+
+        if not mask:
+            state.current_time += rng.randint(5, 15) * 60
+            if profile is not None:
+                decided = clock()
+                profile.step(IDLE, started, decided, decided)
             continue
 
-        # Weight actions based on game logic
-        weights = {
-            "quest_accepted": 3 if len(state.active_quests) == 0 else 1,
-            "quest_completed": 5 if ready_quests else 0,
-            "item_pickup": 2,
-            "level_up": 1,
-            "battle_start": 4 if state.in_dungeon else 2,
-            "battle_end": 8 if state.in_battle else 0,
-            "dungeon_enter": 2,
-            "dungeon_exit": 4 if state.in_dungeon else 0,
-            "skill_learned": 1,
-            "party_join": 1,
-        }
-
-        action_weights = [weights.get(a, 1) for a in actions]
-        action = random.choices(actions, weights=action_weights, k=1)[0]
+        actions, cum_weights = action_table[mask, not state.active_quests, in_dungeon]
+        action = rng.choices(actions, cum_weights=cum_weights, k=1)[0]
+        if profile is not None:
+            decided = clock()
 
         # Execute action
-        if action == "quest_accepted":
-            quest = random.choice(available_quests)
-            state.active_quests[quest["id"]] = state.current_time
-            state.add_event("quest_accepted", {
-                "quest_id": quest["id"],
-                "quest_name": quest["name"],
-                "difficulty": quest["difficulty"],
-            }, time_offset_minutes=random.randint(1, 10))
-
-        elif action == "quest_completed":
-            quest_id = random.choice(ready_quests)
-            quest = next(q for q in QUESTS if q["id"] == quest_id)
-            del state.active_quests[quest_id]
+        if action == QUEST_ACCEPTED:
+            quest = rng.choice(available_quests)
+            state.active_quests[quest] = now
+            state.add_event(QUEST_ACCEPTED, (quest, quest, world.quest_difficulty[quest]),
+                            time_offset_minutes=rng.randint(1, 10))
+
+        elif action == QUEST_COMPLETED:
+            quest = rng.choice(ready_quests)
+            del state.active_quests[quest]
             # Remove from available to add variety
             if quest in available_quests and len(available_quests) > 2:
                 available_quests.remove(quest)
-            state.add_event("quest_completed", {
-                "quest_id": quest["id"],
-                "reward_gold": random.randint(*quest["reward_gold"]),
-                "xp_gained": random.randint(*quest["xp"]),
-            }, time_offset_minutes=random.randint(5, 30))
-
-        elif action == "item_pickup":
-            item = random.choice(ITEMS)
-            state.add_event("item_pickup", {
-                "item_id": item["id"],
-                "item_name": item["name"],
-                "item_rarity": item["rarity"],
-            }, time_offset_minutes=random.randint(1, 5))
-
-        elif action == "level_up":
+            gold = rng.randint(*world.quest_gold[quest])
+            xp = rng.randint(*world.quest_xp[quest])
+            state.add_event(QUEST_COMPLETED, (quest, gold, xp), time_offset_minutes=rng.randint(5, 30))
+
+        elif action == ITEM_PICKUP:
+            item = rng.randrange(len(ITEMS))
+            state.add_event(ITEM_PICKUP, (item, item, world.item_rarity[item]),
+                            time_offset_minutes=rng.randint(1, 5))
+
+        elif action == LEVEL_UP:
             state.level += 1
-            state.add_event("level_up", {
-                "new_level": state.level,
-                "class": hero["class"],
-            }, time_offset_minutes=random.randint(1, 3))
+            state.add_event(LEVEL_UP, (state.level, class_code), time_offset_minutes=rng.randint(1, 3))
 
-        elif action == "battle_start":
+        elif action == BATTLE_START:
             # Choose enemy based on dungeon tier or random
-            if state.in_dungeon:
-                tier = state.in_dungeon["tier"]
-                suitable = [e for e in ENEMIES if
-                    (tier <= 1 and e["difficulty"] == "easy") or
-                    (tier == 2 and e["difficulty"] in ["easy", "medium"]) or
-                    (tier == 3 and e["difficulty"] in ["medium", "hard"]) or
-                    (tier >= 4 and e["difficulty"] in ["hard", "legendary"])]
-                enemy = random.choice(suitable) if suitable else random.choice(ENEMIES)
+            if in_dungeon:
+                enemy = rng.choice(world.dungeon_enemies[state.in_dungeon[0]])
             else:
-                enemy = random.choice([e for e in ENEMIES if e["difficulty"] in ["easy", "medium"]])
-            location = random.choice(enemy["locations"])
-            state.in_battle = {"enemy": enemy, "location": location, "start_time": state.current_time}
-            state.add_event("battle_start", {
-                "enemy_type": enemy["type"],
-                "location": location,
-            }, time_offset_minutes=random.randint(1, 5))
-
-        elif action == "battle_end":
-            outcomes = ["victory", "victory", "victory", "victory", "retreat"]  # 80% win
-            outcome = random.choice(outcomes)
-            damage = random.randint(5, 50) if outcome == "victory" else random.randint(30, 80)
-            state.add_event("battle_end", {
-                "outcome": outcome,
-                "damage_taken": damage,
-            }, time_offset_minutes=random.randint(2, 8))
+                enemy = rng.choice(world.wild_enemies)
+            location = rng.choice(world.enemy_locations[enemy])
+            state.in_battle = now
+            state.add_event(BATTLE_START, (enemy, location), time_offset_minutes=rng.randint(1, 5))
+
+        elif action == BATTLE_END:
+            outcome = rng.choice(OUTCOMES)
+            damage = rng.randint(5, 50) if outcome == "victory" else rng.randint(30, 80)
+            state.add_event(BATTLE_END, (world.outcome_code[outcome], damage), time_offset_minutes=rng.randint(2, 8))
             state.in_battle = None
 
-        elif action == "dungeon_enter":
-            dungeon = random.choice(DUNGEONS)
-            state.in_dungeon = {**dungeon, "enter_time": state.current_time}
-            state.add_event("dungeon_enter", {
-                "dungeon_name": dungeon["name"],
-                "dungeon_tier": dungeon["tier"],
-            }, time_offset_minutes=random.randint(5, 20))
-
-        elif action == "dungeon_exit":
-            time_spent = int((state.current_time - state.in_dungeon["enter_time"]).total_seconds() / 60)
-            loot = random.randint(state.in_dungeon["loot_min"], state.in_dungeon["loot_max"])
-            state.add_event("dungeon_exit", {
-                "loot_count": loot,
-                "time_spent_minutes": time_spent,
-            }, time_offset_minutes=random.randint(2, 10))
+        elif action == DUNGEON_ENTER:
+            dungeon = rng.randrange(len(DUNGEONS))
+            state.in_dungeon = (dungeon, now)
+            state.add_event(DUNGEON_ENTER, (dungeon, world.dungeon_tier[dungeon]),
+                            time_offset_minutes=rng.randint(5, 20))
+
+        elif action == DUNGEON_EXIT:
+            dungeon, entered = state.in_dungeon
+            time_spent = (now - entered) // 60
+            loot = rng.randint(*world.dungeon_loot[dungeon])
+            state.add_event(DUNGEON_EXIT, (loot, time_spent), time_offset_minutes=rng.randint(2, 10))
             state.in_dungeon = None
 
-        elif action == "skill_learned":
-            skill = random.choice(unlearned)
-            state.learned_skills.add(skill["id"])
-            state.add_event("skill_learned", {
-                "skill_name": skill["name"],
-                "skill_type": skill["type"],
-            }, time_offset_minutes=random.randint(1, 3))
-
-        elif action == "party_join":
-            party_id = f"party_{random.randint(100, 999)}"
-            state.party_id = party_id
-            state.add_event("party_join", {
-                "party_id": party_id,
-                "party_size": random.randint(2, 5),
-            }, time_offset_minutes=random.randint(5, 15))
+        elif action == SKILL_LEARNED:
+            skill = rng.choice(unlearned)
+            unlearned.remove(skill)
+            state.learned_skills.add(skill)
+            state.add_event(SKILL_LEARNED, (skill, world.skill_type[skill]), time_offset_minutes=rng.randint(1, 3))
+
+        elif action == PARTY_JOIN:
+            state.party_id = rng.randint(100, 999) - 100
+            state.add_event(PARTY_JOIN, (state.party_id, rng.randint(2, 5)), time_offset_minutes=rng.randint(5, 15))
 
         # Random time progression
-        state.current_time += timedelta(minutes=random.randint(5, 30))
+        state.current_time += rng.randint(5, 30) * 60
 
         # Day/night cycle - heroes rest at night (less activity)
-        if state.current_time.hour >= 23 or state.current_time.hour < 6:
-            state.current_time += timedelta(hours=random.randint(4, 8))
+        hour = state.current_time // 3600 % 24
+        if hour >= 23 or hour < 6:
+            state.current_time += rng.randint(4, 8) * 3600
+
+        if profile is not None:
+            profile.step(action, started, decided, clock())
 
     return state.events
 
 
-def generate_all_events() -> list[Event]:
-    """Generate events for all heroes."""
-    all_events = []
-    for hero in HEROES:
-        events = generate_hero_journey(hero)
-        all_events.extend(events)
-        print(f"Generated {len(events)} events for {hero['name']}")
-
-    # Sort by timestamp
-    all_events.sort(key=lambda e: e.ts)
-    return all_events
-
-
-def write_sql(events: list[Event], output_path: Path):
-    """Write events to SQL seed file."""
-    with open(output_path, "w") as f:
-        f.write("-- Fantasy Realm Activity Stream\n")
-        f.write("-- Generated for Activity Schema temporal join demos\n")
-        f.write(f"-- Total events: {len(events)}\n")
-        f.write(f"-- Date range: {events[0].ts.date()} to {events[-1].ts.date()}\n")
-        f.write("-- Heroes: " + ", ".join(h["name"] for h in HEROES) + "\n")
-        f.write("\n")
-
-        f.write("CREATE TABLE IF NOT EXISTS activity_stream (\n")
-        f.write("    ts TIMESTAMP,\n")
-        f.write("    activity VARCHAR,\n")
-        f.write("    entity VARCHAR,\n")
-        f.write("    features JSON\n")
-        f.write(");\n\n")
+@dataclass(frozen=True)
+class SeedConfig:
+    """What to simulate: roster size, time window, RNG scheme, parallelism, profiling and extra columns."""
+
+    heroes: int = len(HEROES)
+    start: datetime = START_DATE
+    end: datetime = END_DATE
+    events_per_hero: int = MAX_EVENTS_PER_HERO
+    seed: int = DEFAULT_SEED
+    streams: str = "shared"  # "shared" (published seed.sql) or "per-hero"
+    workers: int = 1
+    engine: str = "python"  # "python" or "numpy"
+    profile: bool = False  # Return a Profile with each run's RunStats
+    checkpoint: bool = False  # Hold back events after `end` and save every hero's state
+    occurrences: bool = False  # Number each hero's activities as they are generated (OCCURRENCE_COLUMNS)
+
+
+def sorted_rows(events: EventBatch, bounds: list[int], end: int | None = None) -> Iterator[int]:
+    """Row indices of `events` in time order, leaving out those after `end`.
+
+    `bounds` delimits the heroes' journeys, each already in time order, so a
+    k-way merge of the ranges is enough; ties keep roster order, exactly as a
+    stable sort of the concatenated journeys would.
+    """
+    ranges = [range(lo, hi if end is None else window_cut(events, lo, hi, end)) for lo, hi in zip(bounds, bounds[1:])]
+    return heapq.merge(*ranges, key=events.ts.__getitem__)
+
+
+def window_cut(events: EventBatch, lo: int, hi: int, end: int) -> int:
+    """First row of the journey in [lo, hi) that falls after `end`."""
+    return bisect.bisect_right(events.ts, end, lo, hi)
+
+
+def write_run(events: EventBatch, rows: Iterable[int], run_path: Path, size: int = BATCH_ROWS) -> RunStats:
+    """Spill `rows` of `events` to a run file as pickled batches of `size` rows."""
+    stats = RunStats()
+    with open(run_path, "wb") as f:
+        for batch in rebatch(((events, i) for i in rows), size):
+            stats.add(batch)
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return stats
+
+
+def rebatch(rows: Iterable[tuple[EventBatch, int]], size: int = BATCH_ROWS) -> Iterator[EventBatch]:
+    """Copy (batch, index) rows into fresh batches of up to `size` rows."""
+    out = EventBatch()
+    for batch, i in rows:
+        out.append_from(batch, i)
+        if len(out) == size:
+            yield out
+            out = EventBatch()
+    if out:
+        yield out
+
+
+def simulate_shard(
+    config: SeedConfig, heroes: list[tuple[int, dict]], run_path: Path, resume: dict | None = None
+) -> RunStats:
+    """Simulate a contiguous slice of the roster with per-hero RNG streams.
+
+    Runs inside a worker process. `heroes` pairs each hero with its roster
+    index, which is its entity code. Heroes with a checkpoint record in
+    `resume` (by entity) continue from it; with config.checkpoint the
+    shard's records are saved next to the run (checkpoint_part()).
+    """
+    profile = Profile() if config.profile else None
+    events = EventBatch()
+    bounds = [0]
+    journeys = []  # (state, rng) per hero
+    with profiled(profile, "simulate"):
+        for entity, hero in heroes:
+            record = resume.get(entity) if resume else None
+            if record is None:
+                rng = hero_rng(config.seed, hero)
+                state = new_hero_state(hero, rng, config.start, events, entity)
+            else:
+                state, rng, pending = HeroState.restore(hero, entity, record, events)
+                for ts, activity, values in pending:
+                    events.append(ts, activity, entity, values)
+            generate_hero_journey(
+                hero, rng, config.start, config.end, config.events_per_hero, profile=profile, state=state,
+            )
+            bounds.append(len(events))
+            if config.occurrences:
+                events.number_occurrences(bounds[-2], bounds[-1])
+            journeys.append((state, rng))
+    end = to_epoch(config.end) if config.checkpoint else None
+    with profiled(profile, "spill"):
+        stats = write_run(events, sorted_rows(events, bounds, end), run_path)
+    if config.checkpoint:
+        records = []
+        for (state, rng), lo, hi in zip(journeys, bounds, bounds[1:]):
+            pending = [(events.ts[i], events.activity[i], events.values(i)) for i in range(window_cut(events, lo, hi, end), hi)]
+            records.append((state.entity, state.snapshot(rng, pending)))
+        with open(checkpoint_part(run_path), "wb") as f:
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+    if profile is not None:
+        profile.count("simulate", len(events))
+        profile.count("spill", len(events))
+    stats.profile = profile
+    return stats
+
+
+def shard_roster(roster: list[dict], workers: int, events_per_hero: int) -> list[list[tuple[int, dict]]]:
+    """Split the roster into contiguous slices: a few per worker, at most SHARD_EVENTS each."""
+    per_shard = max(1, SHARD_EVENTS // events_per_hero)
+    shards = max(1, min(len(roster), workers * 4), -(-len(roster) // per_shard))
+    size = -(-len(roster) // shards)
+    indexed = list(enumerate(roster))
+    return [indexed[i:i + size] for i in range(0, len(indexed), size)]
+
+
+def run_shards(simulate, config: SeedConfig, shards: list, run_paths: list[Path], *extra: list) -> list[RunStats]:
+    """Run `simulate` over the shards, in a process pool when there are several workers.
+
+    `extra` are further per-shard argument lists.
+    """
+    if config.workers == 1:
+        return [simulate(config, *args) for args in zip(shards, run_paths, *extra)]
+    with ProcessPoolExecutor(max_workers=config.workers) as pool:
+        return list(pool.map(simulate, [config] * len(shards), shards, run_paths, *extra))
+
+
+def generate_runs(config: SeedConfig, spill_dir: Path, resume: list | None = None) -> tuple[list[Path], RunStats]:
+    """Simulate all heroes into sorted run files; return them with combined stats.
+
+    `resume` holds checkpoint records by entity; heroes beyond it are new
+    and set out at config.start.
+    """
+    roster = build_roster(config.heroes)
+
+    if config.engine == "numpy":
+        # Lockstep blocks of a fixed size, one per shard: independent of the worker count
+        size = numpy_block_heroes(config.events_per_hero)
+        indexed = list(enumerate(roster))
+        shards = [indexed[i:i + size] for i in range(0, len(indexed), size)]
+        run_paths = [spill_dir / f"run_{i:04d}.pkl" for i in range(len(shards))]
+        run_stats = run_shards(simulate_shard_numpy, config, shards, run_paths)
+        print(f"Simulated {len(roster)} heroes in {len(shards)} NumPy blocks on {config.workers} worker(s)")
+    elif config.streams == "shared":
+        # One stream consumed hero after hero: reproduces the published seed.sql.
+        # Consecutive heroes are spilled as a run every SPILL_EVENTS events, so
+        # memory stays flat; the merge keeps ties in run (= roster) order.
+        profile = Profile() if config.profile else None
+        rng = random.Random(config.seed)
+        run_paths, run_stats = [], []
+        events = EventBatch()
+        bounds = [0]
+
+        def spill(last: bool):
+            # A lone run is read back as it is written; merged ones in small batches
+            size = BATCH_ROWS if last and not run_paths else MERGE_BATCH_ROWS
+            run_paths.append(spill_dir / f"run_{len(run_paths):04d}.pkl")
+            with profiled(profile, "spill"):
+                run_stats.append(write_run(events, sorted_rows(events, bounds), run_paths[-1], size))
+            if profile is not None:
+                profile.count("simulate", len(events))
+                profile.count("spill", len(events))
+
+        for entity, hero in enumerate(roster):
+            with profiled(profile, "simulate"):
+                generate_hero_journey(
+                    hero, rng, config.start, config.end, config.events_per_hero,
+                    events=events, entity=entity, profile=profile,
+                )
+            bounds.append(len(events))
+            if config.occurrences:
+                events.number_occurrences(bounds[-2], bounds[-1])
+            print(f"Generated {bounds[-1] - bounds[-2]} events for {hero['name']}")
+            if len(events) >= SPILL_EVENTS:
+                spill(last=entity == len(roster) - 1)
+                events = EventBatch()
+                bounds = [0]
+        if events or not run_paths:
+            spill(last=True)
+        run_stats[0].profile = profile
+    else:
+        shards = shard_roster(roster, config.workers, config.events_per_hero)
+        run_paths = [spill_dir / f"run_{i:04d}.pkl" for i in range(len(shards))]
+        resumes = [
+            {entity: resume[entity] for entity, _ in shard if entity < len(resume)} if resume else None
+            for shard in shards
+        ]
+        run_stats = run_shards(simulate_shard, config, shards, run_paths, resumes)
+        print(f"Simulated {len(roster)} heroes in {len(shards)} shards on {config.workers} worker(s)")
+
+    stats = RunStats()
+    for run in run_stats:
+        stats.merge(run)
+    return run_paths, stats
+
+
+def read_run(run_path: Path) -> Iterator[EventBatch]:
+    with open(run_path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def merge_runs(run_paths: list[Path]) -> Iterator[EventBatch]:
+    """K-way merge of sorted run files on `ts`; ties keep run (= roster) order."""
+    if len(run_paths) == 1:
+        yield from read_run(run_paths[0])
+        return
+
+    def rows(run_path: Path) -> Iterator[tuple[int, EventBatch, int]]:
+        for batch in read_run(run_path):
+            ts = batch.ts
+            for i in range(len(batch)):
+                yield ts[i], batch, i
+
+    merged = heapq.merge(*(rows(path) for path in run_paths), key=itemgetter(0))
+    yield from rebatch((batch, i) for _, batch, i in merged)
+
+
+def open_output(output_path: Path, append: bool = False) -> TextIO:
+    """Open the output for writing text, compressed according to its suffix (.gz, .zst).
+
+    Appending to a compressed file adds a new gzip member / zstd frame;
+    readers decompress them as one stream.
+    """
+    mode = "at" if append else "wt"
+    if output_path.suffix == ".gz":
+        return gzip.open(output_path, mode, compresslevel=6)
+    if output_path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            sys.exit("zstd output needs the zstandard package: uv run --with zstandard generate_seed.py ...")
+        return zstandard.open(output_path, mode)
+    return open(output_path, mode)
+
+
+def hero_summary(heroes: list[dict]) -> str:
+    if len(heroes) <= len(HEROES):
+        return ", ".join(h["name"] for h in heroes)
+    return f"{len(heroes)} ({heroes[0]['id']} .. {heroes[-1]['id']})"
+
+
+def iter_rows(batches: Iterable[EventBatch], heroes: list[dict], occurrences: bool = False) -> Iterator[tuple]:
+    """Render events as (ts, activity, entity, features JSON) strings.
+
+    With `occurrences`, rows go on with the occurrence count and the
+    rendered repeated_at timestamp (None for an entity's latest occurrence).
+    """
+    entities = [h["id"] for h in heroes]
+    for batch in batches:
+        if not occurrences:
+            for i in range(len(batch)):
+                yield format_ts(batch.ts[i]), ACTIVITIES[batch.activity[i]], entities[batch.entity[i]], batch.features_json(i)
+            continue
+        for i in range(len(batch)):
+            repeated_at = batch.repeated_at[i]
+            yield (
+                format_ts(batch.ts[i]), ACTIVITIES[batch.activity[i]], entities[batch.entity[i]], batch.features_json(i),
+                batch.occurrence[i], None if repeated_at == NO_REPEAT else format_ts(repeated_at),
+            )
+
+
+def serialized(profile: Profile | None, items: Iterator, events) -> Iterator:
+    """Charge rendering rows (or record batches) to the serialize phase when profiling."""
+    return profile.timed("serialize", items, events) if profile is not None else items
+
+
+def write_sql(
+    batches: Iterable[EventBatch], stats: RunStats, output_path: Path, heroes: list[dict] = HEROES,
+    profile: Profile | None = None, append: bool = False, occurrences: bool = False,
+):
+    """Write events to SQL seed file, streaming batches as they are merged.
+
+    With `append`, the events go into one more INSERT at the end of an
+    existing file; with `occurrences`, the table has the OCCURRENCE_COLUMNS.
+    """
+    with open_output(output_path, append) as f:
+        if append:
+            f.write(f"\n-- Appended {stats.count} events: {stats.first_ts} to {stats.last_ts}\n")
+        else:
+            f.write("-- Fantasy Realm Activity Stream\n")
+            f.write("-- Generated for Activity Schema temporal join demos\n")
+            f.write(f"-- Total events: {stats.count}\n")
+            f.write(f"-- Date range: {stats.first_ts.date()} to {stats.last_ts.date()}\n")
+            f.write(f"-- Heroes: {hero_summary(heroes)}\n")
+            f.write("\n")
+
+            f.write("CREATE TABLE IF NOT EXISTS activity_stream (\n")
+            f.write("    ts TIMESTAMP,\n")
+            f.write("    activity VARCHAR,\n")
+            f.write("    entity VARCHAR,\n")
+            if occurrences:
+                f.write("    features JSON,\n")
+                f.write(",\n".join(f"    {name} {kind}" for name, kind in OCCURRENCE_COLUMNS.items()) + "\n")
+            else:
+                f.write("    features JSON\n")
+            f.write(");\n\n")
 
         f.write("INSERT INTO activity_stream VALUES\n")
 
         # Write events in batches for readability
-        for i, event in enumerate(events):
-            suffix = "," if i < len(events) - 1 else ";"
-            f.write(f"    {event.to_sql()}{suffix}\n")
+        last = stats.count - 1
+        rows = serialized(profile, iter_rows(batches, heroes, occurrences), events=lambda row: 1)
+        for i, (ts, activity, entity, features_json, *occurrence) in enumerate(rows):
+            suffix = "," if i < last else ";"
+            # Escape single quotes in JSON
+            features_json = features_json.replace("'", "''")
+            if occurrence:
+                count, repeated_at = occurrence
+                repeated_at = "NULL" if repeated_at is None else f"'{repeated_at}'"
+                f.write(f"    ('{ts}', '{activity}', '{entity}', '{features_json}', {count}, {repeated_at}){suffix}\n")
+            else:
+                f.write(f"    ('{ts}', '{activity}', '{entity}', '{features_json}'){suffix}\n")
+
+
+def write_csv(
+    batches: Iterable[EventBatch], stats: RunStats, output_path: Path, heroes: list[dict] = HEROES,
+    profile: Profile | None = None, append: bool = False, occurrences: bool = False,
+):
+    """Write events as CSV with a header row (features stay a JSON string); `append` adds rows only.
+
+    An empty activity_repeated_at is NULL.
+    """
+    with open_output(output_path, append) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if not append:
+            writer.writerow(["ts", "activity", "entity", "features", *(OCCURRENCE_COLUMNS if occurrences else ())])
+        writer.writerows(serialized(profile, iter_rows(batches, heroes, occurrences), events=lambda row: 1))
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError:
+        sys.exit("Parquet/Arrow output needs pyarrow: uv run --with pyarrow generate_seed.py ...")
+    return pyarrow
+
+
+def arrow_schema(pa, stats: RunStats, heroes: list[dict], occurrences: bool = False):
+    occurrence_fields = [("activity_occurrence", pa.int32()), ("activity_repeated_at", pa.timestamp("s"))]
+    return pa.schema(
+        [
+            ("ts", pa.timestamp("s")),
+            ("activity", pa.dictionary(pa.int8(), pa.string())),
+            ("entity", pa.dictionary(pa.int32(), pa.string())),
+            ("features", pa.string()),
+            *(occurrence_fields if occurrences else []),
+        ],
+        metadata={
+            "title": "Fantasy Realm Activity Stream",
+            "total_events": str(stats.count),
+            "date_range": f"{stats.first_ts.date()} to {stats.last_ts.date()}",
+            "heroes": hero_summary(heroes),
+        },
+    )
 
-    print(f"\nWritten {len(events)} events to {output_path}")
 
+def iter_record_batches(pa, batches: Iterable[EventBatch], schema, heroes: list[dict]) -> Iterator:
+    """Convert event batches to Arrow record batches, reusing the column buffers."""
+    activities = pa.array(ACTIVITIES)
+    entities = pa.array([h["id"] for h in heroes])
+    occurrences = "activity_occurrence" in schema.names
+    for batch in batches:
+        n = len(batch)
+        ts = pa.Array.from_buffers(pa.int64(), n, [None, pa.py_buffer(batch.ts)])
+        activity = pa.Array.from_buffers(pa.uint8(), n, [None, pa.py_buffer(batch.activity)])
+        entity = pa.Array.from_buffers(pa.uint32(), n, [None, pa.py_buffer(batch.entity)])
+        columns = [
+            ts.view(pa.timestamp("s")),
+            pa.DictionaryArray.from_arrays(activity.cast(pa.int8()), activities),
+            # Only the heroes present in this batch go into its dictionary
+            entities.take(entity).dictionary_encode().cast(schema.field("entity").type),
+            pa.array([batch.features_json(i) for i in range(n)], pa.string()),
+        ]
+        if occurrences:
+            repeated_at = pa.Array.from_buffers(pa.int64(), n, [None, pa.py_buffer(batch.repeated_at)])
+            latest = pa.compute.equal(repeated_at, NO_REPEAT)
+            columns += [
+                pa.Array.from_buffers(pa.int32(), n, [None, pa.py_buffer(batch.occurrence)]),
+                pa.compute.if_else(latest, None, repeated_at).cast(pa.timestamp("s")),
+            ]
+        yield pa.record_batch(columns, schema=schema)
+
+
+def write_parquet(
+    batches: Iterable[EventBatch], stats: RunStats, output_path: Path, heroes: list[dict] = HEROES,
+    profile: Profile | None = None, occurrences: bool = False,
+):
+    """Write events as zstd-compressed Parquet, one row group per batch."""
+    pa = import_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(pa, stats, heroes, occurrences)
+    with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+        for batch in serialized(profile, iter_record_batches(pa, batches, schema, heroes), events=len):
+            writer.write_batch(batch)
+
+
+def write_arrow(
+    batches: Iterable[EventBatch], stats: RunStats, output_path: Path, heroes: list[dict] = HEROES,
+    profile: Profile | None = None, occurrences: bool = False,
+):
+    """Write events as an Arrow IPC stream."""
+    pa = import_pyarrow()
+
+    schema = arrow_schema(pa, stats, heroes, occurrences)
+    with pa.OSFile(str(output_path), "wb") as sink, pa.ipc.new_stream(sink, schema) as writer:
+        for batch in serialized(profile, iter_record_batches(pa, batches, schema, heroes), events=len):
+            writer.write_batch(batch)
+
+
+# === NUMPY ENGINE ===
+
+# Heroes advanced in lockstep by the NumPy engine; each block has its own RNG
+# stream, so block boundaries (not worker count) determine the output
+NUMPY_BLOCK_HEROES = 4096
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        sys.exit("The numpy engine needs numpy: uv run --with numpy generate_seed.py --engine numpy ...")
+    return numpy
+
+
+def numpy_tables(np) -> dict:
+    """WORLD as padded NumPy arrays, indexed the same way."""
+    world = WORLD
+
+    def padded(rows: Iterable[tuple[int, ...]]) -> tuple:
+        rows = list(rows)
+        table = np.zeros((len(rows), max(len(r) for r in rows)), dtype=np.int64)
+        for i, row in enumerate(rows):
+            table[i, :len(row)] = row
+        return table, np.array([len(r) for r in rows], dtype=np.int64)
+
+    offsets = {
+        QUEST_ACCEPTED: (1, 10), QUEST_COMPLETED: (5, 30), ITEM_PICKUP: (1, 5), LEVEL_UP: (1, 3),
+        BATTLE_START: (1, 5), BATTLE_END: (2, 8), DUNGEON_ENTER: (5, 20), DUNGEON_EXIT: (2, 10),
+        SKILL_LEARNED: (1, 3), PARTY_JOIN: (5, 15),
+    }
+    # Base weight of every action (column = position in ACTION_ORDER)
+    base = np.array([action_weight(a, False, False) for a in ACTION_ORDER], dtype=np.float64)
+    dungeon_pool, dungeon_pool_size = padded(world.dungeon_enemies)
+    enemy_locations, enemy_location_count = padded(world.enemy_locations)
+    class_skills, class_skill_count = padded(world.class_skills[c] for c in HERO_CLASSES)
+    return {
+        "column": {a: i for i, a in enumerate(ACTION_ORDER)},
+        "base_weight": base,
+        "offset_lo": np.array([offsets[a][0] for a in range(len(ACTIVITIES))], dtype=np.int64),
+        "offset_span": np.array([offsets[a][1] - offsets[a][0] + 1 for a in range(len(ACTIVITIES))], dtype=np.int64),
+        "quest_difficulty": np.array(world.quest_difficulty, dtype=np.int64),
+        "quest_gold": np.array(world.quest_gold, dtype=np.int64),
+        "quest_xp": np.array(world.quest_xp, dtype=np.int64),
+        "item_rarity": np.array(world.item_rarity, dtype=np.int64),
+        "wild_enemies": np.array(world.wild_enemies, dtype=np.int64),
+        "dungeon_pool": dungeon_pool,
+        "dungeon_pool_size": dungeon_pool_size,
+        "enemy_locations": enemy_locations,
+        "enemy_location_count": enemy_location_count,
+        "dungeon_loot": np.array(world.dungeon_loot, dtype=np.int64),
+        "dungeon_tier": np.array(world.dungeon_tier, dtype=np.int64),
+        "class_skills": class_skills,
+        "class_skill_count": class_skill_count,
+        "skill_type": np.array(world.skill_type, dtype=np.int64),
+        "class_code": np.array([world.class_code[c] for c in HERO_CLASSES], dtype=np.int64),
+        "popcount": np.array([bin(i).count("1") for i in range(1 << len(QUESTS))], dtype=np.int64),
+    }
+
+
+def nth_set_bit(np, bits, n):
+    """Position of the n-th (0-based) set bit of each element of `bits`."""
+    position = np.zeros_like(bits)
+    remaining = n.copy()
+    found = np.zeros(bits.shape, dtype=bool)
+    for bit in range(int(bits.max()).bit_length()):
+        is_set = ((bits >> bit) & 1).astype(bool) & ~found
+        hit = is_set & (remaining == 0)
+        position[hit] = bit
+        found |= hit
+        remaining -= is_set & ~hit
+    return position
+
+
+def simulate_block_numpy(np, tables: dict, config: SeedConfig, heroes: list[tuple[int, dict]], block: int) -> tuple:
+    """Advance a block of heroes in lockstep; return its events as sorted columns.
+
+    The state machine is the Python engine's, one vectorized step per event
+    for every hero still active. The RNG stream is per block, so output is
+    deterministic for a given seed but differs from the Python engine's.
+    """
+    rng = np.random.default_rng([config.seed, block])
+    n = len(heroes)
+    col = tables["column"]
+    entity = np.array([e for e, _ in heroes], dtype=np.int64)
+    hero_class = np.array([HERO_CLASSES.index(h["class"]) for _, h in heroes], dtype=np.int64)
+    end_time = to_epoch(config.end)
+
+    now = to_epoch(config.start) + rng.integers(0, 5, n) * 3600
+    level = rng.integers(1, 4, n)
+    quest = np.full((n, 2), -1, dtype=np.int64)  # two quest slots
+    quest_start = np.zeros((n, 2), dtype=np.int64)
+    available = np.full(n, (1 << len(QUESTS)) - 1, dtype=np.int64)  # bitmask of quests
+    battle_start = np.full(n, -1, dtype=np.int64)
+    dungeon = np.full(n, -1, dtype=np.int64)
+    dungeon_enter = np.zeros(n, dtype=np.int64)
+    party = np.full(n, -1, dtype=np.int64)
+    unlearned = (1 << tables["class_skill_count"][hero_class]) - 1  # bitmask over class skills
+    count = np.zeros(n, dtype=np.int64)
+
+    out_ts, out_activity, out_entity, out_values = [], [], [], []
+    while True:
+        ix = np.flatnonzero((now < end_time) & (count < config.events_per_hero))
+        if not len(ix):
+            break
+        m = len(ix)
+        t = now[ix]
+        in_battle = battle_start[ix] >= 0
+        in_dungeon = dungeon[ix] >= 0
+        slots = quest[ix]
+        n_active = (slots >= 0).sum(axis=1)
+        ready = (slots >= 0) & (t[:, None] - quest_start[ix] >= 20 * 60)
+        n_available = tables["popcount"][available[ix]]
+        u = rng.random((m, 3))
+
+        # Determine what actions are possible; weight them based on game logic
+        possible = np.zeros((m, len(ACTION_ORDER)), dtype=bool)
+        possible[:, col[ITEM_PICKUP]] = ~in_battle
+        possible[:, col[QUEST_ACCEPTED]] = (n_active < 2) & (n_available > 0) & ~in_battle
+        possible[:, col[QUEST_COMPLETED]] = ready.any(axis=1)
+        possible[:, col[DUNGEON_ENTER]] = ~in_dungeon & ~in_battle
+        possible[:, col[DUNGEON_EXIT]] = in_dungeon & (t - dungeon_enter[ix] >= 15 * 60)
+        possible[:, col[BATTLE_START]] = ~in_battle
+        possible[:, col[BATTLE_END]] = in_battle & (t - battle_start[ix] >= 2 * 60)
+        possible[:, col[LEVEL_UP]] = u[:, 0] < 0.05
+        possible[:, col[SKILL_LEARNED]] = (unlearned[ix] > 0) & (level[ix] >= 2) & (u[:, 1] < 0.1)
+        possible[:, col[PARTY_JOIN]] = (party[ix] < 0) & (u[:, 2] < 0.03)
+        weights = possible * tables["base_weight"]
+        weights[:, col[QUEST_ACCEPTED]] *= np.where(n_active == 0, 3, 1)
+        weights[:, col[BATTLE_START]] *= np.where(in_dungeon, 2, 1)
+
+        # Vectorized weighted sampling: first cumulative weight above a uniform draw
+        cum = weights.cumsum(axis=1)
+        total = cum[:, -1]
+        draw = rng.random(m) * total
+        choice = (cum <= draw[:, None]).sum(axis=1).clip(max=len(ACTION_ORDER) - 1)
+        acted = total > 0
+        action = np.array(ACTION_ORDER, dtype=np.int64)[choice]
+        values = np.zeros((m, 3), dtype=np.int64)
+        r = rng.random((m, 3))  # per-event draws for the action's own choices
+
+        def pick(sel, lo, span, k=0):
+            """Uniform integers in [lo, lo + span) for the selected heroes."""
+            return lo + (r[sel, k] * span).astype(np.int64)
+
+        sel = np.flatnonzero(acted & (action == QUEST_ACCEPTED))
+        if len(sel):
+            h = ix[sel]
+            q = nth_set_bit(np, available[h], pick(sel, 0, n_available[sel]))
+            # Re-accepting an active quest restarts it; otherwise take a free slot
+            slot = np.where(quest[h, 0] == q, 0, np.where(quest[h, 1] == q, 1, np.where(quest[h, 0] < 0, 0, 1)))
+            quest[h, slot] = q
+            quest_start[h, slot] = t[sel]
+            values[sel] = np.stack([q, q, tables["quest_difficulty"][q]], axis=1)
+
+        sel = np.flatnonzero(acted & (action == QUEST_COMPLETED))
+        if len(sel):
+            h = ix[sel]
+            both = ready[sel].all(axis=1)
+            slot = np.where(both, (r[sel, 0] < 0.5).astype(np.int64), np.where(ready[sel, 0], 0, 1))
+            q = quest[h, slot]
+            quest[h, slot] = -1
+            # Remove from available to add variety
+            shrink = n_available[sel] > 2
+            available[h[shrink]] &= ~(1 << q[shrink])
+            gold = tables["quest_gold"][q]
+            xp = tables["quest_xp"][q]
+            values[sel, 0] = q
+            values[sel, 1] = pick(sel, gold[:, 0], gold[:, 1] - gold[:, 0] + 1, 1)
+            values[sel, 2] = pick(sel, xp[:, 0], xp[:, 1] - xp[:, 0] + 1, 2)
+
+        sel = np.flatnonzero(acted & (action == ITEM_PICKUP))
+        if len(sel):
+            item = pick(sel, 0, len(ITEMS))
+            values[sel] = np.stack([item, item, tables["item_rarity"][item]], axis=1)
+
+        sel = np.flatnonzero(acted & (action == LEVEL_UP))
+        if len(sel):
+            h = ix[sel]
+            level[h] += 1
+            values[sel, 0] = level[h]
+            values[sel, 1] = tables["class_code"][hero_class[h]]
+
+        sel = np.flatnonzero(acted & (action == BATTLE_START))
+        if len(sel):
+            h = ix[sel]
+            # Choose enemy based on dungeon tier or random
+            inside = dungeon[h] >= 0
+            d = dungeon[h].clip(min=0)
+            pooled = tables["dungeon_pool"][d, pick(sel, 0, tables["dungeon_pool_size"][d])]
+            wild = tables["wild_enemies"][pick(sel, 0, len(tables["wild_enemies"]))]
+            enemy = np.where(inside, pooled, wild)
+            location = pick(sel, 0, tables["enemy_location_count"][enemy], 1)
+            battle_start[h] = t[sel]
+            values[sel, 0] = enemy
+            values[sel, 1] = tables["enemy_locations"][enemy, location]
+
+        sel = np.flatnonzero(acted & (action == BATTLE_END))
+        if len(sel):
+            victory = r[sel, 0] < 0.8  # 80% win
+            damage = np.where(victory, pick(sel, 5, 46, 1), pick(sel, 30, 51, 1))
+            values[sel, 0] = np.where(victory, WORLD.outcome_code["victory"], WORLD.outcome_code["retreat"])
+            values[sel, 1] = damage
+            battle_start[ix[sel]] = -1
+
+        sel = np.flatnonzero(acted & (action == DUNGEON_ENTER))
+        if len(sel):
+            h = ix[sel]
+            d = pick(sel, 0, len(DUNGEONS))
+            dungeon[h] = d
+            dungeon_enter[h] = t[sel]
+            values[sel, 0] = d
+            values[sel, 1] = tables["dungeon_tier"][d]
+
+        sel = np.flatnonzero(acted & (action == DUNGEON_EXIT))
+        if len(sel):
+            h = ix[sel]
+            loot = tables["dungeon_loot"][dungeon[h]]
+            values[sel, 0] = pick(sel, loot[:, 0], loot[:, 1] - loot[:, 0] + 1)
+            values[sel, 1] = (t[sel] - dungeon_enter[h]) // 60
+            dungeon[h] = -1
+
+        sel = np.flatnonzero(acted & (action == SKILL_LEARNED))
+        if len(sel):
+            h = ix[sel]
+            bits = unlearned[h]
+            which = nth_set_bit(np, bits, pick(sel, 0, tables["popcount"][bits]))
+            unlearned[h] = bits & ~(1 << which)
+            skill = tables["class_skills"][hero_class[h], which]
+            values[sel, 0] = skill
+            values[sel, 1] = tables["skill_type"][skill]
+
+        sel = np.flatnonzero(acted & (action == PARTY_JOIN))
+        if len(sel):
+            h = ix[sel]
+            party[h] = pick(sel, 0, len(FEATURE_VOCABULARIES["party_id"]))
+            values[sel, 0] = party[h]
+            values[sel, 1] = pick(sel, 2, 4, 1)
+
+        # Emit, then random time progression and the day/night cycle
+        offset = tables["offset_lo"][action] + (rng.random(m) * tables["offset_span"][action]).astype(np.int64)
+        ts = t + offset * 60
+        out_ts.append(ts[acted])
+        out_activity.append(action[acted])
+        out_entity.append(entity[ix[acted]])
+        out_values.append(values[acted])
+        count[ix[acted]] += 1
+
+        step = rng.random((m, 2))
+        progress = np.where(acted, 5 + (step[:, 0] * 26).astype(np.int64), 5 + (step[:, 0] * 11).astype(np.int64))
+        after = np.where(acted, ts, t) + progress * 60
+        hour = after // 3600 % 24
+        rest = np.where(acted & ((hour >= 23) | (hour < 6)), 4 + (step[:, 1] * 5).astype(np.int64), 0)
+        now[ix] = after + rest * 3600
+
+    if not out_ts:
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(3)) + (np.zeros((0, 3), dtype=np.int64),)
+    ts = np.concatenate(out_ts)
+    activity = np.concatenate(out_activity)
+    entities = np.concatenate(out_entity)
+    values = np.concatenate(out_values)
+    # Time order; ties keep roster order like the Python engine
+    order = np.lexsort((entities, ts))
+    return ts[order], activity[order], entities[order], values[order]
+
+
+def occurrences_numpy(np, ts, activity, entity) -> tuple:
+    """activity_occurrence and activity_repeated_at of time-ordered event columns.
+
+    A stable sort by (entity, activity) lines up each hero's occurrences of
+    an activity in time order: the occurrence is the position in that run
+    and repeated_at the next row's timestamp.
+    """
+    n = len(ts)
+    order = np.lexsort((activity, entity))
+    run_start = np.ones(n, dtype=bool)
+    run_start[1:] = (entity[order][1:] != entity[order][:-1]) | (activity[order][1:] != activity[order][:-1])
+    first = np.maximum.accumulate(np.where(run_start, np.arange(n), 0))
+    following = np.full(n, NO_REPEAT, dtype=np.int64)
+    repeats = ~run_start[1:]
+    following[:-1][repeats] = ts[order][1:][repeats]
+    occurrence = np.empty(n, dtype=np.int64)
+    repeated_at = np.empty(n, dtype=np.int64)
+    occurrence[order] = np.arange(n) - first + 1
+    repeated_at[order] = following
+    return occurrence, repeated_at
+
+
+def batches_from_columns(
+    np, ts, activity, entity, values, occurrence=None, repeated_at=None
+) -> Iterator[EventBatch]:
+    """Pack NumPy event columns (and occurrence columns, if given) into EventBatches of BATCH_ROWS."""
+    for lo in range(0, len(ts), BATCH_ROWS):
+        hi = min(lo + BATCH_ROWS, len(ts))
+        batch = EventBatch()
+        batch.ts.frombytes(ts[lo:hi].astype(np.int64).tobytes())
+        act = activity[lo:hi]
+        batch.activity.frombytes(act.astype(np.uint8).tobytes())
+        batch.entity.frombytes(entity[lo:hi].astype(np.uint32).tobytes())
+        row = np.zeros(hi - lo, dtype=np.uint32)
+        for code, keys in enumerate(ACTIVITY_FEATURES.values()):
+            rows = np.flatnonzero(act == code)
+            row[rows] = np.arange(len(rows), dtype=np.uint32)
+            for k, column in enumerate(batch.features[code]):
+                column.frombytes(values[lo:hi][rows, k].astype(column.typecode).tobytes())
+        batch.row.frombytes(row.tobytes())
+        if occurrence is not None:
+            batch.occurrence.frombytes(occurrence[lo:hi].astype(np.int32).tobytes())
+            batch.repeated_at.frombytes(repeated_at[lo:hi].astype(np.int64).tobytes())
+        yield batch
+
+
+def numpy_block_heroes(events_per_hero: int) -> int:
+    """Heroes per lockstep block: NUMPY_BLOCK_HEROES, fewer when journeys are long."""
+    return max(1, min(NUMPY_BLOCK_HEROES, SHARD_EVENTS // events_per_hero))
+
+
+def simulate_shard_numpy(config: SeedConfig, heroes: list[tuple[int, dict]], run_path: Path) -> RunStats:
+    """NumPy counterpart of simulate_shard; each shard is one lockstep block."""
+    np = import_numpy()
+    profile = Profile() if config.profile else None
+    block = heroes[0][0] // numpy_block_heroes(config.events_per_hero)
+    with profiled(profile, "simulate"):
+        columns = simulate_block_numpy(np, numpy_tables(np), config, heroes, block)
+        if config.occurrences:
+            columns += occurrences_numpy(np, *columns[:3])
+    stats = RunStats()
+    with profiled(profile, "spill"), open(run_path, "wb") as f:
+        for batch in batches_from_columns(np, *columns):
+            stats.add(batch)
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+    if profile is not None:
+        profile.count("simulate", stats.count)
+        profile.count("spill", stats.count)
+    stats.profile = profile
+    return stats
+
+
+# === VALIDATION ===
+
+# An event at [23:00, 05:30) is always followed by a night's rest: the 5-30
+# minute step after it lands in the [23:00, 06:00) window, which adds 4-8 hours
+NIGHT_WINDOW = (23 * 3600, 5 * 3600 + 30 * 60)
+MIN_NIGHT_REST = 4 * 3600
+
+# Activities a hero can't start while a battle is running
+BLOCKED_IN_BATTLE = {ITEM_PICKUP, QUEST_ACCEPTED, DUNGEON_ENTER, BATTLE_START}
 
-def main():
-    print("Generating Fantasy Realm event data...")
-    print("=" * 50)
 
-    events = generate_all_events()
+@dataclass
+class HeroCheck:
+    """What the validator tracks per hero."""
+
+    last_ts: int | None = None
+    in_battle: bool = False
+    in_dungeon: bool = False
+    open_quests: set = field(default_factory=set)
+    occurrences: dict = field(default_factory=dict)  # activity -> (occurrence, repeated_at) of the latest
+
+
+class Validator:
+    """Checks the simulator's invariants on a time-ordered event stream.
+
+    - events are in time order
+    - a battle ends before the next one starts, and nothing but quest
+      completion, dungeon exit and level/skill/party events happen during it
+    - dungeons are entered one at a time and left after at least 15 minutes
+    - at most 2 quests are open, and only open quests get completed
+    - heroes rest at least 4 hours after an event late at night
+    - occurrence columns, when present, count each hero's activities from 1
+      and point every occurrence at the next one's timestamp
+    """
+
+    def __init__(self, entities: list[str], resume: tuple[dict, int] | None = None):
+        self.entities = entities
+        # A resumed run picks up where the previous window's validator ended (see state())
+        heroes, self.last_ts = resume if resume is not None else ({}, None)
+        self.heroes = {
+            entity: HeroCheck(last_ts, in_battle, in_dungeon, set(open_quests))
+            for entity, (last_ts, in_battle, in_dungeon, open_quests) in heroes.items()
+        }
+        self.events = 0
+        self.violations = Counter()
+        self.examples = {}
+
+    def fail(self, rule: str, batch: EventBatch, i: int):
+        self.violations[rule] += 1
+        if rule not in self.examples:
+            ts, activity, entity, features = batch.event(i, self.entities)
+            self.examples[rule] = f"{ts} {entity} {activity} {json.dumps(features)}"
+
+    def check_occurrence(self, hero: HeroCheck, batch: EventBatch, i: int):
+        activity = batch.activity[i]
+        count, repeated_at = hero.occurrences.get(activity, (0, None))
+        if batch.occurrence[i] != count + 1:
+            self.fail("activity_occurrence out of sequence", batch, i)
+        if count and repeated_at != batch.ts[i]:
+            self.fail("activity_repeated_at is not the next occurrence", batch, i)
+        hero.occurrences[activity] = batch.occurrence[i], batch.repeated_at[i]
+
+    def check(self, batches: Iterable[EventBatch]) -> Iterator[EventBatch]:
+        """Validate batches as they stream past."""
+        quest_id = ACTIVITY_FEATURES["quest_accepted"].index("quest_id")
+        time_spent = ACTIVITY_FEATURES["dungeon_exit"].index("time_spent_minutes")
+        night_start, night_end = NIGHT_WINDOW
+        for batch in batches:
+            for i in range(len(batch)):
+                ts = batch.ts[i]
+                activity = batch.activity[i]
+                hero = self.heroes.get(batch.entity[i])
+                if hero is None:
+                    hero = self.heroes[batch.entity[i]] = HeroCheck()
+                self.events += 1
+
+                if self.last_ts is not None and ts < self.last_ts:
+                    self.fail("stream out of time order", batch, i)
+                self.last_ts = ts
+                if hero.last_ts is not None:
+                    time_of_day = hero.last_ts % 86400
+                    late = time_of_day >= night_start or time_of_day < night_end
+                    if late and ts - hero.last_ts < MIN_NIGHT_REST:
+                        self.fail("no night rest after a late event", batch, i)
+                hero.last_ts = ts
+                if batch.occurrence:
+                    self.check_occurrence(hero, batch, i)
+
+                if hero.in_battle and activity in BLOCKED_IN_BATTLE:
+                    self.fail(f"{ACTIVITIES[activity]} during a battle", batch, i)
+                if activity == BATTLE_START:
+                    hero.in_battle = True
+                elif activity == BATTLE_END:
+                    if not hero.in_battle:
+                        self.fail("battle_end without battle_start", batch, i)
+                    hero.in_battle = False
+                elif activity == DUNGEON_ENTER:
+                    if hero.in_dungeon:
+                        self.fail("dungeon_enter while in a dungeon", batch, i)
+                    hero.in_dungeon = True
+                elif activity == DUNGEON_EXIT:
+                    if not hero.in_dungeon:
+                        self.fail("dungeon_exit without dungeon_enter", batch, i)
+                    if batch.values(i)[time_spent] < 15:
+                        self.fail("dungeon_exit under 15 minutes after entry", batch, i)
+                    hero.in_dungeon = False
+                elif activity == QUEST_ACCEPTED:
+                    hero.open_quests.add(batch.values(i)[quest_id])
+                    if len(hero.open_quests) > 2:
+                        self.fail("more than 2 concurrent quests", batch, i)
+                elif activity == QUEST_COMPLETED:
+                    quest = batch.values(i)[quest_id]
+                    if quest not in hero.open_quests:
+                        self.fail("quest_completed for a quest not in progress", batch, i)
+                    hero.open_quests.discard(quest)
+            yield batch
+
+        # An entity's latest occurrence of each activity has no repeat
+        for entity, hero in self.heroes.items():
+            for activity, (count, repeated_at) in hero.occurrences.items():
+                if repeated_at != NO_REPEAT:
+                    rule = "activity_repeated_at set on the latest occurrence"
+                    self.violations[rule] += 1
+                    self.examples.setdefault(rule, f"{self.entities[entity]} {ACTIVITIES[activity]} #{count}")
+
+    def state(self) -> tuple[dict, int | None]:
+        """Per-hero checks and the stream's last timestamp, as plain tuples for a checkpoint."""
+        heroes = {
+            entity: (hero.last_ts, hero.in_battle, hero.in_dungeon, tuple(sorted(hero.open_quests)))
+            for entity, hero in self.heroes.items()
+        }
+        return heroes, self.last_ts
+
+    def report(self) -> bool:
+        """Print the outcome; True when every invariant held."""
+        if not self.violations:
+            print(f"\nValidated {self.events} events across {len(self.heroes)} heroes: all invariants hold")
+            return True
+        print(f"\nValidation FAILED ({sum(self.violations.values())} violations in {self.events} events):")
+        for rule, n in self.violations.most_common():
+            print(f"  {rule}: {n} (e.g. {self.examples[rule]})")
+        return False
 
-    print("=" * 50)
-    print(f"Total events: {len(events)}")
 
-    # Activity breakdown
-    activity_counts = {}
-    for e in events:
-        activity_counts[e.activity] = activity_counts.get(e.activity, 0) + 1
+# === PARTITIONED OUTPUT ===
+
+SHARD_MANIFEST = "manifest.json"
+SHARD_MANIFEST_VERSION = 1
+SHARD_SUFFIXES = {"sql": ".sql", "parquet": ".parquet", "arrow": ".arrows", "csv": ".csv"}
+
 
-    print("\nActivity breakdown:")
-    for activity, count in sorted(activity_counts.items(), key=lambda x: -x[1]):
-        print(f"  {activity}: {count}")
+def entity_bucket(entity: str, buckets: int) -> int:
+    """Stable bucket of an entity id: CRC-32 of the id modulo the bucket count."""
+    return zlib.crc32(entity.encode()) % buckets
+
+
+@dataclass
+class Partition:
+    """One shard's events on their way to disk: spilled as a run, then written out."""
+
+    key: tuple  # (epoch day or None, bucket or None)
+    run_path: Path
+    stats: RunStats = field(default_factory=RunStats)
+    entities: set = field(default_factory=set)  # entity codes
+    batch: EventBatch = field(default_factory=EventBatch)
+    file: BinaryIO | None = None
+
+    def flush(self):
+        if not self.batch:
+            return
+        if self.file is None:
+            self.file = open(self.run_path, "wb")
+        self.stats.add(self.batch)
+        pickle.dump(self.batch, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.batch = EventBatch()
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def name(self, buckets: int, fmt: str) -> str:
+        """Hive-style path of the shard, so DuckDB can prune on day/bucket by itself."""
+        day, bucket = self.key
+        parts = []
+        if day is not None:
+            parts.append(f"day={from_epoch(day * 86400).date()}")
+        if bucket is not None:
+            parts.append(f"bucket={bucket:0{len(str(buckets - 1))}d}")
+        return "/".join([*parts, f"shard{SHARD_SUFFIXES[fmt]}"])
+
+
+def split_partitions(
+    batches: Iterable[EventBatch], heroes: list[dict], by_day: bool, buckets: int, spill_dir: Path
+) -> list[Partition]:
+    """Route the time-ordered stream into a spilled run per partition.
+
+    Time order means a day is complete as soon as the next one starts, so
+    only the current day's partitions (one per bucket) are open at a time.
+    """
+    bucket_of = [entity_bucket(h["id"], buckets) for h in heroes] if buckets else None
+    partitions = {}
+    current = {}  # Open partitions of the current day
+    current_day = None
+    for batch in batches:
+        ts, entities = batch.ts, batch.entity
+        for i in range(len(batch)):
+            day = ts[i] // 86400 if by_day else None
+            if day != current_day:
+                for partition in current.values():
+                    partition.close()
+                current.clear()
+                current_day = day
+            entity = entities[i]
+            key = (day, bucket_of[entity] if bucket_of else None)
+            partition = current.get(key)
+            if partition is None:
+                partition = current[key] = partitions[key] = Partition(key, spill_dir / f"part_{len(partitions):05d}.pkl")
+            partition.batch.append_from(batch, i)
+            partition.entities.add(entity)
+            if len(partition.batch) == BATCH_ROWS:
+                partition.flush()
+    for partition in current.values():
+        partition.close()
+    return list(partitions.values())
+
+
+def write_shard(fmt: str, run_path: Path, stats: RunStats, path: Path, heroes: int, occurrences: bool):
+    """Write one partition with the format's writer; runs in a worker process."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    FORMATS[fmt][1](read_run(run_path), stats, path, build_roster(heroes), occurrences=occurrences)
+
+
+def clear_shards(output_dir: Path):
+    """Remove the shards of an earlier run, refusing to touch a directory that is not one."""
+    manifest_path = output_dir / SHARD_MANIFEST
+    if not output_dir.exists():
+        return
+    if not manifest_path.exists():
+        if any(output_dir.iterdir()):
+            sys.exit(f"{output_dir} is not empty and has no {SHARD_MANIFEST}; pick an empty or new directory")
+        return
+    for shard in json.loads(manifest_path.read_text())["shards"]:
+        path = output_dir / shard["path"]
+        path.unlink(missing_ok=True)
+        for parent in path.relative_to(output_dir).parents[:-1]:
+            try:
+                (output_dir / parent).rmdir()
+            except OSError:
+                break  # Not empty: another shard still lives there
+    manifest_path.unlink()
+
+
+def write_partitioned(
+    batches: Iterable[EventBatch], stats: RunStats, output_dir: Path, fmt: str, heroes: list[dict],
+    by_day: bool, buckets: int, workers: int, spill_dir: Path, profile: Profile | None = None,
+    occurrences: bool = False,
+) -> int:
+    """Write one shard per day and/or entity bucket plus a manifest; return the shard count.
+
+    The manifest lists every shard's path, row count, time bounds and entity
+    codes (indexes into its `entities`), for loaders to pick the shards a
+    query needs. Shards are written in parallel. Occurrence columns are
+    numbered over the whole stream, so a repeated_at can point into another
+    shard.
+    """
+    clear_shards(output_dir)
+    with profiled(profile, "partition"):
+        partitions = split_partitions(batches, heroes, by_day, buckets, spill_dir)
+    if profile is not None:
+        profile.count("partition", stats.count)
+
+    paths = [output_dir / p.name(buckets, fmt) for p in partitions]
+    jobs = ([fmt] * len(partitions), [p.run_path for p in partitions], [p.stats for p in partitions], paths,
+            [len(heroes)] * len(partitions), [occurrences] * len(partitions))
+    if workers == 1:
+        list(map(write_shard, *jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(write_shard, *jobs))
+
+    manifest = {
+        "version": SHARD_MANIFEST_VERSION,
+        "format": fmt,
+        "partition_by": [*(["day"] if by_day else []), *(["bucket"] if buckets else [])],
+        "entity_buckets": buckets or None,
+        "bucket_of": f"crc32(entity) % {buckets}" if buckets else None,
+        "occurrence_columns": occurrences,
+        "total_events": stats.count,
+        "first_ts": str(stats.first_ts),
+        "last_ts": str(stats.last_ts),
+        "entities": [h["id"] for h in heroes],
+        "shards": [
+            {
+                "path": str(path.relative_to(output_dir)),
+                "rows": p.stats.count,
+                "first_ts": str(p.stats.first_ts),
+                "last_ts": str(p.stats.last_ts),
+                **({"day": str(from_epoch(p.key[0] * 86400).date())} if by_day else {}),
+                **({"bucket": p.key[1]} if buckets else {}),
+                "entities": sorted(p.entities),
+            }
+            for p, path in zip(partitions, paths)
+        ],
+    }
+    (output_dir / SHARD_MANIFEST).write_text(json.dumps(manifest, indent=1) + "\n")
+    return len(partitions)
+
+
+# === CHECKPOINTS ===
+
+# Formats a resumed run appends to in place; Parquet gets a new file per window
+APPENDABLE_FORMATS = {"sql", "csv"}
+
+
+def checkpoint_part(run_path: Path) -> Path:
+    """Where a shard saves its heroes' checkpoint records, next to its run."""
+    return run_path.with_suffix(".ckpt")
+
+
+def load_checkpoint(path: Path) -> dict:
+    with open(path, "rb") as f:
+        checkpoint = pickle.load(f)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is a version {checkpoint.get('version')} checkpoint, expected {CHECKPOINT_VERSION}")
+    return checkpoint
+
+
+def save_checkpoint(path: Path, checkpoint: dict, run_paths: list[Path]):
+    """Collect the shards' hero records into `checkpoint` and write it atomically."""
+    records = list(checkpoint.get("heroes", []))
+    for run_path in run_paths:
+        with open(checkpoint_part(run_path), "rb") as f:
+            for entity, record in pickle.load(f):
+                if entity == len(records):
+                    records.append(record)
+                else:
+                    records[entity] = record
+    checkpoint = {**checkpoint, "version": CHECKPOINT_VERSION, "heroes": records}
+    partial = path.with_name(f".{path.name}.partial")
+    with open(partial, "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+    print(f"Checkpoint of {len(records)} heroes at {checkpoint['end']} saved to {path}")
+
+
+def segment_path(output: Path, window: int) -> Path:
+    """Output file of a resumed window in a format that cannot be appended to."""
+    return output if window == 0 else output.with_name(f"{output.stem}.{window:04d}{output.suffix}")
+
+
+def rewind_output(output: Path, size: int):
+    """Cut off anything appended after the checkpoint was saved (a run that died midway)."""
+    current = output.stat().st_size
+    if current < size:
+        sys.exit(f"{output} is smaller than when the checkpoint was saved; regenerate it")
+    if current > size:
+        print(f"Truncating {output} from {current} to {size} bytes: a resumed run did not finish")
+        with open(output, "r+b") as f:
+            f.truncate(size)
+
+
+# Output format -> (default file name, writer)
+FORMATS = {
+    "sql": ("seed.sql", write_sql),
+    "parquet": ("seed.parquet", write_parquet),
+    "arrow": ("seed.arrows", write_arrow),
+    "csv": ("seed.csv", write_csv),
+}
+
+
+def parse_timestamp(value: str, end_of_day: bool = False) -> datetime:
+    """Parse an ISO date or datetime; a bare end date covers the whole day."""
+    ts = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        ts = ts.replace(hour=23, minute=59, second=59)
+    return ts
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate Fantasy Realm activity stream seed data")
+    parser.add_argument("--heroes", type=int, default=len(HEROES), help="Number of heroes to simulate")
+    parser.add_argument("--start", type=parse_timestamp, help="Start of the time range (ISO date/datetime)")
+    parser.add_argument(
+        "--end", type=lambda v: parse_timestamp(v, end_of_day=True), default=END_DATE,
+        help="End of the time range (ISO date/datetime)",
+    )
+    parser.add_argument("--events-per-hero", type=int, help=f"Cap on events per hero (default {MAX_EVENTS_PER_HERO})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="RNG seed")
+    parser.add_argument(
+        "--streams", choices=["shared", "per-hero"], default="shared",
+        help="shared: one RNG stream for all heroes (reproduces seed.sql); per-hero: independent stream per hero",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for per-hero streams (0 = all cores)")
+    parser.add_argument(
+        "--engine", choices=["python", "numpy"], default="python",
+        help="python: event-by-event state machine; numpy: heroes advanced in lockstep blocks (needs numpy)",
+    )
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: sql)")
+    parser.add_argument(
+        "-o", "--output", type=Path,
+        help="Output file (default: seed.<format> next to this script; .gz / .zst suffix compresses sql/csv)",
+    )
+    parser.add_argument("--tmp-dir", type=Path, help="Where to spill sorted runs (default: system temp dir)")
+    parser.add_argument("--validate", action="store_true", help="Check the simulator invariants while writing")
+    parser.add_argument(
+        "--occurrence-columns", action="store_true",
+        help="Add activity_occurrence (per hero and activity: 1, 2, ...) and activity_repeated_at "
+             "(time of the next occurrence) columns",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Report time per phase and per simulator action, events/s and peak RSS (adds some overhead)",
+    )
+    parser.add_argument(
+        "--profile-dump", type=Path,
+        help="Implies --profile; dump this process as cProfile stats (.prof path) or folded stacks (any other path)",
+    )
+    parser.add_argument(
+        "--partition-by-day", action="store_true", help="Write one shard per day into the -o directory, with a manifest",
+    )
+    parser.add_argument(
+        "--entity-buckets", type=int, default=0,
+        help="Also split shards into this many buckets by hashed entity (alone or with --partition-by-day)",
+    )
+    parser.add_argument(
+        "--checkpoint", type=Path,
+        help="Save every hero's simulator state here; events after --end wait in it for the next window",
+    )
+    parser.add_argument(
+        "--resume", type=Path,
+        help="Continue a checkpoint up to --end, appending to its output (and updating it, or --checkpoint)",
+    )
+    args = parser.parse_args()
+
+    args.resumed = None
+    if args.resume is not None:
+        try:
+            args.resumed = resumed = load_checkpoint(args.resume)
+        except (OSError, ValueError, pickle.UnpicklingError) as e:
+            parser.error(f"--resume: {e}")
+        if args.start is not None:
+            parser.error("--resume continues where the checkpoint ended; --start does not apply")
+        if args.validate and resumed["validator"] is None:
+            parser.error("--validate on --resume needs a checkpoint saved with --validate")
+        if args.format is not None and args.format != resumed["format"]:
+            parser.error(
+                f"--resume appends to the checkpoint's {resumed['format']} output; --format {args.format} does not apply"
+            )
+        if args.output is not None and args.output.resolve() != Path(resumed["output"]).resolve():
+            parser.error(f"--resume appends to the checkpoint's output, {resumed['output']}; -o does not apply")
+        # The new window continues the checkpoint's run, into its output
+        args.start = resumed["end"]
+        args.heroes = max(args.heroes, len(resumed["heroes"]))
+        args.seed, args.streams, args.engine = resumed["seed"], "per-hero", "python"
+        args.format, args.output = resumed["format"], Path(resumed["output"])
+        args.events_per_hero = args.events_per_hero or resumed["events_per_hero"]
+        args.checkpoint = args.checkpoint or args.resume
+    args.start = args.start or START_DATE
+    args.format = args.format or "sql"
+    args.events_per_hero = args.events_per_hero or MAX_EVENTS_PER_HERO
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.heroes < 1 or args.events_per_hero < 1 or workers < 1:
+        parser.error("--heroes, --events-per-hero and --workers must be positive")
+    if args.end <= args.start:
+        parser.error(f"--end must be after the checkpoint's end, {args.start}" if args.resumed else "--end must be after --start")
+    if workers > 1 and args.streams == "shared" and args.engine == "python":
+        parser.error("--workers > 1 needs --streams per-hero (a shared stream is inherently sequential)")
+    if args.checkpoint is not None and (args.streams != "per-hero" or args.engine != "python"):
+        parser.error("--checkpoint needs --streams per-hero and the python engine (per-hero state to save)")
+    args.partitioned = args.partition_by_day or args.entity_buckets > 0
+    if args.entity_buckets < 0:
+        parser.error("--entity-buckets must be positive")
+    if args.partitioned and args.output is None:
+        parser.error("partitioned output needs -o DIRECTORY")
+    if args.partitioned and args.checkpoint is not None:
+        parser.error("--checkpoint appends to a single output; it does not support partitioned output")
+    if args.checkpoint is not None and args.format not in {*APPENDABLE_FORMATS, "parquet"}:
+        parser.error("--checkpoint supports sql, csv and parquet output (Arrow IPC streams cannot be extended)")
+    if args.checkpoint is not None and args.occurrence_columns:
+        # A row's repeated_at is only known once the next window has simulated its successor
+        parser.error("--occurrence-columns cannot be combined with --checkpoint/--resume: rows already written "
+                     "would need the activity_repeated_at of the next window")
+
+    args.config = SeedConfig(
+        heroes=args.heroes,
+        start=args.start,
+        end=args.end,
+        events_per_hero=args.events_per_hero,
+        seed=args.seed,
+        streams=args.streams,
+        workers=workers,
+        engine=args.engine,
+        profile=args.profile or args.profile_dump is not None,
+        checkpoint=args.checkpoint is not None,
+        occurrences=args.occurrence_columns,
+    )
+    if args.output is None:
+        args.output = Path(__file__).parent / FORMATS[args.format][0]
+    return args
+
+
+def main():
+    args = parse_args()
+    config = args.config
+
+    print("Generating Fantasy Realm event data...")
+    print("=" * 50)
 
-    # Write output
-    output_path = Path(__file__).parent / "seed.sql"
-    write_sql(events, output_path)
+    resumed = args.resumed
+    output, append, window = args.output, False, 0
+    if resumed is not None:
+        window = resumed["window"] + 1
+        print(f"Resuming {len(resumed['heroes'])} heroes from {args.resume} (window {window}, from {resumed['end']})")
+        if args.format in APPENDABLE_FORMATS:
+            rewind_output(output, resumed["output_size"])
+            append = True
+        else:
+            output = segment_path(output, window)
+
+    started = time.perf_counter()
+    with profile_dump(args.profile_dump), TemporaryDirectory(prefix="seed_runs_", dir=args.tmp_dir) as spill_dir:
+        run_paths, stats = generate_runs(config, Path(spill_dir), resumed["heroes"] if resumed else None)
+        if not stats.count and resumed is None:
+            print("No events generated; widen the time range", file=sys.stderr)
+            sys.exit(1)
+
+        print("=" * 50)
+        print(f"Total events: {stats.count}")
+
+        # Activity breakdown
+        print("\nActivity breakdown:")
+        for activity, count in sorted(stats.activity_counts.items(), key=lambda x: -x[1]):
+            print(f"  {activity}: {count}")
+
+        # Write output
+        roster = build_roster(config.heroes)
+        profile = stats.profile
+        batches = merge_runs(run_paths)
+        if profile is not None:
+            batches = profile.timed("merge", batches)
+        if args.validate:
+            validator = Validator([h["id"] for h in roster], resumed["validator"] if resumed else None)
+            batches = validator.check(batches)
+            if profile is not None:
+                batches = profile.timed("validate", batches)
+        _, writer = FORMATS[args.format]
+        if args.partitioned:
+            with profiled(profile, "write"):
+                shards = write_partitioned(
+                    batches, stats, output, args.format, roster, args.partition_by_day, args.entity_buckets,
+                    config.workers, Path(spill_dir), profile, config.occurrences,
+                )
+            print(f"\nWritten {stats.count} events in {shards} shards to {output}/ (see {SHARD_MANIFEST})")
+        elif stats.count:
+            with profiled(profile, "write"):
+                writer(
+                    batches, stats, output, roster, profile, occurrences=config.occurrences,
+                    **({"append": True} if append else {}),
+                )
+            print(f"\nWritten {stats.count} events to {output}")
+        else:
+            print("\nNo new events in this window")
+        if profile is not None:
+            profile.count("write", stats.count)
+
+        if args.checkpoint is not None:
+            save_checkpoint(args.checkpoint, {
+                **(resumed or {"start": config.start, "events": 0}),
+                "seed": config.seed,
+                "events_per_hero": config.events_per_hero,
+                "end": config.end,
+                "window": window,
+                "format": args.format,
+                "output": str(args.output),
+                "output_size": args.output.stat().st_size if args.format in APPENDABLE_FORMATS else None,
+                "events": (resumed["events"] if resumed else 0) + stats.count,
+                "validator": validator.state() if args.validate else None,
+            }, run_paths)
+
+    if profile is not None:
+        profile.report(time.perf_counter() - started, config.workers)
+    if args.validate and not validator.report():
+        sys.exit(1)
+
+    if args.partitioned:
+        loader = Path(__file__).parent / "load_shards.py"
+        print(f"\nLoad the shards into DuckDB in parallel with:\nuv run {loader} {output} --db realm.duckdb")
+    elif append or resumed is None:
+        print(f"\nLoad into DuckDB with:\n{load_snippet(args.format, args.output, config.occurrences)}")
+    else:
+        print(
+            "\nAppend the new window to a loaded activity_stream with:\n"
+            "INSERT INTO activity_stream\n"
+            "SELECT ts, activity, entity, features::JSON AS features\n"
+            f"FROM read_parquet('{output}');"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["duckdb"]
+# ///
+"""Load a partitioned Fantasy Realm activity stream into DuckDB, shards in parallel.
+
+generate_seed.py --partition-by-day / --entity-buckets writes one shard per
+day and/or entity bucket, and a manifest.json with every shard's row count,
+time range and entities. This script reads the manifest, keeps only the
+shards that can hold rows for the requested time range and entities, and
+inserts them into activity_stream concurrently, one DuckDB connection per
+thread. Load time scales with cores, and with how little of the data a
+query needs.
+
+Usage:
+    uv run load_shards.py /tmp/seed_shards --db realm.duckdb
+    uv run load_shards.py /tmp/seed_shards --db realm.duckdb --from 2025-06-03 --to 2025-06-04
+    uv run load_shards.py /tmp/seed_shards --db realm.duckdb --entity hero_001 --entity hero_002 --threads 8
+    uv run load_shards.py /tmp/seed_shards --db realm.duckdb --replace   # Drop the table first
+
+Parquet shards can also be queried in place: their hive-style paths let
+DuckDB skip days and buckets a filter rules out.
+
+    SELECT count(*) FROM read_parquet('/tmp/seed_shards/**/*.parquet', hive_partitioning = true)
+    WHERE day = '2025-06-03';
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+COLUMNS = {"ts": "TIMESTAMP", "activity": "VARCHAR", "entity": "VARCHAR", "features": "JSON"}
+# Written after `features` by generate_seed.py --occurrence-columns
+OCCURRENCE_COLUMNS = {"activity_occurrence": "INTEGER", "activity_repeated_at": "TIMESTAMP"}
+
+# Rows of one shard, by format; `{path}` is the shard file, `{columns}` the
+# columns after `features` and `{types}` their CSV types
+SHARD_SELECT = {
+    "parquet": "SELECT ts, activity, entity, features::JSON AS features{columns} FROM read_parquet('{path}')",
+    "arrow": "SELECT ts, activity, entity, features::JSON AS features{columns} FROM read_arrow('{path}')",
+    "csv": (
+        "SELECT ts, activity, entity, features::JSON AS features{columns} FROM read_csv('{path}', header = true, "
+        "columns = {{'ts': 'TIMESTAMP', 'activity': 'VARCHAR', 'entity': 'VARCHAR', 'features': 'VARCHAR'{types}}})"
+    ),
+}
+
+
+def table_columns(manifest: dict) -> dict:
+    """Columns of the shards' activity_stream and their types."""
+    return {**COLUMNS, **(OCCURRENCE_COLUMNS if manifest.get("occurrence_columns") else {})}
+
+
+def create_table(columns: dict) -> str:
+    body = ",\n".join(f"    {name} {kind}" for name, kind in columns.items())
+    return f"CREATE TABLE IF NOT EXISTS activity_stream (\n{body}\n)"
+
+
+def shard_select(fmt: str, path: Path, columns: dict) -> str:
+    """Query for the rows of one shard, with the table's `columns`."""
+    extra = {name: kind for name, kind in columns.items() if name not in COLUMNS}
+    return SHARD_SELECT[fmt].format(
+        path=path,
+        columns="".join(f", {name}" for name in extra),
+        types="".join(f", '{name}': '{kind}'" for name, kind in extra.items()),
+    )
+
+
+def load_manifest(shard_dir: Path) -> dict:
+    manifest_path = shard_dir / MANIFEST
+    if not manifest_path.exists():
+        sys.exit(f"{manifest_path} not found; write shards with generate_seed.py --partition-by-day/--entity-buckets")
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("version") != MANIFEST_VERSION:
+        sys.exit(f"{manifest_path} is a version {manifest.get('version')} manifest, expected {MANIFEST_VERSION}")
+    return manifest
+
+
+def select_shards(
+    manifest: dict, start: datetime | None, end: datetime | None, entities: list[str] | None
+) -> list[dict]:
+    """Shards that can hold rows in [start, end] for any of `entities` (None: no filter)."""
+    codes = None
+    if entities:
+        index = {entity: code for code, entity in enumerate(manifest["entities"])}
+        unknown = [e for e in entities if e not in index]
+        if unknown:
+            print(f"Not in the manifest: {', '.join(unknown)}", file=sys.stderr)
+        codes = {index[e] for e in entities if e in index}
+    selected = []
+    for shard in manifest["shards"]:
+        if start is not None and datetime.fromisoformat(shard["last_ts"]) < start:
+            continue
+        if end is not None and datetime.fromisoformat(shard["first_ts"]) > end:
+            continue
+        if codes is not None and codes.isdisjoint(shard["entities"]):
+            continue
+        selected.append(shard)
+    return selected
+
+
+def row_filter(start: datetime | None, end: datetime | None, entities: list[str] | None) -> tuple[str, list]:
+    """WHERE clause and parameters that keep only the requested rows of a shard."""
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("ts >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("ts <= ?")
+        params.append(end)
+    if entities:
+        conditions.append(f"entity IN ({', '.join('?' * len(entities))})")
+        params.extend(entities)
+    return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def load_shard(
+    con: duckdb.DuckDBPyConnection, fmt: str, path: Path, columns: dict, where: str, params: list
+):
+    """Insert one shard into activity_stream on this thread's connection."""
+    if fmt != "sql":
+        con.execute(f"INSERT INTO activity_stream {shard_select(fmt, path, columns)}{where}", params)
+        return
+    # A SQL shard is a script ending in one INSERT; run it into a scratch table to filter it
+    statement = path.read_text().split("INSERT INTO activity_stream VALUES", 1)[1]
+    if not where:
+        con.execute(f"INSERT INTO activity_stream VALUES{statement}")
+        return
+    con.execute("CREATE OR REPLACE TEMP TABLE shard AS FROM activity_stream LIMIT 0")
+    con.execute(f"INSERT INTO shard VALUES{statement}")
+    con.execute(f"INSERT INTO activity_stream SELECT * FROM shard{where}", params)
+    con.execute("DROP TABLE shard")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generate_seed.py shards into DuckDB concurrently")
+    parser.add_argument("shards", type=Path, help="Directory written by generate_seed.py with a manifest.json")
+    parser.add_argument("--db", type=Path, required=True, help="DuckDB database file to load into")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, help="Only rows at or after this time")
+    parser.add_argument("--to", dest="end", help="Only rows at or before this time (a bare date covers the day)")
+    parser.add_argument("--entity", action="append", help="Only rows of this entity (repeatable)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="Shards loaded at the same time")
+    parser.add_argument("--replace", action="store_true", help="Drop activity_stream before loading")
+    args = parser.parse_args()
+    if args.end is not None:
+        end = datetime.fromisoformat(args.end)
+        args.end = end.replace(hour=23, minute=59, second=59) if len(args.end) == 10 else end
+    if args.threads < 1:
+        parser.error("--threads must be positive")
+
+    manifest = load_manifest(args.shards)
+    fmt = manifest["format"]
+    if fmt != "sql" and fmt not in SHARD_SELECT:
+        sys.exit(f"Unsupported shard format: {fmt}")
+    shards = select_shards(manifest, args.start, args.end, args.entity)
+    print(f"{len(shards)} of {len(manifest['shards'])} shards needed ({sum(s['rows'] for s in shards):,} rows)")
+
+    con = duckdb.connect(str(args.db))
+    if args.replace:
+        con.execute("DROP TABLE IF EXISTS activity_stream")
+    columns = table_columns(manifest)
+    con.execute(create_table(columns))
+    table = [row[0] for row in con.execute("SELECT name FROM pragma_table_info('activity_stream')").fetchall()]
+    if table != list(columns):
+        sys.exit(f"activity_stream has columns {', '.join(table)}, the shards {', '.join(columns)}; use --replace")
+    if fmt == "arrow":
+        con.execute("INSTALL nanoarrow FROM community")
+        con.execute("LOAD nanoarrow")
+    before = con.execute("SELECT count(*) FROM activity_stream").fetchone()[0]
+    where, params = row_filter(args.start, args.end, args.entity)
+
+    # Each thread appends through its own connection; DuckDB appends don't conflict
+    local = threading.local()
+
+    def load(shard: dict):
+        if not hasattr(local, "con"):
+            local.con = con.cursor()
+            if fmt == "arrow":
+                local.con.execute("LOAD nanoarrow")
+        load_shard(local.con, fmt, args.shards / shard["path"], columns, where, params)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(load, shards))
+    elapsed = time.perf_counter() - started
+
+    loaded = con.execute("SELECT count(*) FROM activity_stream").fetchone()[0] - before
+    rate = f", {loaded / elapsed:,.0f} rows/s" if elapsed > 0 else ""
+    print(f"Loaded {loaded:,} rows into {args.db} in {elapsed:.2f}s ({args.threads} threads{rate})")
+
+
+if __name__ == "__main__":
+    main()
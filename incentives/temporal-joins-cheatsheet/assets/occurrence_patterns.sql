@@ -0,0 +1,434 @@
+-- Temporal join patterns on Activity Schema occurrence columns (DuckDB)
+--
+-- generate_seed.py --occurrence-columns adds two columns to activity_stream:
+--   activity_occurrence   1 for an entity's first event of an activity, 2 for its second, ...
+--   activity_repeated_at  ts of the entity's next event of the same activity (NULL for the latest)
+--
+-- With them, the First/Last patterns need no window function over the stream:
+--   first ever       activity_occurrence = 1
+--   last ever        activity_repeated_at IS NULL
+--   last before t    ts < t AND activity_repeated_at >= t (or NULL)
+--   first after t    the occurrence after the last one at or before t: an
+--                    equality join on activity_occurrence
+--
+-- The queries read a NULL activity_repeated_at as 'infinity' rather than
+-- testing `OR activity_repeated_at IS NULL`: an OR in the join condition
+-- turns DuckDB's hash join on entity into a nested loop join.
+--
+-- Each query returns the same rows as the Fantasy Realm Example of the same
+-- pattern in the cheatsheet (except #4, see there). The Aggregate patterns
+-- sum features of every matching event, so #9-#11 are unchanged; #12 only
+-- pairs its intervals differently.
+--
+-- Load:
+--   uv run generate_seed.py --occurrence-columns -o seed_occurrences.sql
+--   duckdb fantasy.duckdb -c ".read seed_occurrences.sql"
+--
+-- A stream loaded without the columns (such as seed.sql) gets them in one
+-- window pass, paid once instead of in every query:
+--   CREATE OR REPLACE TABLE activity_stream AS
+--   SELECT
+--       *,
+--       ROW_NUMBER() OVER w AS activity_occurrence,
+--       LEAD(ts) OVER w AS activity_repeated_at
+--   FROM activity_stream
+--   WINDOW w AS (PARTITION BY entity, activity ORDER BY ts);
+
+
+-- Pattern #1: First Ever
+-- First item each hero ever picked up
+SELECT
+    entity AS hero,
+    ts AS first_pickup,
+    features->>'item_name' AS item_name,
+    features->>'item_rarity' AS rarity
+FROM activity_stream
+WHERE activity = 'item_pickup'
+  AND activity_occurrence = 1
+ORDER BY ts;
+
+
+-- Pattern #2: First Before
+-- For each quest completion, the first battle fought before it
+WITH quest_completions AS (
+    SELECT
+        entity,
+        ts AS completed_ts,
+        features->>'quest_id' AS quest_id
+    FROM activity_stream
+    WHERE activity = 'quest_completed'
+),
+first_battles AS (
+    SELECT
+        entity,
+        ts,
+        features->>'enemy_type' AS enemy,
+        features->>'location' AS location
+    FROM activity_stream
+    WHERE activity = 'battle_start'
+      AND activity_occurrence = 1
+)
+SELECT
+    qc.entity AS hero,
+    qc.quest_id,
+    qc.completed_ts,
+    b.ts AS first_battle_ts,
+    b.enemy,
+    b.location
+FROM quest_completions qc
+LEFT JOIN first_battles b
+    ON qc.entity = b.entity
+    AND b.ts < qc.completed_ts
+ORDER BY qc.completed_ts
+LIMIT 10;
+
+
+-- Pattern #3: First After
+-- For each dungeon entry, the first item picked up after entering:
+-- the pickup that follows the last one at or before the entry. Only that
+-- pickup's features are read.
+WITH dungeon_entries AS (
+    SELECT
+        entity,
+        ts AS entered_ts,
+        features->>'dungeon_name' AS dungeon
+    FROM activity_stream
+    WHERE activity = 'dungeon_enter'
+),
+pickups AS (
+    SELECT
+        entity,
+        ts,
+        activity_occurrence,
+        COALESCE(activity_repeated_at, 'infinity'::TIMESTAMP) AS next_ts
+    FROM activity_stream
+    WHERE activity = 'item_pickup'
+),
+items AS (
+    SELECT
+        entity,
+        ts,
+        activity_occurrence,
+        features->>'item_name' AS item_name,
+        features->>'item_rarity' AS rarity
+    FROM activity_stream
+    WHERE activity = 'item_pickup'
+),
+previous_items AS (
+    SELECT
+        de.entity,
+        de.dungeon,
+        de.entered_ts,
+        COALESCE(pk.activity_occurrence, 0) AS previous_occurrence
+    FROM dungeon_entries de
+    LEFT JOIN pickups pk
+        ON de.entity = pk.entity
+        AND pk.ts <= de.entered_ts
+        AND pk.next_ts > de.entered_ts
+)
+SELECT
+    p.entity AS hero,
+    p.dungeon,
+    p.entered_ts,
+    i.ts AS first_item_ts,
+    i.item_name,
+    i.rarity
+FROM previous_items p
+LEFT JOIN items i
+    ON p.entity = i.entity
+    AND i.activity_occurrence = p.previous_occurrence + 1
+ORDER BY p.entered_ts
+LIMIT 10;
+
+
+-- Pattern #4: First Between
+-- For each quest lifecycle (accepted → completed), find first battle.
+-- Each acceptance closes at the next completion of its quest, so a hero who
+-- repeats a quest gets one row per attempt; the cheatsheet's example pairs
+-- an acceptance with every later completion of the quest.
+WITH quest_starts AS (
+    SELECT
+        entity,
+        ts AS accepted_ts,
+        features->>'quest_id' AS quest_id,
+        features->>'quest_name' AS quest_name
+    FROM activity_stream
+    WHERE activity = 'quest_accepted'
+),
+quest_ends AS (
+    SELECT
+        entity,
+        ts AS completed_ts,
+        features->>'quest_id' AS quest_id
+    FROM activity_stream
+    WHERE activity = 'quest_completed'
+),
+quest_intervals AS (
+    SELECT
+        qs.entity,
+        qs.quest_name,
+        qs.accepted_ts,
+        MIN(qe.completed_ts) AS completed_ts
+    FROM quest_starts qs
+    JOIN quest_ends qe
+      ON qs.entity = qe.entity
+      AND qs.quest_id = qe.quest_id
+      AND qe.completed_ts > qs.accepted_ts
+    GROUP BY qs.entity, qs.quest_name, qs.accepted_ts
+),
+battle_starts AS (
+    SELECT
+        entity,
+        ts,
+        activity_occurrence,
+        COALESCE(activity_repeated_at, 'infinity'::TIMESTAMP) AS next_ts
+    FROM activity_stream
+    WHERE activity = 'battle_start'
+),
+battles AS (
+    SELECT
+        entity,
+        ts,
+        activity_occurrence,
+        features->>'enemy_type' AS enemy
+    FROM activity_stream
+    WHERE activity = 'battle_start'
+),
+previous_battles AS (
+    SELECT
+        qi.entity,
+        qi.quest_name,
+        qi.accepted_ts,
+        qi.completed_ts,
+        COALESCE(bs.activity_occurrence, 0) AS previous_occurrence
+    FROM quest_intervals qi
+    LEFT JOIN battle_starts bs
+        ON qi.entity = bs.entity
+        AND bs.ts <= qi.accepted_ts
+        AND bs.next_ts > qi.accepted_ts
+)
+SELECT
+    p.entity AS hero,
+    p.quest_name,
+    p.accepted_ts,
+    p.completed_ts,
+    b.ts AS first_battle_ts,
+    b.enemy
+FROM previous_battles p
+LEFT JOIN battles b
+    ON p.entity = b.entity
+    AND b.activity_occurrence = p.previous_occurrence + 1
+    AND b.ts < p.completed_ts
+ORDER BY p.accepted_ts
+LIMIT 10;
+
+
+-- Pattern #5: Last Ever
+-- Most recent level up for each hero
+SELECT
+    entity AS hero,
+    ts AS level_up_time,
+    features->>'new_level' AS level,
+    features->>'class' AS class
+FROM activity_stream
+WHERE activity = 'level_up'
+  AND activity_repeated_at IS NULL
+ORDER BY ts DESC;
+
+
+-- Pattern #6: Last Before
+-- For each battle, the last item picked up before fighting: the pickup
+-- whose next pickup (if any) did not come before the battle
+WITH battles AS (
+    SELECT
+        entity,
+        ts AS battle_ts,
+        features->>'enemy_type' AS enemy,
+        features->>'location' AS location
+    FROM activity_stream
+    WHERE activity = 'battle_start'
+),
+items AS (
+    SELECT
+        entity,
+        ts,
+        COALESCE(activity_repeated_at, 'infinity'::TIMESTAMP) AS next_ts,
+        features->>'item_name' AS item_name
+    FROM activity_stream
+    WHERE activity = 'item_pickup'
+)
+SELECT
+    b.entity AS hero,
+    b.enemy,
+    b.location,
+    b.battle_ts,
+    i.ts AS last_item_ts,
+    i.item_name,
+    EXTRACT(EPOCH FROM (b.battle_ts - i.ts))/60 AS minutes_since_pickup
+FROM battles b
+LEFT JOIN items i
+    ON b.entity = i.entity
+    AND i.ts < b.battle_ts
+    AND i.next_ts >= b.battle_ts
+ORDER BY b.battle_ts
+LIMIT 10;
+
+
+-- Pattern #7: Last After
+-- For each quest accepted, the last battle fought afterward: the hero's
+-- latest battle, if it came after the acceptance
+WITH quests AS (
+    SELECT
+        entity,
+        ts AS accepted_ts,
+        features->>'quest_name' AS quest_name
+    FROM activity_stream
+    WHERE activity = 'quest_accepted'
+),
+last_outcomes AS (
+    SELECT
+        entity,
+        ts,
+        features->>'outcome' AS outcome,
+        features->>'damage_taken' AS damage
+    FROM activity_stream
+    WHERE activity = 'battle_end'
+      AND activity_repeated_at IS NULL
+)
+SELECT
+    q.entity AS hero,
+    q.quest_name,
+    q.accepted_ts,
+    bo.ts AS last_battle_ts,
+    bo.outcome,
+    bo.damage
+FROM quests q
+LEFT JOIN last_outcomes bo
+    ON q.entity = bo.entity
+    AND bo.ts > q.accepted_ts
+ORDER BY q.accepted_ts
+LIMIT 10;
+
+
+-- Pattern #8: Last Between
+-- For each dungeon visit, the last battle before leaving. A hero is in one
+-- dungeon at a time, so the k-th exit closes the k-th entry: visits pair
+-- up on an equality join instead of a range join and a MIN.
+WITH dungeon_enters AS (
+    SELECT
+        entity,
+        ts AS enter_ts,
+        activity_occurrence,
+        features->>'dungeon_name' AS dungeon
+    FROM activity_stream
+    WHERE activity = 'dungeon_enter'
+),
+dungeon_exits AS (
+    SELECT
+        entity,
+        ts AS exit_ts,
+        activity_occurrence
+    FROM activity_stream
+    WHERE activity = 'dungeon_exit'
+),
+visits AS (
+    SELECT
+        de.entity,
+        de.dungeon,
+        de.enter_ts,
+        dx.exit_ts
+    FROM dungeon_enters de
+    JOIN dungeon_exits dx
+      ON de.entity = dx.entity
+      AND dx.activity_occurrence = de.activity_occurrence
+),
+battles AS (
+    SELECT
+        entity,
+        ts,
+        COALESCE(activity_repeated_at, 'infinity'::TIMESTAMP) AS next_ts,
+        features->>'enemy_type' AS enemy,
+        features->>'outcome' AS outcome
+    FROM activity_stream
+    WHERE activity = 'battle_end'
+)
+SELECT
+    v.entity AS hero,
+    v.dungeon,
+    v.enter_ts,
+    v.exit_ts,
+    b.ts AS last_battle_ts,
+    b.enemy,
+    b.outcome
+FROM visits v
+LEFT JOIN battles b
+    ON v.entity = b.entity
+    AND b.ts > v.enter_ts
+    AND b.ts < v.exit_ts
+    AND b.next_ts >= v.exit_ts
+ORDER BY v.enter_ts
+LIMIT 10;
+
+
+-- Pattern #12: Aggregate Between
+-- For each dungeon visit, count battles inside; visits pair up as in #8
+WITH dungeon_enters AS (
+    SELECT
+        entity,
+        ts AS enter_ts,
+        activity_occurrence,
+        features->>'dungeon_name' AS dungeon,
+        features->>'dungeon_tier' AS tier
+    FROM activity_stream
+    WHERE activity = 'dungeon_enter'
+),
+dungeon_exits AS (
+    SELECT
+        entity,
+        ts AS exit_ts,
+        activity_occurrence,
+        (features->>'loot_count')::INT AS loot_count,
+        (features->>'time_spent_minutes')::INT AS time_spent
+    FROM activity_stream
+    WHERE activity = 'dungeon_exit'
+),
+visits AS (
+    SELECT
+        de.entity,
+        de.dungeon,
+        de.tier,
+        de.enter_ts,
+        dx.exit_ts,
+        dx.loot_count,
+        dx.time_spent
+    FROM dungeon_enters de
+    JOIN dungeon_exits dx
+      ON de.entity = dx.entity
+      AND dx.activity_occurrence = de.activity_occurrence
+),
+battles AS (
+    SELECT
+        entity,
+        ts,
+        features->>'outcome' AS outcome
+    FROM activity_stream
+    WHERE activity = 'battle_end'
+)
+SELECT
+    v.entity AS hero,
+    v.dungeon,
+    v.tier,
+    v.enter_ts,
+    v.exit_ts,
+    v.time_spent AS minutes_inside,
+    v.loot_count,
+    COUNT(b.ts) AS battles_fought,
+    SUM(CASE WHEN b.outcome = 'victory' THEN 1 ELSE 0 END) AS victories
+FROM visits v
+LEFT JOIN battles b
+  ON b.entity = v.entity
+  AND b.ts > v.enter_ts
+  AND b.ts < v.exit_ts
+GROUP BY v.entity, v.dungeon, v.tier, v.enter_ts, v.exit_ts, v.time_spent, v.loot_count
+ORDER BY battles_fought DESC
+LIMIT 10;
@@ -0,0 +1,726 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# ///
+"""Reference implementation of the 12 temporal join patterns in Python.
+
+Answers the cheatsheet's questions directly on an activity stream, without
+a database: a fast oracle for cross-checking the SQL on large seeds.
+
+Two engines give the same answers:
+- index: per-(entity, activity) sorted timestamp lists; every Before/After/
+  Between lookup is a binary search, so a pattern costs O(n log n) instead
+  of the nested scan a naive join does.
+- stream: one pass over time-ordered input with per-entity state, for
+  streams too large to index.
+
+Usage:
+    uv run temporal_joins.py seed.sql             # Run the 12 Fantasy Realm examples
+    uv run temporal_joins.py seed.csv --pattern 6 --show 10
+    uv run temporal_joins.py seed.sql --engine stream
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import math
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+# A measure maps an event's features to a number to sum (e.g. xp gained)
+Measure = Callable[[dict], float]
+
+
+class Occurrence(NamedTuple):
+    ts: datetime
+    entity: str
+    features: dict
+
+
+class Interval(NamedTuple):
+    start: Occurrence
+    end: Occurrence
+
+
+@dataclass
+class Aggregate:
+    """COUNT(*) plus a SUM per measure; first/last timestamps for Ever."""
+
+    count: int = 0
+    sums: dict = field(default_factory=dict)
+    first_ts: datetime | None = None
+    last_ts: datetime | None = None
+
+
+# === LOADING ===
+
+# A seed.sql row; generate_seed.py --occurrence-columns adds two values after the features
+SQL_ROW = re.compile(r"^\s*\('([^']*)', '([^']*)', '([^']*)', '(.*?)'(?:, \d+, (?:'[^']*'|NULL))?\)[,;]$")
+
+
+def open_text(path: Path):
+    return gzip.open(path, "rt") if path.suffix == ".gz" else open(path)
+
+
+def load_events(path: Path) -> Iterator[tuple[datetime, str, str, dict]]:
+    """Read (ts, activity, entity, features) from a generate_seed.py output file."""
+    kind = path.name.removesuffix(".gz").rsplit(".", 1)[-1]
+    if kind == "sql":
+        with open_text(path) as f:
+            for line in f:
+                if match := SQL_ROW.match(line):
+                    ts, activity, entity, features = match.groups()
+                    yield datetime.fromisoformat(ts), activity, entity, json.loads(features.replace("''", "'"))
+    elif kind == "csv":
+        with open_text(path) as f:
+            for row in csv.DictReader(f):
+                yield datetime.fromisoformat(row["ts"]), row["activity"], row["entity"], json.loads(row["features"])
+    elif kind in ("parquet", "arrows"):
+        try:
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            sys.exit("Reading Parquet/Arrow needs pyarrow: uv run --with pyarrow temporal_joins.py ...")
+        if kind == "parquet":
+            batches = pyarrow.parquet.ParquetFile(path).iter_batches()
+        else:
+            batches = pyarrow.ipc.open_stream(path)
+        for batch in batches:
+            for row in batch.to_pylist():
+                yield row["ts"], row["activity"], row["entity"], json.loads(row["features"])
+    else:
+        sys.exit(f"Unsupported input: {path} (expected .sql, .csv, .parquet or .arrows)")
+
+
+def events_from_batches(batches: Iterable, entities: list[str]) -> Iterator[tuple[datetime, str, str, dict]]:
+    """Decode generate_seed.EventBatch objects, for in-process use."""
+    for batch in batches:
+        for i in range(len(batch)):
+            yield batch.event(i, entities)
+
+
+# === INDEX ENGINE ===
+
+
+class ActivityIndex:
+    """Per-(entity, activity) occurrence lists sorted by time.
+
+    Building is O(n) for time-ordered input and O(n log n) otherwise; every
+    lookup below is a binary search over one entity's occurrences.
+    """
+
+    def __init__(self, events: Iterable[tuple[datetime, str, str, dict]]):
+        self.ts = defaultdict(list)  # (entity, activity) -> [ts]
+        self.features = defaultdict(list)  # (entity, activity) -> [features]
+        self.entities = {}  # activity -> entities in first-seen order
+        self.prefix_sums = {}
+        self.matches = {}  # (entity, activity, feature) -> {value: [positions]}
+        unsorted = set()
+        for ts, activity, entity, features in events:
+            key = entity, activity
+            times = self.ts[key]
+            if times and ts < times[-1]:
+                unsorted.add(key)
+            times.append(ts)
+            self.features[key].append(features)
+            self.entities.setdefault(activity, {})[entity] = None
+        for key in unsorted:
+            order = sorted(range(len(self.ts[key])), key=self.ts[key].__getitem__)
+            self.ts[key] = [self.ts[key][i] for i in order]
+            self.features[key] = [self.features[key][i] for i in order]
+
+    def occurrences(self, activity: str) -> Iterator[Occurrence]:
+        """Every occurrence of `activity`, entity by entity."""
+        for entity in self.entities.get(activity, ()):
+            key = entity, activity
+            for ts, features in zip(self.ts[key], self.features[key]):
+                yield Occurrence(ts, entity, features)
+
+    def at(self, entity: str, activity: str, i: int) -> Occurrence:
+        key = entity, activity
+        return Occurrence(self.ts[key][i], entity, self.features[key][i])
+
+    def times(self, entity: str, activity: str) -> list[datetime]:
+        return self.ts.get((entity, activity), [])
+
+    # Position lookups: index of the matching occurrence, or None
+
+    def first_before(self, entity: str, activity: str, ts: datetime) -> int | None:
+        times = self.times(entity, activity)
+        return 0 if times and times[0] < ts else None
+
+    def last_before(self, entity: str, activity: str, ts: datetime) -> int | None:
+        i = bisect_left(self.times(entity, activity), ts) - 1
+        return i if i >= 0 else None
+
+    def first_after(self, entity: str, activity: str, ts: datetime) -> int | None:
+        times = self.times(entity, activity)
+        i = bisect_right(times, ts)
+        return i if i < len(times) else None
+
+    def last_after(self, entity: str, activity: str, ts: datetime) -> int | None:
+        times = self.times(entity, activity)
+        return len(times) - 1 if times and times[-1] > ts else None
+
+    def first_between(self, entity: str, activity: str, start: datetime, end: datetime) -> int | None:
+        i = self.first_after(entity, activity, start)
+        return i if i is not None and self.times(entity, activity)[i] < end else None
+
+    def last_between(self, entity: str, activity: str, start: datetime, end: datetime) -> int | None:
+        i = self.last_before(entity, activity, end)
+        return i if i is not None and self.times(entity, activity)[i] > start else None
+
+    def matching(self, entity: str, activity: str, feature: str, value) -> list[int]:
+        """Positions, in time order, of the occurrences whose `feature` equals `value`."""
+        key = entity, activity, feature
+        if key not in self.matches:
+            groups = defaultdict(list)
+            for i, features in enumerate(self.features.get((entity, activity), ())):
+                groups[features.get(feature)].append(i)
+            self.matches[key] = groups
+        return self.matches[key].get(value, [])
+
+    def first_matching_after(self, entity: str, activity: str, feature: str, value, ts: datetime) -> int | None:
+        """Position of the first occurrence after `ts` whose `feature` equals `value`."""
+        positions = self.matching(entity, activity, feature, value)
+        j = bisect_right(positions, ts, key=self.times(entity, activity).__getitem__)
+        return positions[j] if j < len(positions) else None
+
+    # Range aggregates over [lo, hi) positions, via cached prefix sums
+
+    def aggregate(self, entity: str, activity: str, lo: int, hi: int, measures: dict[str, Measure]) -> Aggregate:
+        result = Aggregate(count=max(0, hi - lo))
+        for name, measure in measures.items():
+            prefix = self.prefix(entity, activity, name, measure)
+            result.sums[name] = prefix[hi] - prefix[lo] if hi > lo else 0
+        return result
+
+    def prefix(self, entity: str, activity: str, name: str, measure: Measure) -> list[float]:
+        key = entity, activity, name
+        if key not in self.prefix_sums:
+            sums = [0]
+            for features in self.features.get((entity, activity), ()):
+                sums.append(sums[-1] + measure(features))
+            self.prefix_sums[key] = sums
+        return self.prefix_sums[key]
+
+    def count_range(self, entity: str, activity: str, after: datetime | None, before: datetime | None) -> tuple[int, int]:
+        """Positions [lo, hi) of occurrences strictly after `after` and before `before`."""
+        times = self.times(entity, activity)
+        lo = bisect_right(times, after) if after is not None else 0
+        hi = bisect_left(times, before) if before is not None else len(times)
+        return lo, hi
+
+
+def pair_intervals(
+    index: ActivityIndex, start_activity: str, end_activity: str, match: str | None = None
+) -> list[Interval]:
+    """Pair each start with the first end after it (with equal `match` feature, if given)."""
+    intervals = []
+    for start in index.occurrences(start_activity):
+        if match is None:
+            i = index.first_after(start.entity, end_activity, start.ts)
+        else:
+            i = index.first_matching_after(start.entity, end_activity, match, start.features.get(match), start.ts)
+        if i is not None:
+            intervals.append(Interval(start, index.at(start.entity, end_activity, i)))
+    return intervals
+
+
+# Patterns 1-12 on the index engine
+
+def first_ever(index: ActivityIndex, activity: str) -> list[Occurrence]:
+    """#1: each entity's earliest occurrence of `activity`."""
+    return [index.at(entity, activity, 0) for entity in index.entities.get(activity, ())]
+
+
+def first_before(index: ActivityIndex, cohort: str, append: str) -> list[tuple[Occurrence, Occurrence | None]]:
+    """#2: for each cohort event, the first `append` event before it."""
+    return _lookup(index, cohort, append, index.first_before)
+
+
+def first_after(index: ActivityIndex, cohort: str, append: str) -> list[tuple[Occurrence, Occurrence | None]]:
+    """#3: for each cohort event, the first `append` event after it."""
+    return _lookup(index, cohort, append, index.first_after)
+
+
+def first_between(index: ActivityIndex, intervals: list[Interval], append: str) -> list[tuple[Interval, Occurrence | None]]:
+    """#4: for each interval, the first `append` event strictly inside it."""
+    return _lookup_between(index, intervals, append, index.first_between)
+
+
+def last_ever(index: ActivityIndex, activity: str) -> list[Occurrence]:
+    """#5: each entity's latest occurrence of `activity`."""
+    return [index.at(entity, activity, -1) for entity in index.entities.get(activity, ())]
+
+
+def last_before(index: ActivityIndex, cohort: str, append: str) -> list[tuple[Occurrence, Occurrence | None]]:
+    """#6: for each cohort event, the last `append` event before it."""
+    return _lookup(index, cohort, append, index.last_before)
+
+
+def last_after(index: ActivityIndex, cohort: str, append: str) -> list[tuple[Occurrence, Occurrence | None]]:
+    """#7: for each cohort event, the last `append` event after it."""
+    return _lookup(index, cohort, append, index.last_after)
+
+
+def last_between(index: ActivityIndex, intervals: list[Interval], append: str) -> list[tuple[Interval, Occurrence | None]]:
+    """#8: for each interval, the last `append` event strictly inside it."""
+    return _lookup_between(index, intervals, append, index.last_between)
+
+
+def aggregate_ever(index: ActivityIndex, activity: str, measures: dict[str, Measure] | None = None) -> dict[str, Aggregate]:
+    """#9: per entity, count (and sums) of `activity` over all time."""
+    result = {}
+    for entity in index.entities.get(activity, ()):
+        times = index.times(entity, activity)
+        agg = index.aggregate(entity, activity, 0, len(times), measures or {})
+        agg.first_ts, agg.last_ts = times[0], times[-1]
+        result[entity] = agg
+    return result
+
+
+def aggregate_before(
+    index: ActivityIndex, cohort: str, append: str, measures: dict[str, Measure] | None = None
+) -> list[tuple[Occurrence, Aggregate]]:
+    """#10: for each cohort event, count (and sums) of `append` events before it."""
+    return [
+        (c, index.aggregate(c.entity, append, *index.count_range(c.entity, append, None, c.ts), measures or {}))
+        for c in index.occurrences(cohort)
+    ]
+
+
+def aggregate_after(
+    index: ActivityIndex, cohort: str, append: str, measures: dict[str, Measure] | None = None
+) -> list[tuple[Occurrence, Aggregate]]:
+    """#11: for each cohort event, count (and sums) of `append` events after it."""
+    return [
+        (c, index.aggregate(c.entity, append, *index.count_range(c.entity, append, c.ts, None), measures or {}))
+        for c in index.occurrences(cohort)
+    ]
+
+
+def aggregate_between(
+    index: ActivityIndex, intervals: list[Interval], append: str, measures: dict[str, Measure] | None = None
+) -> list[tuple[Interval, Aggregate]]:
+    """#12: for each interval, count (and sums) of `append` events strictly inside it."""
+    return [
+        (iv, index.aggregate(
+            iv.start.entity, append, *index.count_range(iv.start.entity, append, iv.start.ts, iv.end.ts), measures or {}
+        ))
+        for iv in intervals
+    ]
+
+
+def _lookup(index: ActivityIndex, cohort: str, append: str, find) -> list[tuple[Occurrence, Occurrence | None]]:
+    results = []
+    for c in index.occurrences(cohort):
+        i = find(c.entity, append, c.ts)
+        results.append((c, None if i is None else index.at(c.entity, append, i)))
+    return results
+
+
+def _lookup_between(index: ActivityIndex, intervals: list[Interval], append: str, find) -> list:
+    results = []
+    for iv in intervals:
+        i = find(iv.start.entity, append, iv.start.ts, iv.end.ts)
+        results.append((iv, None if i is None else index.at(iv.start.entity, append, i)))
+    return results
+
+
+# === STREAM ENGINE ===
+
+
+@dataclass
+class _EntityStream:
+    """Per-entity state of a streaming join."""
+
+    first: Occurrence | None = None  # first append, committed (strictly earlier than now)
+    last: Occurrence | None = None  # last append, committed
+    agg: Aggregate = field(default_factory=Aggregate)
+    pending: list = field(default_factory=list)  # appends at the current timestamp
+    waiting: list = field(default_factory=list)  # cohorts awaiting later events
+    open: dict = field(default_factory=dict)  # match value -> [(start, _Inside)] of open intervals
+
+
+@dataclass
+class _Inside:
+    """Appends inside one open interval: only what its summary needs, not the events."""
+
+    first: Occurrence | None = None
+    last: Occurrence | None = None
+    agg: Aggregate = field(default_factory=Aggregate)
+    pending: list = field(default_factory=list)  # appends at the latest timestamp; an end then excludes them
+
+    def add(self, occ: Occurrence, kind: str, measures: dict[str, Measure]):
+        self.settle(occ.ts, kind, measures)
+        if kind != "first" or self.first is None and not self.pending:
+            self.pending.append(occ)
+
+    def settle(self, ts: datetime, kind: str, measures: dict[str, Measure]):
+        """Fold in the appends strictly before `ts`."""
+        if not self.pending or self.pending[0].ts >= ts:
+            return
+        for occ in self.pending:
+            self.first = self.first or occ
+            self.last = occ
+            if kind == "aggregate":
+                _accumulate(self.agg, occ, measures)
+        self.pending.clear()
+
+    def summary(self, kind: str, measures: dict[str, Measure]):
+        if kind == "first":
+            return self.first
+        if kind == "last":
+            return self.last
+        return Aggregate(count=self.agg.count, sums=self.agg.sums or _zero(measures))
+
+
+def stream_join(
+    events: Iterable[tuple[datetime, str, str, dict]],
+    pattern: str,
+    target: str,
+    append: str | None = None,
+    end: str | None = None,
+    match: str | None = None,
+    measures: dict[str, Measure] | None = None,
+) -> list:
+    """Run one pattern in a single pass over time-ordered events.
+
+    `pattern` is one of first/last/aggregate + _ever/_before/_after/_between.
+    Ever patterns read `target` only; Before/After take `target` as the
+    cohort and `append` as the joined activity; Between patterns open an
+    interval at `target`, close it at the next `end` (with equal `match`
+    feature, if given) and join `append` events inside. Results have the
+    same shape as the index engine's, with cohorts in stream order.
+    """
+    kind, position = pattern.split("_")
+    measures = measures or {}
+    state = defaultdict(_EntityStream)
+    results = []
+    last_ts = None
+
+    def commit(s: _EntityStream):
+        """Fold appends seen at an earlier timestamp into the running state."""
+        for occ in s.pending:
+            s.first = s.first or occ
+            s.last = occ
+            _accumulate(s.agg, occ, measures)
+        s.pending.clear()
+
+    for ts, activity, entity, features in events:
+        if last_ts is not None and ts < last_ts:
+            raise ValueError(f"stream engine needs time-ordered input ({ts} after {last_ts})")
+        last_ts = ts
+        occ = Occurrence(ts, entity, features)
+        s = state[entity]
+        if s.pending and s.pending[0].ts < ts:
+            commit(s)
+
+        if position == "ever":
+            if activity == target:
+                s.pending.append(occ)
+            continue
+
+        if position == "before":
+            if activity == target:
+                if kind == "first":
+                    results.append((occ, s.first))
+                elif kind == "last":
+                    results.append((occ, s.last))
+                else:
+                    results.append((occ, Aggregate(count=s.agg.count, sums=dict(s.agg.sums) or _zero(measures))))
+            if activity == append:
+                s.pending.append(occ)
+
+        elif position == "after":
+            # First resolves at the next later append; last and aggregate at
+            # the end of the stream, from the entity's final state
+            if activity == append:
+                if kind == "first":
+                    for entry in s.waiting:
+                        if entry[0].ts < ts:
+                            entry[1] = occ
+                    s.waiting = [entry for entry in s.waiting if entry[1] is None]
+                s.pending.append(occ)
+            if activity == target:
+                if kind == "first":
+                    entry = [occ, None]
+                    s.waiting.append(entry)
+                else:
+                    seen = Aggregate(count=s.agg.count, sums=dict(s.agg.sums) or _zero(measures))
+                    for earlier in s.pending:
+                        _accumulate(seen, earlier, measures)
+                    entry = [occ, seen]
+                results.append(entry)
+
+        elif position == "between":
+            # Open intervals are keyed by their match value, so an end only
+            # looks at the intervals it can close
+            if activity == append:
+                for intervals in s.open.values():
+                    for start, inside in intervals:
+                        if start.ts < ts:
+                            inside.add(occ, kind, measures)
+            if activity == end:
+                value = None if match is None else features.get(match)
+                intervals = s.open.get(value, [])
+                for start, inside in intervals:
+                    if start.ts < ts:
+                        inside.settle(ts, kind, measures)
+                        results.append((Interval(start, occ), inside.summary(kind, measures)))
+                still_open = [(start, inside) for start, inside in intervals if start.ts >= ts]
+                if still_open:
+                    s.open[value] = still_open
+                else:
+                    s.open.pop(value, None)
+            if activity == target:
+                value = None if match is None else features.get(match)
+                s.open.setdefault(value, []).append((occ, _Inside()))
+
+    if position == "ever":
+        summary = {}
+        for entity, s in state.items():
+            commit(s)
+            if s.first is None:
+                continue
+            if kind == "first":
+                results.append(s.first)
+            elif kind == "last":
+                results.append(s.last)
+            else:
+                s.agg.first_ts, s.agg.last_ts = s.first.ts, s.last.ts
+                summary[entity] = s.agg
+        return summary if kind == "aggregate" else results
+
+    if position == "after":
+        for s in state.values():
+            commit(s)
+        resolved = []
+        for cohort, value in results:
+            if kind == "aggregate":
+                final = state[cohort.entity].agg
+                value = Aggregate(
+                    count=final.count - value.count,
+                    sums={name: final.sums.get(name, 0) - value.sums.get(name, 0) for name in measures},
+                )
+            elif kind == "last":
+                last = state[cohort.entity].last
+                value = last if last is not None and last.ts > cohort.ts else None
+            resolved.append((cohort, value))
+        return resolved
+
+    if position == "between":
+        # Intervals are reported when they close; restore start order
+        results.sort(key=lambda r: r[0].start.ts)
+    return results
+
+
+def _accumulate(agg: Aggregate, occ: Occurrence, measures: dict[str, Measure]):
+    agg.count += 1
+    for name, measure in measures.items():
+        agg.sums[name] = agg.sums.get(name, 0) + measure(occ.features)
+
+
+def _zero(measures: dict[str, Measure]) -> dict:
+    return {name: 0 for name in measures}
+
+
+# === FANTASY REALM EXAMPLES ===
+# The cheatsheet's example queries, without ORDER BY/LIMIT. Each returns rows
+# of plain values shaped like the SQL result, so they can be diffed against it.
+
+
+def _f(occ: Occurrence | None, key: str):
+    return None if occ is None else occ.features.get(key)
+
+
+def _ts(occ: Occurrence | None):
+    return None if occ is None else occ.ts
+
+
+def example_1(index: ActivityIndex) -> list[tuple]:
+    return [(o.entity, o.ts, _f(o, "item_name"), _f(o, "item_rarity")) for o in first_ever(index, "item_pickup")]
+
+
+def example_2(index: ActivityIndex) -> list[tuple]:
+    return [
+        (c.entity, _f(c, "quest_id"), c.ts, _ts(b), _f(b, "enemy_type"), _f(b, "location"))
+        for c, b in first_before(index, "quest_completed", "battle_start")
+    ]
+
+
+def example_3(index: ActivityIndex) -> list[tuple]:
+    return [
+        (c.entity, _f(c, "dungeon_name"), c.ts, _ts(i), _f(i, "item_name"), _f(i, "item_rarity"))
+        for c, i in first_after(index, "dungeon_enter", "item_pickup")
+    ]
+
+
+def example_4(index: ActivityIndex) -> list[tuple]:
+    # The SQL joins each acceptance with every later completion of the same
+    # quest and ranks battles per acceptance: the first battle after the
+    # acceptance counts if it precedes the last such completion. When the
+    # quest was completed more than once, every completion after that battle
+    # ties for rank 1 and ROW_NUMBER keeps any one of them; this keeps the
+    # first, so only completed_ts of such acceptances can differ.
+    rows = []
+    for accepted in index.occurrences("quest_accepted"):
+        entity, quest = accepted.entity, _f(accepted, "quest_id")
+        times = index.times(entity, "quest_completed")
+        completions = index.matching(entity, "quest_completed", "quest_id", quest)
+        if not completions or times[completions[-1]] <= accepted.ts:
+            continue
+        i = index.first_between(entity, "battle_start", accepted.ts, times[completions[-1]])
+        battle = None if i is None else index.at(entity, "battle_start", i)
+        # The first completion after the battle, or after the acceptance when there was none
+        j = index.first_matching_after(entity, "quest_completed", "quest_id", quest, _ts(battle) or accepted.ts)
+        completed = times[j]
+        rows.append((entity, _f(accepted, "quest_name"), accepted.ts, completed, _ts(battle), _f(battle, "enemy_type")))
+    return rows
+
+
+def example_5(index: ActivityIndex) -> list[tuple]:
+    return [(o.entity, o.ts, str(_f(o, "new_level")), _f(o, "class")) for o in last_ever(index, "level_up")]
+
+
+def example_6(index: ActivityIndex) -> list[tuple]:
+    return [
+        (
+            c.entity, _f(c, "enemy_type"), _f(c, "location"), c.ts, _ts(i), _f(i, "item_name"),
+            None if i is None else (c.ts - i.ts).total_seconds() / 60,
+        )
+        for c, i in last_before(index, "battle_start", "item_pickup")
+    ]
+
+
+def example_7(index: ActivityIndex) -> list[tuple]:
+    return [
+        (c.entity, _f(c, "quest_name"), c.ts, _ts(b), _f(b, "outcome"), None if b is None else str(_f(b, "damage_taken")))
+        for c, b in last_after(index, "quest_accepted", "battle_end")
+    ]
+
+
+def example_8(index: ActivityIndex) -> list[tuple]:
+    intervals = pair_intervals(index, "dungeon_enter", "dungeon_exit")
+    return [
+        (iv.start.entity, _f(iv.start, "dungeon_name"), iv.start.ts, iv.end.ts, _ts(b), _f(b, "enemy_type"), _f(b, "outcome"))
+        for iv, b in last_between(index, intervals, "battle_end")
+    ]
+
+
+def example_9(index: ActivityIndex) -> list[tuple]:
+    measures = {
+        "victories": lambda f: f.get("outcome") == "victory",
+        "retreats": lambda f: f.get("outcome") == "retreat",
+        "damage": lambda f: f.get("damage_taken", 0),
+    }
+    rows = []
+    for entity, agg in aggregate_ever(index, "battle_end", measures).items():
+        win_rate = math.floor(1000.0 * agg.sums["victories"] / agg.count + 0.5) / 10  # SQL ROUND: half up
+        rows.append((
+            entity, agg.count, agg.sums["victories"], agg.sums["retreats"], win_rate,
+            agg.sums["damage"] / agg.count, agg.first_ts, agg.last_ts,
+        ))
+    return rows
+
+
+def example_10(index: ActivityIndex) -> list[tuple]:
+    return [
+        (c.entity, str(_f(c, "new_level")), _f(c, "class"), c.ts, agg.count, agg.sums["xp"])
+        for c, agg in aggregate_before(index, "level_up", "quest_completed", {"xp": lambda f: f["xp_gained"]})
+    ]
+
+
+def example_11(index: ActivityIndex) -> list[tuple]:
+    rare = {"rare_items": lambda f: f["item_rarity"] in ("rare", "epic")}
+    return [
+        (c.entity, _f(c, "quest_name"), _f(c, "difficulty"), c.ts, agg.count, agg.sums["rare_items"])
+        for c, agg in aggregate_after(index, "quest_accepted", "item_pickup", rare)
+    ]
+
+
+def example_12(index: ActivityIndex) -> list[tuple]:
+    intervals = pair_intervals(index, "dungeon_enter", "dungeon_exit")
+    victories = {"victories": lambda f: f["outcome"] == "victory"}
+    return [
+        (
+            iv.start.entity, _f(iv.start, "dungeon_name"), str(_f(iv.start, "dungeon_tier")),
+            iv.start.ts, iv.end.ts, _f(iv.end, "time_spent_minutes"), _f(iv.end, "loot_count"),
+            agg.count, agg.sums["victories"],
+        )
+        for iv, agg in aggregate_between(index, intervals, "battle_end", victories)
+    ]
+
+
+EXAMPLES = {
+    1: ("First Ever", example_1),
+    2: ("First Before", example_2),
+    3: ("First After", example_3),
+    4: ("First Between", example_4),
+    5: ("Last Ever", example_5),
+    6: ("Last Before", example_6),
+    7: ("Last After", example_7),
+    8: ("Last Between", example_8),
+    9: ("Aggregate Ever", example_9),
+    10: ("Aggregate Before", example_10),
+    11: ("Aggregate After", example_11),
+    12: ("Aggregate Between", example_12),
+}
+
+# The generic join behind each example, for the stream engine:
+# (pattern, target, append, end, match). Intervals close at the next matching
+# end, so #4 can differ from the SQL when a hero repeats a quest.
+STREAM_EXAMPLES = {
+    1: ("first_ever", "item_pickup", None, None, None),
+    2: ("first_before", "quest_completed", "battle_start", None, None),
+    3: ("first_after", "dungeon_enter", "item_pickup", None, None),
+    4: ("first_between", "quest_accepted", "battle_start", "quest_completed", "quest_id"),
+    5: ("last_ever", "level_up", None, None, None),
+    6: ("last_before", "battle_start", "item_pickup", None, None),
+    7: ("last_after", "quest_accepted", "battle_end", None, None),
+    8: ("last_between", "dungeon_enter", "battle_end", "dungeon_exit", None),
+    9: ("aggregate_ever", "battle_end", None, None, None),
+    10: ("aggregate_before", "level_up", "quest_completed", None, None),
+    11: ("aggregate_after", "quest_accepted", "item_pickup", None, None),
+    12: ("aggregate_between", "dungeon_enter", "battle_end", "dungeon_exit", None),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the cheatsheet's temporal join patterns in Python")
+    parser.add_argument("input", type=Path, help="generate_seed.py output (.sql, .csv, .parquet, .arrows; .gz ok)")
+    parser.add_argument("--pattern", type=int, choices=EXAMPLES, action="append", help="Pattern number (repeatable)")
+    parser.add_argument("--engine", choices=["index", "stream"], default="index", help="Lookup engine")
+    parser.add_argument("--show", type=int, default=0, help="Print the first N result rows of each pattern")
+    args = parser.parse_args()
+    patterns = args.pattern or list(EXAMPLES)
+
+    started = time.perf_counter()
+    if args.engine == "index":
+        index = ActivityIndex(load_events(args.input))
+        print(f"Indexed {args.input} in {time.perf_counter() - started:.2f}s")
+    for number in patterns:
+        name, example = EXAMPLES[number]
+        started = time.perf_counter()
+        if args.engine == "index":
+            rows = example(index)
+        else:
+            pattern, target, append, end, match = STREAM_EXAMPLES[number]
+            rows = stream_join(load_events(args.input), pattern, target, append, end, match)
+        elapsed = time.perf_counter() - started
+        print(f"#{number:<2} {name:<18} {len(rows):>9} rows  {elapsed:8.3f}s")
+        for row in list(rows.items() if isinstance(rows, dict) else rows)[:args.show]:
+            print(f"      {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""Benchmarks for the temporal-joins cheatsheet seed generator.
+
+Usage:
+    ./scripts/bench_seed.py memory                  # Bytes per event, 200k events
+    ./scripts/bench_seed.py memory --events 1000000
+    ./scripts/bench_seed.py simulate                # Simulator cost per event
+    ./scripts/bench_seed.py simulate --baseline 763dab7^   # ...against the generator at a git revision
+"""
+
+import argparse
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GENERATOR = PROJECT_ROOT / "incentives" / "temporal-joins-cheatsheet" / "assets" / "generate_seed.py"
+
+
+def load_generator(path: Path = GENERATOR, name: str = "generate_seed"):
+    """Import generate_seed.py, which lives outside any package."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class LegacyEvent:
+    """The per-event representation EventBatch replaced."""
+
+    ts: datetime
+    activity: str
+    entity: str
+    features: dict
+
+
+def load_baseline(revision: str, scratch: Path):
+    """Import generate_seed.py as it was at a git revision."""
+    relative = GENERATOR.relative_to(PROJECT_ROOT).as_posix()
+    try:
+        source = subprocess.run(
+            ["git", "show", f"{revision}:{relative}"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+    except subprocess.CalledProcessError as e:
+        sys.exit(f"Cannot read {relative} at {revision}: {e.stderr.strip()}")
+    path = scratch / "generate_seed_baseline.py"
+    path.write_text(source)
+    return load_generator(path, "generate_seed_baseline")
+
+
+def simulate(gen, events: int):
+    """Simulate heroes into one EventBatch until it holds about `events` rows."""
+    roster = gen.build_roster(max(1, events // 200))
+    batch = gen.EventBatch()
+    for entity, hero in enumerate(roster):
+        gen.generate_hero_journey(
+            hero, gen.hero_rng(gen.DEFAULT_SEED, hero), gen.START_DATE, gen.END_DATE, 200,
+            events=batch, entity=entity,
+        )
+    return batch, [h["id"] for h in roster]
+
+
+def traced(build):
+    """Return what `build()` returns and the bytes it left allocated."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def bench_memory(events: int) -> None:
+    gen = load_generator()
+    batch, entities = simulate(gen, events)
+    n = len(batch)
+
+    def columnar():
+        copy = gen.EventBatch()
+        for i in range(n):
+            copy.append_from(batch, i)
+        return copy
+
+    def legacy():
+        return [LegacyEvent(*batch.event(i, entities)) for i in range(n)]
+
+    _, columnar_bytes = traced(columnar)
+    _, legacy_bytes = traced(legacy)
+
+    print(f"Events: {n}")
+    print(f"  {'representation':<28} {'total MB':>10} {'bytes/event':>12}")
+    for name, nbytes in [("list[Event] (dataclass)", legacy_bytes), ("EventBatch (columnar)", columnar_bytes)]:
+        print(f"  {name:<28} {nbytes / 1e6:>10.1f} {nbytes / n:>12.1f}")
+    print(f"  reduction: {legacy_bytes / columnar_bytes:.1f}x")
+
+
+def best_simulate(gen, events: int, repeat: int) -> tuple[float, int]:
+    """Fastest of `repeat` simulations, in seconds, and the events it produced."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        batch, _ = simulate(gen, events)
+        best = min(best, time.perf_counter() - started)
+    return best, len(batch)
+
+
+def bench_simulate(events: int, repeat: int, baseline: str | None) -> None:
+    runs = [("current", load_generator())]
+    with tempfile.TemporaryDirectory() as scratch:
+        if baseline is not None:
+            runs.insert(0, (baseline, load_baseline(baseline, Path(scratch))))
+        results = [(label, *best_simulate(gen, events, repeat)) for label, gen in runs]
+
+    print(f"Events: {results[-1][2]} (best of {repeat})")
+    print(f"  {'generator':<16} {'total s':>8} {'us/event':>9} {'events/s':>10}")
+    for label, best, n in results:
+        print(f"  {label:<16} {best:>8.2f} {best / n * 1e6:>9.2f} {n / best:>10,.0f}")
+    if baseline is not None:
+        (_, before, before_n), (_, after, after_n) = results
+        if before_n != after_n:
+            print(f"  note: the generators produced different event counts ({before_n} vs {after_n})")
+        print(f"  speedup: {(before / before_n) / (after / after_n):.2f}x per event")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the seed generator")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    memory = sub.add_parser("memory", help="Bytes per event: EventBatch vs list of Event dataclasses")
+    memory.add_argument("--events", type=int, default=200_000, help="Approximate number of events")
+    simulate_cmd = sub.add_parser("simulate", help="Single-process simulator throughput")
+    simulate_cmd.add_argument("--events", type=int, default=200_000, help="Approximate number of events")
+    simulate_cmd.add_argument("--repeat", type=int, default=3, help="Runs to take the best of")
+    simulate_cmd.add_argument("--baseline", metavar="REV", help="Also time generate_seed.py at this git revision")
+    args = parser.parse_args()
+
+    if args.bench == "memory":
+        bench_memory(args.events)
+    elif args.bench == "simulate":
+        bench_simulate(args.events, args.repeat, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
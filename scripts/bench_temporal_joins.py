@@ -0,0 +1,281 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["duckdb"]
+# ///
+"""Scale benchmark for the temporal-joins cheatsheet's pattern queries.
+
+Runs every "Fantasy Realm Example" query from content.md against seeds of
+increasing size and reports cold/warm time, rows returned and peak memory,
+so queries whose cost grows faster than the data are caught before they ship.
+
+Usage:
+    ./scripts/bench_temporal_joins.py                        # 300, 100k, 1M events
+    ./scripts/bench_temporal_joins.py --scales 300 100k 1M 10M
+    ./scripts/bench_temporal_joins.py --baseline dist/bench/baseline.json
+    cp dist/bench/report.json dist/bench/baseline.json      # Accept a run as the new baseline
+"""
+
+import argparse
+import json
+import math
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CHEATSHEET = PROJECT_ROOT / "incentives" / "temporal-joins-cheatsheet"
+GENERATOR = CHEATSHEET / "assets" / "generate_seed.py"
+BENCH_DIR = PROJECT_ROOT / "dist" / "bench"
+
+# Every simulated hero emits events_per_hero events over the default window
+EVENTS_PER_HERO = 60
+SCALE_SUFFIXES = {"k": 1_000, "M": 1_000_000}
+
+# Flags in the comparison table
+SUPERLINEAR_EXPONENT = 1.5
+REGRESSION_RATIO = 1.25
+NOISE_FLOOR_S = 0.05  # Timings below this are too noisy to flag
+
+LOAD_CSV = """
+CREATE TABLE activity_stream AS
+SELECT ts, activity, entity, features::JSON AS features
+FROM read_csv('{path}', header = true,
+    columns = {{'ts': 'TIMESTAMP', 'activity': 'VARCHAR', 'entity': 'VARCHAR', 'features': 'VARCHAR'}});
+"""
+
+
+def parse_scale(value: str) -> int:
+    """'300', '100k', '1M' -> number of events."""
+    suffix = value[-1:]
+    if suffix in SCALE_SUFFIXES:
+        return int(float(value[:-1]) * SCALE_SUFFIXES[suffix])
+    return int(value)
+
+
+def extract_queries(markdown: Path) -> list[dict]:
+    """Pull each pattern's Fantasy Realm Example SQL block out of the cheatsheet."""
+    queries = []
+    for section in re.split(r"^## (?=Pattern #)", markdown.read_text(), flags=re.M)[1:]:
+        heading = re.match(r"Pattern #(\d+): (.+)", section)
+        example = re.search(r"^### Fantasy Realm Example\s.*?```sql\n(.*?)```", section, flags=re.M | re.S)
+        if heading and example:
+            queries.append({"pattern": int(heading[1]), "name": heading[2].strip(), "sql": example[1]})
+    if not queries:
+        sys.exit(f"No Fantasy Realm Example queries found in {markdown}")
+    return queries
+
+
+def ensure_seed(events: int, seed: int, engine: str, data_dir: Path) -> tuple[Path, int]:
+    """Generate (or reuse) a CSV seed of about `events` events; return its path and hero count."""
+    heroes = max(1, events // EVENTS_PER_HERO)
+    path = data_dir / f"seed-{heroes}h-{seed}-{engine}.csv"
+    if not path.exists() or path.stat().st_mtime < GENERATOR.stat().st_mtime:
+        print(f"Generating {path.name} ({heroes} heroes)...")
+        cmd = [
+            sys.executable, str(GENERATOR), "--heroes", str(heroes), "--seed", str(seed),
+            "--streams", "per-hero", "--workers", "0", "--engine", engine,
+            "--format", "csv", "-o", str(path), "--tmp-dir", str(data_dir),
+        ]
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    return path, heroes
+
+
+def load_database(seed_path: Path) -> tuple[Path, int, float]:
+    """Load a seed into its own DuckDB file; return the path, row count and load time."""
+    import duckdb
+
+    db_path = seed_path.with_suffix(".duckdb")
+    db_path.unlink(missing_ok=True)
+    started = time.perf_counter()
+    with duckdb.connect(str(db_path)) as con:
+        con.execute(LOAD_CSV.format(path=seed_path))
+        count = con.execute("SELECT COUNT(*) FROM activity_stream").fetchone()[0]
+    return db_path, count, time.perf_counter() - started
+
+
+def run_query(db_path: str, sql: str, warm_runs: int) -> dict:
+    """Time one query on a fresh connection: a cold run, then warm repeats.
+
+    Runs in its own process (see `measure`), so ru_maxrss is this query's peak.
+    """
+    import duckdb
+
+    con = duckdb.connect(db_path, read_only=True)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    rows = len(con.execute(sql).fetchall())
+    cold = time.perf_counter() - started
+    warm = []
+    for _ in range(warm_runs):
+        started = time.perf_counter()
+        con.execute(sql).fetchall()
+        warm.append(time.perf_counter() - started)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "rows": rows,
+        "cold_s": cold,
+        "warm_s": sorted(warm)[len(warm) // 2] if warm else None,
+        "peak_rss_mb": peak_kb / 1024,
+        "query_rss_mb": (peak_kb - baseline_kb) / 1024,
+    }
+
+
+def measure(db_path: Path, sql: str, warm_runs: int, timeout: float) -> dict:
+    """Run `run_query` in a child process so memory and caches start cold."""
+    cmd = [sys.executable, __file__, "_query", str(db_path), "--warm", str(warm_runs)]
+    try:
+        result = subprocess.run(cmd, input=sql, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout after {timeout:.0f}s"}
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout)
+
+
+def growth_exponent(scales: list[dict], pattern: int, metric: str = "warm_s") -> float | None:
+    """Slope of log(time) over log(events) between the two largest scales: ~1 linear, ~2 quadratic."""
+    points = []
+    for scale in scales:
+        result = next((r for r in scale["patterns"] if r["pattern"] == pattern), {})
+        if result.get(metric):
+            points.append((scale["events"], result[metric]))
+    if len(points) < 2:
+        return None
+    (n1, t1), (n2, t2) = points[-2], points[-1]
+    if n2 <= n1 or t1 <= 0 or t2 < NOISE_FLOOR_S:
+        return None
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def format_seconds(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value * 1000:.1f}ms" if value < 1 else f"{value:.2f}s"
+
+
+def print_table(report: dict, baseline: dict | None) -> bool:
+    """Print per-pattern warm times per scale; return False if anything regressed."""
+    scales = report["scales"]
+    base_scales = {s["name"]: s for s in baseline["scales"]} if baseline else {}
+    ok = True
+
+    header = f"{'pattern':<22}" + "".join(f"{s['name']:>12}" for s in scales) + f"{'growth':>8}"
+    if baseline:
+        header += f"  {'vs baseline (largest)':>22}"
+    print(f"\nWarm time per pattern\n{header}")
+    for query in report["queries"]:
+        n = query["pattern"]
+        line = f"#{n:<2} {query['name']:<18}"
+        for scale in scales:
+            result = next(r for r in scale["patterns"] if r["pattern"] == n)
+            line += f"{result.get('error', format_seconds(result.get('warm_s')))[:11]:>12}"
+        exponent = growth_exponent(scales, n)
+        flag = ""
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            flag, ok = " !", False
+        line += f"{'-' if exponent is None else f'n^{exponent:.1f}':>8}{flag}"
+        if baseline:
+            largest = scales[-1]
+            current = next(r for r in largest["patterns"] if r["pattern"] == n).get("warm_s")
+            previous = next(
+                (r.get("warm_s") for r in base_scales.get(largest["name"], {}).get("patterns", []) if r["pattern"] == n),
+                None,
+            )
+            if current and previous:
+                ratio = current / previous
+                regressed = ratio > REGRESSION_RATIO and current - previous > NOISE_FLOOR_S
+                marker = " REGRESSED" if regressed else ""
+                ok = ok and not marker
+                line += f"  {format_seconds(previous):>10} {ratio:>6.2f}x{marker}"
+            else:
+                line += f"  {'-':>22}"
+        print(line)
+
+    print(f"\n{'scale':<8}{'events':>12}{'load':>10}{'peak RSS (max)':>16}")
+    for scale in scales:
+        peak = max((r.get("peak_rss_mb", 0) for r in scale["patterns"]), default=0)
+        print(f"{scale['name']:<8}{scale['events']:>12,}{format_seconds(scale['load_s']):>10}{peak:>13.0f} MB")
+    if not ok:
+        print(f"\n! grows faster than n^{SUPERLINEAR_EXPONENT} or is {REGRESSION_RATIO}x slower than the baseline")
+    return ok
+
+
+def bench(args: argparse.Namespace) -> None:
+    import duckdb
+
+    queries = extract_queries(args.cheatsheet)
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "duckdb": duckdb.__version__,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "seed": args.seed,
+        "warm_runs": args.warm,
+        "queries": [{k: q[k] for k in ("pattern", "name")} for q in queries],
+        "scales": [],
+    }
+
+    for name in args.scales:
+        seed_path, heroes = ensure_seed(parse_scale(name), args.seed, args.engine, args.data_dir)
+        db_path, events, load_s = load_database(seed_path)
+        print(f"Scale {name}: {events:,} events, loaded in {format_seconds(load_s)}")
+        scale = {"name": name, "events": events, "heroes": heroes, "load_s": load_s, "patterns": []}
+        for query in queries:
+            result = measure(db_path, query["sql"], args.warm, args.timeout)
+            scale["patterns"].append({"pattern": query["pattern"], "name": query["name"], **result})
+            status = result.get("error") or (
+                f"cold {format_seconds(result['cold_s'])}, warm {format_seconds(result['warm_s'])}, "
+                f"{result['rows']} rows, {result['peak_rss_mb']:.0f} MB"
+            )
+            print(f"  #{query['pattern']:<2} {query['name']:<18} {status}")
+        report["scales"].append(scale)
+        if not args.keep_db:
+            db_path.unlink(missing_ok=True)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nReport: {args.output}")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    if not print_table(report, baseline) and args.strict:
+        sys.exit(1)
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["_query"]:
+        # Child process entry point for `measure`
+        parser = argparse.ArgumentParser()
+        parser.add_argument("db_path")
+        parser.add_argument("--warm", type=int, default=3)
+        args = parser.parse_args(sys.argv[2:])
+        print(json.dumps(run_query(args.db_path, sys.stdin.read(), args.warm)))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the cheatsheet's pattern queries at several scales")
+    parser.add_argument("--scales", nargs="+", default=["300", "100k", "1M"],
+                        help="Seed sizes in events, e.g. 300 100k 1M 10M")
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python",
+                        help="generate_seed.py engine (numpy is much faster for 10M)")
+    parser.add_argument("--warm", type=int, default=3, help="Warm runs per query (median is reported)")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a query is abandoned")
+    parser.add_argument("--cheatsheet", type=Path, default=CHEATSHEET / "content.md", help="Markdown to extract queries from")
+    parser.add_argument("--data-dir", type=Path, default=BENCH_DIR, help="Where seeds and databases are kept")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the DuckDB files after the run")
+    parser.add_argument("-o", "--output", type=Path, default=BENCH_DIR / "report.json", help="JSON report path")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 on superlinear growth or a regression")
+    args = parser.parse_args()
+
+    bench(args)
+
+
+if __name__ == "__main__":
+    main()
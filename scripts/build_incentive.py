@@ -1,118 +1,1415 @@
 #!/usr/bin/env -S uv run --script
 # /// script
-# dependencies = []
+# dependencies = ["pillow"]
 # ///
 """Build incentive PDFs from markdown content.
 
+Each stage (HTML, PDF, assets zip) is skipped when the content hashes of its
+inputs match the build manifest in dist/. Images are downscaled to print
+resolution and recompressed losslessly before rendering, cached in dist/.cache.
+assets.zip is byte-stable: fixed entry order, timestamps and modes, with
+unchanged entries copied from the previous archive without recompressing
+when that archive was written by the same zip writer and deflate level.
+
 Usage:
     ./scripts/build_incentive.py --all          # Build all incentives
     ./scripts/build_incentive.py <name>         # Build single incentive
+    ./scripts/build_incentive.py --all --explain  # Say why each stage rebuilt
+    ./scripts/build_incentive.py <name> --force   # Rebuild every stage
+    ./scripts/build_incentive.py --all --jobs 4   # Build four incentives at a time
+    ./scripts/build_incentive.py --all --renderer warm  # Reuse long-lived containers
+    ./scripts/build_incentive.py --stop-renderers       # Remove the warm containers
+    ./scripts/build_incentive.py <name> --keep-html     # Keep the intermediate HTML for debugging
+    ./scripts/build_incentive.py <name> --image-dpi 200 # Lower print resolution for images
+    ./scripts/build_incentive.py <name> --watch         # Rebuild affected stages on every save
+    ./scripts/build_incentive.py --all --trace          # Time every stage, compare with earlier builds
+
+Renderers:
+    docker  one-shot `docker run --rm` per stage (the default without local tools)
+    warm    long-lived pandoc/weasyprint containers, jobs sent with `docker exec`
+    local   pandoc/weasyprint binaries on PATH (picked by `auto` when both exist)
+
+Tracing:
+    --trace writes dist/build-trace.json (Chrome trace events: open it in
+    ui.perfetto.dev or chrome://tracing), prints a per-incentive table of step
+    times, cache hits and output sizes, and appends the build to
+    dist/build-history.jsonl, comparing it with the last build of the same
+    incentives that ran the same stages.
 """
 
 import argparse
+import ctypes
+import ctypes.util
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import re
+import select
+import shutil
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
 
+PANDOC_IMAGE = "pandoc/extra"
+WEASYPRINT_IMAGE = "minidocks/weasyprint:latest"
+CSS_FILE = Path("assets/pdf/kozlovski-pdf.css")
+MANIFEST_VERSION = 1
+OUTPUT_DIR = Path("dist")
+FAKE_OUTPUT_DIR = OUTPUT_DIR / "fake-runtime"  # --fake-runtime builds never mix with real ones
+IGNORED_PARTS = {"__pycache__", ".DS_Store"}
+MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\(\s*<?([^)\s>]+)")
 
-def run_docker(cmd: list[str]) -> None:
-    """Run a Docker command."""
-    print(f"  $ {' '.join(cmd)}")
-    result = subprocess.run(cmd)
-    if result.returncode != 0:
-        sys.exit(result.returncode)
+# assets.zip: stored entries for formats deflate cannot shrink further
+STORED_SUFFIXES = {
+    ".7z", ".bz2", ".gif", ".gz", ".jpeg", ".jpg", ".parquet", ".pdf", ".png", ".tgz", ".webp", ".xz", ".zip", ".zst",
+}
+ZIP_DEFLATE_LEVEL = 9
+ZIP_DOS_DATE = (1 << 5) | 1  # 1980-01-01, the earliest zip timestamp, 00:00:00
+PARALLEL_ZIP_BYTES = 1 << 20  # Files from this size compress on the thread pool
+ZIP_WRITER_VERSION = 1  # Bump when zip_entry/zip_bytes change the bytes they write
+# Stored as the archive comment: compressed entries are only reused from an
+# archive this writer made at this deflate level
+ZIP_WRITER = f"build_incentive.py zip v{ZIP_WRITER_VERSION} deflate={ZIP_DEFLATE_LEVEL}"
 
+# A4 (21cm) less the 2cm left and right @page margins of CSS_FILE
+PRINT_WIDTH_IN = 17 / 2.54
+DEFAULT_IMAGE_DPI = 300
+IMAGE_CACHE_VERSION = 1  # Bump when optimize_image changes its output
+OPTIMIZED_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}  # Others (SVG, GIF, ...) are copied as they are
 
-def build_incentive(name: str, project_root: Path) -> None:
-    """Build a single incentive: markdown -> html -> pdf, zip assets."""
-    incentive_dir = project_root / "incentives" / name
-    dist_dir = project_root / "dist" / "incentives" / name
-    dist_dir.mkdir(parents=True, exist_ok=True)
+# Serialises printing of whole per-incentive blocks
+OUTPUT_LOCK = threading.Lock()
 
-    content_file = incentive_dir / "content.md"
-    if not content_file.exists():
-        print(f"Error: {content_file} not found", file=sys.stderr)
-        sys.exit(1)
+# --trace: a step is flagged when it got this much slower than the previous build...
+TRACE_REGRESSION_RATIO = 1.25
+# ...and by more than this, which is within run-to-run noise for container starts
+TRACE_NOISE_FLOOR_S = 0.05
 
-    print(f"Building: {name}")
 
-    html_file = dist_dir / "content.html"
-    pdf_file = dist_dir / "content.pdf"
+class BuildError(Exception):
+    """A build step failed; the other incentives still build."""
 
-    # Markdown -> HTML (pandoc)
-    run_docker(
-        [
-            "docker",
-            "run",
-            "--rm",
-            "--platform",
-            "linux/amd64",
-            "-v",
-            f"{project_root}:/data",
-            "pandoc/extra",
-            f"/data/incentives/{name}/content.md",
-            "-o",
-            f"/data/dist/incentives/{name}/content.html",
-            "--css=/data/assets/pdf/kozlovski-pdf.css",
-            f"--resource-path=/data/incentives/{name}:/data/incentives/{name}/assets",
-            "--embed-resources",
-            "--standalone",
+
+class Tracer:
+    """Timed spans of a build, as Chrome trace events (--trace).
+
+    Each incentive gets its own track; spans nest, so a stage contains the
+    tool runs and container starts it caused. Span args carry byte sizes and
+    cache hits.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events = []
+        self.tracks = {}  # incentive -> tid
+        self.lock = threading.Lock()
+
+    def track(self, incentive: str) -> int:
+        with self.lock:
+            if incentive not in self.tracks:
+                self.tracks[incentive] = len(self.tracks) + 1
+                self.events.append({
+                    "name": "thread_name", "ph": "M", "pid": 1, "tid": self.tracks[incentive],
+                    "args": {"name": incentive},
+                })
+            return self.tracks[incentive]
+
+    @contextmanager
+    def span(self, incentive: str, name: str, category: str, args: dict):
+        tid = self.track(incentive)
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.events.append({
+                    "name": name, "cat": category, "ph": "X", "pid": 1, "tid": tid,
+                    "ts": round((start - self.started) * 1e6), "dur": round((end - start) * 1e6), "args": args,
+                })
+
+    def spans(self, incentive: str | None = None) -> list[dict]:
+        return [
+            e for e in self.events
+            if e["ph"] == "X" and (incentive is None or e["tid"] == self.tracks.get(incentive))
         ]
-    )
 
-    # HTML -> PDF (weasyprint)
-    run_docker(
-        [
+    def write(self, path: Path, metadata: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "build_incentive"}}, *self.events]
+        data = {"traceEvents": events, "displayTimeUnit": "ms", "otherData": metadata}
+        path.write_text(json.dumps(data) + "\n")
+
+
+class BuildLog:
+    """Output of one incentive build.
+
+    Serial builds print as they go. Parallel builds buffer their output, tool
+    output included, and print it as one block prefixed with the incentive
+    name, so concurrent builds never interleave.
+    """
+
+    def __init__(self, name: str, buffered: bool = False, tracer: Tracer | None = None):
+        self.name = name
+        self.prefix = f"[{name}] " if buffered else ""
+        self.buffered = buffered
+        self.tracer = tracer
+        self.lines = []
+
+    def print(self, message: str = "") -> None:
+        if not self.buffered:
+            print(message, flush=True)
+            return
+        self.lines.extend(self.prefix + line for line in message.splitlines() or [""])
+
+    def flush(self) -> None:
+        with OUTPUT_LOCK:
+            for line in self.lines:
+                print(line)
+            sys.stdout.flush()
+        self.lines.clear()
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        """Time the block when tracing; yields a dict for sizes and cache hits."""
+        if self.tracer is None:
+            yield args
+            return
+        with self.tracer.span(self.name, name, category, args):
+            yield args
+
+
+# === RENDERERS ===
+
+TOOL_IMAGES = {"pandoc": PANDOC_IMAGE, "weasyprint": WEASYPRINT_IMAGE}
+
+
+class Runtime:
+    """Runs external commands for the renderers."""
+
+    def run(self, cmd: list[str], capture: bool = True) -> subprocess.CompletedProcess:
+        try:
+            return subprocess.run(cmd, capture_output=capture, text=True)
+        except FileNotFoundError:
+            return subprocess.CompletedProcess(cmd, 127, "", f"{cmd[0]}: command not found\n")
+
+    def which(self, name: str) -> str | None:
+        return shutil.which(name)
+
+    def pipe(self, producer: list[str], consumer: list[str]) -> tuple[int, int, str]:
+        """Run `producer | consumer`; return both exit codes and their combined output.
+
+        Only the consumer's stdout and both stderr streams are collected (in a
+        temporary file, so a chatty tool cannot fill a pipe and deadlock).
+        """
+        with tempfile.TemporaryFile("w+") as output:
+            try:
+                first = subprocess.Popen(producer, stdout=subprocess.PIPE, stderr=output)
+            except FileNotFoundError:
+                return 127, 0, f"{producer[0]}: command not found\n"
+            try:
+                second = subprocess.Popen(consumer, stdin=first.stdout, stdout=output, stderr=output)
+            except FileNotFoundError:
+                first.kill()
+                first.wait()
+                return first.returncode, 127, f"{consumer[0]}: command not found\n"
+            finally:
+                first.stdout.close()  # The consumer holds the only read end now
+            second.wait()
+            first.wait()
+            output.seek(0)
+            return first.returncode, second.returncode, output.read()
+
+
+class FakeRuntime(Runtime):
+    """Offline stand-in for docker, pandoc and weasyprint.
+
+    Records every command, keeps track of started containers and writes
+    placeholder HTML/PDF files, so the renderers and the build pipeline can
+    be exercised without Docker (--fake-runtime). Its builds go to
+    FAKE_OUTPUT_DIR, with their own manifest, so placeholder PDFs never
+    count as up to date for a real build. scripts/tests change image_ids,
+    versions and exit_codes to simulate tool updates and failures.
+    """
+
+    def __init__(self, project_root: Path, local_tools: tuple[str, ...] = (), exit_codes: dict[str, int] | None = None):
+        self.project_root = project_root
+        self.local_tools = local_tools
+        self.exit_codes = exit_codes or {}  # tool -> exit code of its runs (0 when absent)
+        self.image_ids = {image: f"sha256:fake-{image}" for image in TOOL_IMAGES.values()}
+        self.versions = {tool: "0.0-fake" for tool in TOOL_IMAGES}
+        self.commands = []
+        self.containers = {}  # name -> ID of the image it was started from
+        self.lock = threading.Lock()
+
+    def which(self, name: str) -> str | None:
+        return f"/fake/bin/{name}" if name in self.local_tools else None
+
+    def run(self, cmd: list[str], capture: bool = True) -> subprocess.CompletedProcess:
+        with self.lock:
+            self.commands.append(cmd)
+        tool = Path(cmd[0]).name
+        if tool != "docker":
+            return self.tool(tool, cmd[1:], host_paths=True)
+        verb, args = cmd[1], cmd[2:]
+        if verb == "image":
+            return self.done(cmd, f"{self.image_ids[args[-1]]}\n")
+        if verb == "inspect":
+            if args[-1] not in self.containers:
+                return self.done(cmd, "", returncode=1)
+            return self.done(cmd, f"true {self.containers[args[-1]]}\n")
+        if verb == "rm":
+            self.containers.pop(args[-1], None)
+            return self.done(cmd)
+        if verb == "exec":
+            args = [a for a in args if a != "-i"]
+            if args[0] not in self.containers:
+                return self.done(cmd, "", f"No such container: {args[0]}\n", 1)
+            return self.tool(args[1], args[2:])
+        if verb == "run":
+            image = next(a for a in args if a in TOOL_IMAGES.values())
+            rest = args[args.index(image) + 1:]
+            if "-d" in args:
+                self.containers[args[args.index("--name") + 1]] = self.image_ids[image]
+                return self.done(cmd, "fake-container-id\n")
+            tool = next(t for t, i in TOOL_IMAGES.items() if i == image)
+            return self.tool(tool, rest)
+        return self.done(cmd, "", f"fake docker: unsupported {verb}\n", 1)
+
+    def pipe(self, producer: list[str], consumer: list[str]) -> tuple[int, int, str]:
+        first = self.run(producer)
+        if first.returncode != 0:
+            return first.returncode, 0, first.stderr
+        second = self.run(consumer)
+        return 0, second.returncode, second.stdout + second.stderr
+
+    def tool(self, tool: str, args: list[str], host_paths: bool = False) -> subprocess.CompletedProcess:
+        def host(path: str) -> Path:
+            return Path(path) if host_paths else self.project_root / path.removeprefix("/data/")
+
+        if "--version" in args:
+            return self.done(args, f"{tool} {self.versions[tool]}\n")
+        if self.exit_codes.get(tool):
+            return self.done(args, "", f"{tool}: fake failure\n", self.exit_codes[tool])
+        if tool == "pandoc":
+            html = f"<html><!-- {host(args[0]).read_text()[:80]} --></html>"
+            if "-o" not in args:
+                return self.done(args, html)
+            host(args[args.index("-o") + 1]).write_text(html)
+        elif tool == "weasyprint":
+            host(args[-1]).write_bytes(b"%PDF-1.7 fake\n")
+        return self.done(args)
+
+    @staticmethod
+    def done(cmd: list[str], stdout: str = "", stderr: str = "", returncode: int = 0) -> subprocess.CompletedProcess:
+        return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
+
+
+def run_tool(runtime: Runtime, cmd: list[str], log: BuildLog, step: str) -> None:
+    """Run a renderer command, raising BuildError if it fails."""
+    log.print(f"  $ {' '.join(cmd)}")
+    result = runtime.run(cmd, capture=log.buffered)
+    if log.buffered and (result.stdout or result.stderr):
+        log.print((result.stdout + result.stderr).rstrip())
+    if result.returncode != 0:
+        raise BuildError(f"{step} failed with exit code {result.returncode}")
+
+
+def run_pipe(runtime: Runtime, producer: list[str], consumer: list[str], log: BuildLog, steps: tuple[str, str]) -> None:
+    """Run `producer | consumer`, raising BuildError naming whichever side failed."""
+    log.print(f"  $ {' '.join(producer)} \\\n    | {' '.join(consumer)}")
+    first, second, output = runtime.pipe(producer, consumer)
+    if output:
+        log.print(output.rstrip())
+    for step, returncode in zip(steps, (first, second)):
+        if returncode != 0:
+            raise BuildError(f"{step} failed with exit code {returncode}")
+
+
+class Renderer:
+    """Runs pandoc and weasyprint for the build."""
+
+    name = ""
+
+    def __init__(self, runtime: Runtime, project_root: Path):
+        self.runtime = runtime
+        self.project_root = project_root
+        self.ids = {}  # tool -> identity, looked up once per run
+
+    def path(self, path: Path) -> str:
+        """How the tool sees a path inside the project."""
+        raise NotImplementedError
+
+    def identify(self, tool: str) -> str:
+        raise NotImplementedError
+
+    def command(self, tool: str, args: list[str], stdin: bool = False) -> list[str]:
+        raise NotImplementedError
+
+    def prepare(self, tool: str, log: BuildLog) -> None:
+        """Get `tool` ready to take a job."""
+
+    def tool_id(self, tool: str, refresh: bool = False) -> str:
+        """Identity of the tool (image ID or binary version), for the build manifest."""
+        if refresh or tool not in self.ids:
+            self.ids[tool] = self.identify(tool)
+        return self.ids[tool]
+
+    def render(self, tool: str, args: list[str], log: BuildLog) -> None:
+        self.prepare(tool, log)
+        with log.span(tool, "tool", renderer=self.name):
+            run_tool(self.runtime, self.command(tool, args), log, tool)
+
+    def pipe(self, producer: tuple[str, list[str]], consumer: tuple[str, list[str]], log: BuildLog) -> None:
+        """Stream one tool's stdout into the other's stdin."""
+        (first, first_args), (second, second_args) = producer, consumer
+        self.prepare(first, log)
+        self.prepare(second, log)
+        with log.span(f"{first} | {second}", "tool", renderer=self.name):
+            run_pipe(
+                self.runtime, self.command(first, first_args), self.command(second, second_args, stdin=True), log,
+                (first, second),
+            )
+
+
+class DockerRenderer(Renderer):
+    """One-shot `docker run --rm` per stage, the project mounted at /data."""
+
+    name = "docker"
+
+    def path(self, path: Path) -> str:
+        return f"/data/{path.relative_to(self.project_root)}"
+
+    def identify(self, tool: str) -> str:
+        result = self.runtime.run(["docker", "image", "inspect", "--format", "{{.Id}}", TOOL_IMAGES[tool]])
+        return f"{TOOL_IMAGES[tool]} {result.stdout.strip() if result.returncode == 0 else 'missing'}"
+
+    def command(self, tool: str, args: list[str], stdin: bool = False) -> list[str]:
+        return [
             "docker",
             "run",
             "--rm",
+            *(["-i"] if stdin else []),
             "--platform",
             "linux/amd64",
             "-v",
-            f"{project_root}:/data",
-            "minidocks/weasyprint:latest",
-            f"/data/dist/incentives/{name}/content.html",
-            f"/data/dist/incentives/{name}/content.pdf",
+            f"{self.project_root}:/data",
+            TOOL_IMAGES[tool],
+            *args,
         ]
+
+
+class WarmDockerRenderer(DockerRenderer):
+    """Long-lived pandoc and weasyprint containers that jobs are exec'd into.
+
+    Containers outlive the build, so later builds skip container start-up
+    entirely; one is replaced when its image changes. `--stop-renderers`
+    removes them.
+    """
+
+    name = "warm"
+
+    def __init__(self, runtime: Runtime, project_root: Path):
+        super().__init__(runtime, project_root)
+        project_id = hashlib.sha256(str(project_root).encode()).hexdigest()[:8]
+        self.containers = {tool: f"incentive-{tool}-{project_id}" for tool in TOOL_IMAGES}
+        self.started = set()
+        self.lock = threading.Lock()
+
+    def prepare(self, tool: str, log: BuildLog) -> None:
+        container = self.containers[tool]
+        with self.lock:
+            if tool in self.started:
+                return
+            image_id = self.tool_id(tool).rsplit(" ", 1)[-1]
+            state = self.runtime.run(["docker", "inspect", "--format", "{{.State.Running}} {{.Image}}", container])
+            if state.returncode != 0 or state.stdout.split() != ["true", image_id]:
+                self.runtime.run(["docker", "rm", "-f", container])
+                cmd = [
+                    "docker",
+                    "run",
+                    "-d",
+                    "--rm",
+                    "--name",
+                    container,
+                    "--platform",
+                    "linux/amd64",
+                    "-v",
+                    f"{self.project_root}:/data",
+                    "--entrypoint",
+                    "tail",
+                    TOOL_IMAGES[tool],
+                    "-f",
+                    "/dev/null",
+                ]
+                log.print(f"  $ {' '.join(cmd)}")
+                with log.span(f"start {tool}", "container", image=TOOL_IMAGES[tool]):
+                    result = self.runtime.run(cmd)
+                if result.returncode != 0:
+                    log.print(result.stderr.rstrip())
+                    raise BuildError(f"starting the {tool} container failed with exit code {result.returncode}")
+                # Starting may have pulled the image
+                self.tool_id(tool, refresh=True)
+            self.started.add(tool)
+
+    def command(self, tool: str, args: list[str], stdin: bool = False) -> list[str]:
+        return ["docker", "exec", *(["-i"] if stdin else []), self.containers[tool], tool, *args]
+
+    def stop(self) -> None:
+        for container in self.containers.values():
+            self.runtime.run(["docker", "rm", "-f", container])
+            print(f"Stopped: {container}")
+
+
+class LocalRenderer(Renderer):
+    """pandoc and weasyprint binaries from PATH."""
+
+    name = "local"
+
+    def path(self, path: Path) -> str:
+        return str(path)
+
+    def identify(self, tool: str) -> str:
+        binary = self.runtime.which(tool)
+        version = self.runtime.run([binary, "--version"]).stdout.splitlines()
+        return f"{binary} {version[0] if version else 'unknown'}"
+
+    def command(self, tool: str, args: list[str], stdin: bool = False) -> list[str]:
+        return [self.runtime.which(tool), *args]
+
+
+RENDERERS = {"docker": DockerRenderer, "warm": WarmDockerRenderer, "local": LocalRenderer}
+
+
+def select_renderer(kind: str, runtime: Runtime, project_root: Path) -> Renderer:
+    """`auto` prefers local binaries and falls back to one-shot containers."""
+    if kind == "auto":
+        kind = "local" if all(runtime.which(tool) for tool in TOOL_IMAGES) else "docker"
+    if kind == "local" and not all(runtime.which(tool) for tool in TOOL_IMAGES):
+        sys.exit("Error: --renderer local needs pandoc and weasyprint on PATH")
+    return RENDERERS[kind](runtime, project_root)
+
+
+class BuildManifest:
+    """Content hashes of every stage's inputs and outputs, kept in dist/.
+
+    Files are rehashed only when their size or mtime changed, so checking an
+    up-to-date tree reads metadata, not file contents.
+    """
+
+    def __init__(self, path: Path, project_root: Path):
+        self.path = path
+        self.project_root = project_root
+        self.files = {}  # relative path -> [size, mtime_ns, sha256]
+        self.stages = {}  # incentive -> stage -> {"inputs": {...}, "outputs": {...}}
+        self.lock = threading.RLock()  # Parallel builds share one manifest
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+            except ValueError:
+                data = {}
+            if data.get("version") == MANIFEST_VERSION:
+                self.files = data["files"]
+                self.stages = data["stages"]
+
+    def save(self) -> None:
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"version": MANIFEST_VERSION, "files": self.files, "stages": self.stages}
+            self.path.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n")
+
+    def hash_file(self, path: Path) -> str | None:
+        """sha256 of `path`, or None if it does not exist."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path.relative_to(self.project_root))
+        cached = self.files.get(key)
+        if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        with self.lock:
+            self.files[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def hash_files(self, paths: list[Path]) -> dict[str, str]:
+        return {str(p.relative_to(self.project_root)): self.hash_file(p) for p in paths}
+
+    def stale_reasons(self, name: str, stage: str, inputs: dict[str, str], outputs: list[Path]) -> list[str]:
+        """Why `stage` must run; empty when its recorded inputs and outputs still match."""
+        record = self.stages.get(name, {}).get(stage)
+        if record is None:
+            return ["never built"]
+        reasons = []
+        old = record["inputs"]
+        for key in sorted(inputs.keys() | old.keys()):
+            if key not in old:
+                reasons.append(f"new input {key}")
+            elif key not in inputs:
+                reasons.append(f"removed input {key}")
+            elif inputs[key] != old[key]:
+                reasons.append(f"changed {key}")
+        for output in outputs:
+            key = str(output.relative_to(self.project_root))
+            current = self.hash_file(output)
+            if current is None:
+                reasons.append(f"missing output {key}")
+            elif current != record["outputs"].get(key):
+                reasons.append(f"modified output {key}")
+        return reasons
+
+    def record(self, name: str, stage: str, inputs: dict[str, str], outputs: list[Path]) -> None:
+        outputs = self.hash_files(outputs)
+        with self.lock:
+            self.stages.setdefault(name, {})[stage] = {"inputs": inputs, "outputs": outputs}
+            # Saved per stage, so a later failing stage does not lose this one
+            self.save()
+
+
+def incentive_files(incentive_dir: Path) -> list[Path]:
+    """Every file pandoc can reach through the incentive's resource path."""
+    return sorted(
+        p for p in incentive_dir.rglob("*") if p.is_file() and not IGNORED_PARTS.intersection(p.parts)
     )
 
-    # Clean up intermediate HTML
-    html_file.unlink(missing_ok=True)
-    print(f"Built: {pdf_file.relative_to(project_root)}")
+
+def bundled_assets(assets_dir: Path) -> list[Path]:
+    """Top-level files of assets/, which go into assets.zip."""
+    if not assets_dir.is_dir():
+        return []
+    return sorted(p for p in assets_dir.iterdir() if p.is_file() and p.name not in IGNORED_PARTS)
+
+
+# === IMAGES ===
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1024:.1f} KB" if size < 1 << 20 else f"{size / (1 << 20):.2f} MB"
+
+
+def local_images(content_file: Path) -> list[str]:
+    """Image paths in the markdown that are relative to its directory and exist."""
+    sources = []
+    for src in MARKDOWN_IMAGE.findall(content_file.read_text()):
+        if not re.match(r"[a-z][a-z0-9+.-]*:", src) and not src.startswith("/") and src not in sources:
+            if (content_file.parent / src).is_file():
+                sources.append(src)
+    return sources
+
+
+def optimize_image(source: Path, target: Path, dpi: int) -> None:
+    """Write `source` to `target`, downscaled to `dpi` across the printable width.
+
+    PNGs are also recompressed losslessly: an opaque alpha channel is dropped
+    and images with at most 256 colours become palette images, kept only if
+    they decode to the same pixels. The source is copied when the result is
+    not smaller, and when it is not a raster format Pillow optimizes.
+    """
+    if source.suffix.lower() not in OPTIMIZED_IMAGE_SUFFIXES:
+        write_image(target, source.read_bytes())
+        return
+    try:
+        from PIL import Image, UnidentifiedImageError
+    except ImportError:
+        raise BuildError("image optimization needs Pillow (or pass --no-optimize-images)") from None
+
+    max_width = round(PRINT_WIDTH_IN * dpi)
+    try:
+        with Image.open(source) as original:
+            image_format = original.format
+            image = original.copy()
+    except UnidentifiedImageError:
+        write_image(target, source.read_bytes())
+        return
+    downscaled = image.width > max_width
+    if downscaled:
+        height = max(1, round(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+
+    data = None
+    if image_format == "PNG":
+        if image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255):
+            image = image.convert("RGB")
+        if image.mode in ("RGB", "RGBA") and (colors := image.getcolors(256)) is not None:
+            palette = image.quantize(colors=len(colors), method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+            if palette.convert(image.mode).tobytes() == image.tobytes():
+                image = palette
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG", optimize=True)
+        data = buffer.getvalue()
+    elif downscaled:
+        buffer = io.BytesIO()
+        image.save(buffer, image_format, quality=90)
+        data = buffer.getvalue()
+    if data is None or len(data) >= source.stat().st_size:
+        data = source.read_bytes()
+    write_image(target, data)
+
+
+def write_image(target: Path, data: bytes) -> None:
+    partial = target.with_name(f".{target.name}.partial")
+    partial.write_bytes(data)
+    os.replace(partial, target)
+
+
+@dataclass
+class ImageReport:
+    """Sizes of the images one build rendered with."""
+
+    rows: list = field(default_factory=list)  # (src, before, after, cached)
+
+    def print(self, log: BuildLog) -> None:
+        for src, before, after, cached in self.rows:
+            note = " (cached)" if cached else ""
+            sizes = f"{format_size(before)} -> {format_size(after)} ({size_change(before, after)})"
+            log.print(f"  image {src}: {sizes}{note}")
+        before = sum(row[1] for row in self.rows)
+        after = sum(row[2] for row in self.rows)
+        cached = sum(row[3] for row in self.rows)
+        log.print(
+            f"  images: {len(self.rows)} files, {format_size(before)} -> {format_size(after)} "
+            f"({size_change(before, after)}), {len(self.rows) - cached} processed, {cached} cached"
+        )
+
+
+def size_change(before: int, after: int) -> str:
+    """Relative size change for the image report; a zero-byte source has none."""
+    return f"{after / before - 1:+.0%}" if before else "empty"
+
+
+def prepare_images(
+    content_file: Path, resource_dir: Path, image_cache: Path, dpi: int, manifest: BuildManifest, log: BuildLog
+) -> ImageReport:
+    """Mirror the markdown's images into `resource_dir`, optimized.
+
+    Optimized files are cached by source hash and settings, so only new or
+    changed images are processed (in parallel); the mirror keeps the paths
+    the markdown uses, so it can stand in for the incentive directory.
+    """
+    settings = f"dpi={dpi} v{IMAGE_CACHE_VERSION}"
+    image_cache.mkdir(parents=True, exist_ok=True)
+    planned = []
+    for src in local_images(content_file):
+        source = content_file.parent / src
+        key = hashlib.sha256(f"{manifest.hash_file(source)} {settings}".encode()).hexdigest()[:32]
+        planned.append((src, source, image_cache / f"{key}{source.suffix.lower()}"))
+
+    # Identical images share a blob: optimize each blob once, from its first path
+    missing = {}
+    for _, source, blob in planned:
+        if not blob.exists():
+            missing.setdefault(blob, source)
+    with ThreadPoolExecutor() as pool:
+        list(pool.map(lambda job: optimize_image(job[1], job[0], dpi), missing.items()))
+
+    shutil.rmtree(resource_dir, ignore_errors=True)
+    report = ImageReport()
+    for src, source, blob in planned:
+        mirrored = resource_dir / src
+        mirrored.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob, mirrored)
+        except OSError:
+            shutil.copyfile(blob, mirrored)
+        report.rows.append((src, source.stat().st_size, blob.stat().st_size, missing.get(blob) != source))
+    if report.rows:
+        report.print(log)
+    return report
+
+
+def images_linkable(content_file: Path) -> bool:
+    """Whether every image in the markdown resolves relative to its directory.
+
+    Streamed HTML links images instead of inlining them, and weasyprint
+    resolves those links against the incentive directory; images found only
+    through pandoc's resource path (assets/) would be lost.
+    """
+    for src in MARKDOWN_IMAGE.findall(content_file.read_text()):
+        if re.match(r"[a-z][a-z0-9+.-]*:", src) or src.startswith("/"):
+            continue  # A URL, or absolute: weasyprint fetches it as written
+        if not (content_file.parent / src).is_file():
+            return False
+    return True
+
+
+# === ASSETS ZIP ===
+
+
+@dataclass
+class ZipEntry:
+    name: str
+    method: int
+    crc: int
+    size: int
+    data: bytes  # As stored in the archive
+    mode: int
+    reused: bool = False
+
+
+def previous_entries(zip_file: Path) -> dict[str, tuple[zipfile.ZipInfo, bytes]]:
+    """Entries of an earlier archive with their raw (still compressed) bytes.
+
+    Empty unless the archive was written by this ZIP_WRITER: another writer
+    or deflate level compresses the same content to different bytes.
+    """
+    if not zip_file.exists():
+        return {}
+    entries = {}
+    try:
+        with zipfile.ZipFile(zip_file) as zf, open(zip_file, "rb") as raw:
+            if zf.comment != ZIP_WRITER.encode():
+                return {}
+            for info in zf.infolist():
+                if info.flag_bits & 0x1:  # Encrypted
+                    continue
+                raw.seek(info.header_offset)
+                header = raw.read(30)
+                name_length, extra_length = struct.unpack("<2H", header[26:30])
+                raw.seek(info.header_offset + 30 + name_length + extra_length)
+                entries[info.filename] = info, raw.read(info.compress_size)
+    except (zipfile.BadZipFile, struct.error):
+        return {}
+    return entries
+
+
+def zip_entry(asset: Path, previous: tuple[zipfile.ZipInfo, bytes] | None) -> ZipEntry:
+    """Pack one file, reusing its previous compressed bytes when the content is unchanged."""
+    data = asset.read_bytes()
+    crc, size = zlib.crc32(data), len(data)
+    method = zipfile.ZIP_STORED if asset.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+    mode = zip_mode(asset)
+    if previous is not None:
+        info, raw = previous
+        if (info.CRC, info.file_size, info.compress_type) == (crc, size, method):
+            return ZipEntry(asset.name, method, crc, size, raw, mode, reused=True)
+    if method == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(ZIP_DEFLATE_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = compressor.compress(data) + compressor.flush()
+    return ZipEntry(asset.name, method, crc, size, data, mode)
+
+
+def zip_mode(asset: Path) -> int:
+    """File type and permissions recorded for `asset`: only the owner's execute bit is kept."""
+    return 0o100755 if asset.stat().st_mode & 0o100 else 0o100644
+
+
+def zip_bytes(entries: list[ZipEntry]) -> bytes:
+    """A zip archive whose bytes depend only on the entries: no mtimes, no host details."""
+    out = io.BytesIO()
+    central = []
+    for entry in entries:
+        name = entry.name.encode()
+        flags = 0 if entry.name.isascii() else 0x800  # UTF-8 names
+        if max(entry.size, len(entry.data), out.tell()) >= 0xFFFFFFFF:
+            raise BuildError(f"assets.zip: {entry.name} needs zip64, which is not supported")
+        offset = out.tell()
+        out.write(struct.pack(
+            "<4s5H3L2H", b"PK\x03\x04", 20, flags, entry.method, 0, ZIP_DOS_DATE,
+            entry.crc, len(entry.data), entry.size, len(name), 0,
+        ))
+        out.write(name)
+        out.write(entry.data)
+        central.append(struct.pack(
+            "<4s6H3L5H2L", b"PK\x01\x02", 0x0314, 20, flags, entry.method, 0, ZIP_DOS_DATE,
+            entry.crc, len(entry.data), entry.size, len(name), 0, 0, 0, 0, entry.mode << 16, offset,
+        ) + name)
+    directory = b"".join(central)
+    directory_offset = out.tell()
+    out.write(directory)
+    comment = ZIP_WRITER.encode()
+    out.write(struct.pack(
+        "<4s4H2LH", b"PK\x05\x06", 0, 0, len(entries), len(entries), len(directory), directory_offset, len(comment),
+    ))
+    out.write(comment)
+    return out.getvalue()
+
+
+def bundle_assets(assets: list[Path], zip_file: Path) -> str:
+    """Write assets.zip incrementally and deterministically; return a summary."""
+    previous = previous_entries(zip_file)
+    large = [a for a in assets if a.stat().st_size >= PARALLEL_ZIP_BYTES]
+    with ThreadPoolExecutor() as pool:
+        packed = dict(zip(large, pool.map(lambda a: zip_entry(a, previous.get(a.name)), large)))
+    entries = [packed.get(a) or zip_entry(a, previous.get(a.name)) for a in sorted(assets, key=lambda a: a.name)]
+
+    archive = zip_bytes(entries)
+    if not zip_file.exists() or zip_file.read_bytes() != archive:
+        partial = zip_file.with_name(f".{zip_file.name}.partial")
+        partial.write_bytes(archive)
+        os.replace(partial, zip_file)
+    reused = sum(e.reused for e in entries)
+    stored = sum(e.method == zipfile.ZIP_STORED and not e.reused for e in entries)
+    return f"{reused} reused, {len(entries) - reused - stored} compressed, {stored} stored, {format_size(len(archive))}"
+
+
+@dataclass(frozen=True)
+class BuildOptions:
+    force: bool = False
+    explain: bool = False
+    keep_html: bool = False
+    image_dpi: int | None = DEFAULT_IMAGE_DPI  # None leaves images untouched
+    stages: frozenset[str] | None = None  # Only consider these stages ("pdf", "zip"); None for all
+    output_dir: Path = OUTPUT_DIR  # Builds and caches, relative to the project root
+
+
+def run_stage(
+    manifest: BuildManifest, log: BuildLog, name: str, stage: str, inputs: dict[str, str], outputs: list[Path],
+    options: BuildOptions,
+) -> bool:
+    """Decide whether `stage` runs, printing the reasons with --explain."""
+    reasons = ["--force"] if options.force else manifest.stale_reasons(name, stage, inputs, outputs)
+    if options.explain:
+        if reasons:
+            log.print(f"  {stage}: rebuild ({'; '.join(reasons)})")
+        else:
+            log.print(f"  {stage}: up to date")
+    return bool(reasons)
+
+
+def build_incentive(
+    name: str,
+    project_root: Path,
+    manifest: BuildManifest,
+    renderer: Renderer,
+    log: BuildLog,
+    options: BuildOptions = BuildOptions(),
+) -> None:
+    """Build a single incentive: markdown -> html -> pdf, zip assets."""
+    incentive_dir = project_root / "incentives" / name
+    dist_dir = project_root / options.output_dir / "incentives" / name
+    cache_dir = project_root / options.output_dir / ".cache" / "incentives" / name
+
+    content_file = incentive_dir / "content.md"
+    if not content_file.exists():
+        raise BuildError(f"{content_file} not found")
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    log.print(f"Building: {name}")
+    built = False
+
+    # The HTML is an intermediate. By default it is piped from pandoc into
+    # weasyprint and never touches disk; --keep-html writes it to the cache
+    # (with images inlined) and lets a PDF-only rebuild reuse it.
+    html_file = cache_dir / "content.html"
+    pdf_file = dist_dir / "content.pdf"
+    # Optimized images are mirrored under the cache and looked up before the originals
+    resource_dir = cache_dir / "resources"
+    source_files = [project_root / CSS_FILE, *incentive_files(incentive_dir)]
+    with log.span("inputs", "manifest", files=len(source_files)):
+        html_inputs = {
+            **manifest.hash_files(source_files),
+            "pandoc": renderer.tool_id("pandoc"),
+            "images": f"dpi={options.image_dpi} v{IMAGE_CACHE_VERSION}" if options.image_dpi else "original",
+        }
+        pdf_inputs = {
+            "html": hashlib.sha256(json.dumps(html_inputs, sort_keys=True).encode()).hexdigest(),
+            "weasyprint": renderer.tool_id("weasyprint"),
+        }
+    source_bytes = sum(p.stat().st_size for p in source_files)
+    path = renderer.path
+    resource_path = [incentive_dir, incentive_dir / "assets"]
+    if options.image_dpi:
+        resource_path.insert(0, resource_dir)
+    pandoc_args = [
+        path(content_file),
+        "--to=html5",
+        f"--css={path(project_root / CSS_FILE)}",
+        f"--resource-path={':'.join(path(p) for p in resource_path)}",
+        "--standalone",
+    ]
+    stream = not options.keep_html and images_linkable(content_file)
+
+    def render_images() -> None:
+        if options.image_dpi:
+            image_cache = project_root / options.output_dir / ".cache" / "images"
+            with log.span("images", "images") as span:
+                report = prepare_images(content_file, resource_dir, image_cache, options.image_dpi, manifest, log)
+                span.update(
+                    files=len(report.rows),
+                    cached=sum(row[3] for row in report.rows),
+                    input_bytes=sum(row[1] for row in report.rows),
+                    output_bytes=sum(row[2] for row in report.rows),
+                )
+
+    wanted = options.stages or {"pdf", "zip"}
+    if "pdf" in wanted:
+        with log.span("pdf", "stage", input_bytes=source_bytes) as pdf_span:
+            if run_stage(manifest, log, name, "pdf", pdf_inputs, [pdf_file], options):
+                previous_size = pdf_file.stat().st_size if pdf_file.exists() else None
+                if stream:
+                    # Markdown | HTML -> PDF (pandoc | weasyprint), images linked not inlined
+                    render_images()
+                    renderer.pipe(
+                        ("pandoc", pandoc_args),
+                        ("weasyprint", ["--base-url", f"{path(resource_path[0])}/", "-", path(pdf_file)]),
+                        log,
+                    )
+                    html_inputs["pandoc"] = renderer.tool_id("pandoc", refresh=True)
+                else:
+                    # Markdown -> HTML (pandoc)
+                    with log.span("html", "stage", input_bytes=source_bytes) as html_span:
+                        html_span["cache"] = "hit"
+                        if run_stage(manifest, log, name, "html", html_inputs, [html_file], options):
+                            html_span["cache"] = "miss"
+                            render_images()
+                            renderer.render("pandoc", [*pandoc_args, "--embed-resources", "-o", path(html_file)], log)
+                            # A first run pulls the image; record the one actually used
+                            html_inputs["pandoc"] = renderer.tool_id("pandoc", refresh=True)
+                            manifest.record(name, "html", html_inputs, [html_file])
+                        html_span["output_bytes"] = html_file.stat().st_size
+
+                    # HTML -> PDF (weasyprint)
+                    renderer.render("weasyprint", [path(html_file), path(pdf_file)], log)
+                pdf_inputs["html"] = hashlib.sha256(json.dumps(html_inputs, sort_keys=True).encode()).hexdigest()
+                pdf_inputs["weasyprint"] = renderer.tool_id("weasyprint", refresh=True)
+                manifest.record(name, "pdf", pdf_inputs, [pdf_file])
+                size = format_size(pdf_file.stat().st_size)
+                was = f", was {format_size(previous_size)}" if previous_size is not None else ""
+                log.print(f"Built: {pdf_file.relative_to(project_root)} ({size}{was})")
+                built = True
+            pdf_span["cache"] = "miss" if built else "hit"
+            pdf_span["output_bytes"] = pdf_file.stat().st_size
 
     # Bundle assets if directory exists and has files
-    assets_dir = incentive_dir / "assets"
-    if assets_dir.is_dir() and any(assets_dir.iterdir()):
+    assets = bundled_assets(incentive_dir / "assets")
+    if assets and "zip" in wanted:
         zip_file = dist_dir / "assets.zip"
-        zip_file.unlink(missing_ok=True)
-        with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for asset in assets_dir.iterdir():
-                if asset.is_file():
-                    zf.write(asset, asset.name)
-        print(f"Built: {zip_file.relative_to(project_root)}")
+        with log.span("zip", "stage", input_bytes=sum(a.stat().st_size for a in assets)) as zip_span:
+            zip_span["cache"] = "hit"
+            zip_inputs = {
+                **manifest.hash_files(assets),
+                "modes": " ".join(f"{a.name}:{zip_mode(a):o}" for a in sorted(assets, key=lambda a: a.name)),
+                "writer": ZIP_WRITER,
+            }
+            if run_stage(manifest, log, name, "zip", zip_inputs, [zip_file], options):
+                zip_span["cache"] = "miss"
+                with log.span("bundle", "zip", entries=len(assets)):
+                    summary = bundle_assets(assets, zip_file)
+                manifest.record(name, "zip", zip_inputs, [zip_file])
+                log.print(f"Built: {zip_file.relative_to(project_root)} ({summary})")
+                built = True
+            zip_span["output_bytes"] = zip_file.stat().st_size
+    if not built:
+        log.print(f"Up to date: {name}")
+    manifest.save()
+
+
+def build_logged(
+    name: str, project_root: Path, manifest: BuildManifest, renderer: Renderer, options: BuildOptions, buffered: bool,
+    tracer: Tracer | None = None,
+) -> str | None:
+    """Build one incentive; return why it failed, or None."""
+    log = BuildLog(name, buffered=buffered, tracer=tracer)
+    try:
+        with log.span("build", "build"):
+            build_incentive(name, project_root, manifest, renderer, log, options)
+        return None
+    except BuildError as e:
+        error = str(e)
+    except Exception as e:  # noqa: BLE001 - one broken incentive must not stop the others
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        log.flush()
+    # Printed after the incentive's own output, so the block stays together
+    with OUTPUT_LOCK:
+        print(f"{log.prefix}Failed: {name}: {error}", file=sys.stderr, flush=True)
+    return error
+
+
+def build_many(
+    plan: dict[str, BuildOptions], project_root: Path, manifest: BuildManifest, renderer: Renderer, jobs: int,
+    tracer: Tracer | None = None,
+) -> dict[str, str]:
+    """Build each incentive with its options, `jobs` at a time; return the failures."""
+    names = list(plan)
+    # Each incentive's stages stay in order inside its own job
+    with ThreadPoolExecutor(max_workers=min(jobs, len(names) or 1)) as pool:
+        errors = list(pool.map(
+            lambda name: build_logged(name, project_root, manifest, renderer, plan[name], jobs > 1, tracer), names
+        ))
+    failures = {name: error for name, error in zip(names, errors) if error is not None}
+    if failures:
+        print(f"\n{len(failures)} of {len(names)} incentives failed:", file=sys.stderr)
+        for name, error in failures.items():
+            print(f"  {name}: {error}", file=sys.stderr)
+    return failures
+
+
+# === TRACING ===
+
+
+def git_revision(project_root: Path) -> str:
+    result = subprocess.run(
+        ["git", "describe", "--always", "--dirty"], cwd=project_root, capture_output=True, text=True
+    )
+    return result.stdout.strip() if result.returncode == 0 else "unknown"
+
+
+def trace_summary(tracer: Tracer, names: list[str], wall: float) -> dict:
+    """Per-incentive step times, cache hits and sizes: the history record of one build.
+
+    Steps are the leaf work (inputs, images, container starts, tools, zip
+    bundling); stages only contribute their cache hits and output sizes.
+    """
+    incentives = {}
+    for name in names:
+        steps, cache, output_bytes, total = {}, {}, 0, 0.0
+        for span in tracer.spans(name):
+            seconds = span["dur"] / 1e6
+            if span["cat"] == "build":
+                total = seconds
+            elif span["cat"] == "stage":
+                cache[span["name"]] = span["args"].get("cache", "error")
+                if span["name"] != "html":  # Intermediate; it is not shipped
+                    output_bytes += span["args"].get("output_bytes", 0)
+            else:
+                steps[span["name"]] = steps.get(span["name"], 0.0) + seconds
+        incentives[name] = {
+            "seconds": round(total, 4),
+            "steps": {step: round(seconds, 4) for step, seconds in steps.items()},
+            "cache": cache,
+            "output_bytes": output_bytes,
+        }
+    return {"wall_seconds": round(wall, 4), "incentives": incentives}
+
+
+def print_trace_table(summary: dict) -> None:
+    incentives = summary["incentives"]
+    steps = list(dict.fromkeys(step for row in incentives.values() for step in row["steps"]))
+    width = max([len("incentive"), *map(len, incentives)])
+    header = f"  {'incentive':<{width}} " + " ".join(f"{step:>{max(len(step), 7)}}" for step in steps)
+    print(f"{header} {'total':>7}  {'output':>9}  cache")
+    for name, row in incentives.items():
+        cells = " ".join(
+            f"{row['steps'][step]:>{max(len(step), 7)}.2f}" if step in row["steps"] else f"{'-':>{max(len(step), 7)}}"
+            for step in steps
+        )
+        cache = " ".join(f"{stage}:{hit}" for stage, hit in row["cache"].items())
+        print(f"  {name:<{width}} {cells} {row['seconds']:>7.2f}  {format_size(row['output_bytes']):>9}  {cache}")
+    print(f"  wall time: {summary['wall_seconds']:.2f}s")
+
+
+def build_shape(record: dict) -> list:
+    """What a build did: only builds that ran the same stages are comparable."""
+    return sorted((name, sorted(row["cache"].items())) for name, row in record["incentives"].items())
+
+
+def compare_with_history(record: dict, history_file: Path) -> None:
+    """Print step-time changes against the last comparable build, flagging regressions."""
+    previous = None
+    if history_file.exists():
+        for line in history_file.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("renderer") == record["renderer"] and build_shape(entry) == build_shape(record):
+                previous = entry
+    if previous is None:
+        print("  no earlier comparable build in the history")
+        return
+
+    def change(before: float, after: float) -> str:
+        slower = after > before * TRACE_REGRESSION_RATIO and after - before > TRACE_NOISE_FLOOR_S
+        relative = f"{after / before - 1:+.0%}" if before else "new"
+        return f"{before:.2f}s -> {after:.2f}s ({relative}){'  REGRESSION' if slower else ''}"
+
+    print(f"  vs {previous['revision']} ({previous['date']}):")
+    print(f"    wall time: {change(previous['wall_seconds'], record['wall_seconds'])}")
+    quiet = 0
+    for name, row in record["incentives"].items():
+        before = previous["incentives"][name]["steps"]
+        for step in row["steps"].keys() | before.keys():
+            old, new = before.get(step, 0.0), row["steps"].get(step, 0.0)
+            if abs(new - old) <= TRACE_NOISE_FLOOR_S:
+                quiet += 1
+            else:
+                print(f"    {name} {step}: {change(old, new)}")
+    if quiet:
+        print(f"    {quiet} other steps within {TRACE_NOISE_FLOOR_S}s")
+
+
+def report_trace(
+    tracer: Tracer, names: list[str], project_root: Path, renderer: Renderer, jobs: int, output_dir: Path = OUTPUT_DIR,
+) -> None:
+    """Write the trace file, print the summary and record the build in the history."""
+    wall = time.perf_counter() - tracer.started
+    record = {
+        "revision": git_revision(project_root),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "renderer": renderer.name,
+        "jobs": jobs,
+        **trace_summary(tracer, names, wall),
+    }
+    dist = project_root / output_dir
+    trace_file = dist / "build-trace.json"
+    tracer.write(trace_file, {key: record[key] for key in ("revision", "date", "renderer", "jobs")})
+    history_file = dist / "build-history.jsonl"
+
+    print(f"\nTrace: {trace_file.relative_to(project_root)} (open in ui.perfetto.dev or chrome://tracing)")
+    print_trace_table(record)
+    compare_with_history(record, history_file)
+    with open(history_file, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+# === WATCH MODE ===
+
+WATCH_DEBOUNCE_S = 0.3
+POLL_INTERVAL_S = 0.5
+EDITOR_TEMP_FILE = re.compile(r"(^\.#|^#.*#$|~$|\.sw[a-p]$|^4913$|\.tmp$)")
+
+
+class PollingWatcher:
+    """Finds changes by comparing (mtime, size) snapshots of the watched trees."""
+
+    def __init__(self, roots: list[Path]):
+        self.roots = roots
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        files = {}
+        for root in self.roots:
+            for path in root.rglob("*"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.is_file():
+                    files[path] = stat.st_mtime_ns, stat.st_size
+        return files
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        """Changed paths, waiting up to `timeout` seconds (forever if None) for the first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.scan()
+            changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(POLL_INTERVAL_S if deadline is None else min(POLL_INTERVAL_S, max(0.0, deadline - time.monotonic())))
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes, with a watch on every directory of the trees."""
+
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_IGNORED, IN_ISDIR = 0x8000, 0x40000000
+    IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: list[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.libc = libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}  # watch descriptor -> directory
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, root: Path) -> None:
+        for directory in [root, *(p for p in root.rglob("*") if p.is_dir())]:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd >= 0:
+                self.dirs[wd] = directory
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        """Changed paths, waiting up to `timeout` seconds (forever if None) for the first."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        changed = set()
+        try:
+            buffer = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = self.EVENT.unpack_from(buffer, offset)
+            name = buffer[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0")
+            offset += self.EVENT.size + length
+            directory = self.dirs.get(wd)
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_tree(path)
+                    changed.update(p for p in path.rglob("*") if p.is_file())
+            else:
+                changed.add(path)
+        return changed
+
+
+def make_watcher(roots: list[Path], poll: bool) -> InotifyWatcher | PollingWatcher:
+    if not poll:
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(roots)
+
+
+def affected_stages(paths: set[Path], project_root: Path, names: list[str] | None) -> dict[str, set[str]]:
+    """Map changed paths to the incentives and stages that read them.
+
+    The stylesheet directory feeds every PDF. Inside an incentive, top-level
+    assets/ files feed both the PDF (pandoc's resource path) and assets.zip;
+    everything else only the PDF. `names` limits the result (None: any
+    incentive with a content.md).
+    """
+    incentives_dir = project_root / "incentives"
+    css_dir = project_root / CSS_FILE.parent
+    if names is None:
+        names = [p.name for p in sorted(incentives_dir.iterdir()) if (p / "content.md").is_file()]
+    plan = {}
+    for path in paths:
+        if EDITOR_TEMP_FILE.search(path.name) or IGNORED_PARTS.intersection(path.parts):
+            continue
+        if path.is_relative_to(css_dir):
+            for name in names:
+                plan.setdefault(name, set()).add("pdf")
+        elif path.is_relative_to(incentives_dir):
+            parts = path.relative_to(incentives_dir).parts
+            if len(parts) < 2 or parts[0] not in names:
+                continue
+            stages = plan.setdefault(parts[0], set())
+            stages.add("pdf")
+            if len(parts) == 3 and parts[1] == "assets":
+                stages.add("zip")
+    return plan
+
+
+def watch(
+    names: list[str] | None, project_root: Path, manifest: BuildManifest, renderer: Renderer,
+    options: BuildOptions, jobs: int, poll: bool,
+) -> None:
+    """Rebuild the stages affected by each burst of saves until interrupted."""
+    roots = [project_root / "incentives", project_root / CSS_FILE.parent]
+    watcher = make_watcher(roots, poll)
+    kind = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+    print(f"Watching {', '.join(str(r.relative_to(project_root)) for r in roots)} ({kind}); Ctrl-C to stop")
+    try:
+        while True:
+            changed = watcher.wait(None)
+            # Debounce: an editor save or a checkout arrives as a burst of events
+            while more := watcher.wait(WATCH_DEBOUNCE_S):
+                changed |= more
+            plan = affected_stages(changed, project_root, names)
+            if not plan:
+                continue
+            print(f"\n[{time.strftime('%H:%M:%S')}] " + ", ".join(
+                f"{name} ({', '.join(sorted(stages))})" for name, stages in sorted(plan.items())
+            ))
+            started = time.perf_counter()
+            build_many(
+                {name: dataclasses.replace(options, stages=frozenset(stages)) for name, stages in sorted(plan.items())},
+                project_root, manifest, renderer, jobs,
+            )
+            print(f"Rebuilt in {time.perf_counter() - started:.2f}s; watching")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build incentive PDFs")
     parser.add_argument("name", nargs="?", help="Incentive name to build")
     parser.add_argument("--all", action="store_true", help="Build all incentives")
+    parser.add_argument("--force", action="store_true", help="Rebuild every stage, ignoring the manifest")
+    parser.add_argument("--explain", action="store_true", help="Print why each stage is rebuilt or skipped")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Incentives to build at the same time")
+    parser.add_argument("--keep-html", action="store_true", help="Write the intermediate HTML to dist/.cache")
+    parser.add_argument("--image-dpi", type=int, default=DEFAULT_IMAGE_DPI, help="Print resolution images are downscaled to")
+    parser.add_argument("--no-optimize-images", action="store_true", help="Render with the original images")
+    parser.add_argument("--renderer", choices=["auto", *RENDERERS], default="auto", help="How pandoc/weasyprint run")
+    parser.add_argument("--stop-renderers", action="store_true", help="Remove the warm renderer containers")
+    parser.add_argument(
+        "--fake-runtime", action="store_true",
+        help=f"Simulate docker/pandoc/weasyprint (offline testing; builds go to {FAKE_OUTPUT_DIR}/)",
+    )
+    parser.add_argument("--watch", action="store_true", help="After building, rebuild affected stages on changes")
+    parser.add_argument("--poll", action="store_true", help="Watch by polling instead of inotify")
+    parser.add_argument("--trace", action="store_true", help="Time every stage; write a trace and compare with history")
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.image_dpi < 1:
+        parser.error("--image-dpi must be positive")
 
     project_root = Path(__file__).resolve().parent.parent
     incentives_dir = project_root / "incentives"
+    output_dir = FAKE_OUTPUT_DIR if args.fake_runtime else OUTPUT_DIR
+    manifest = BuildManifest(project_root / output_dir / "build-manifest.json", project_root)
+    if args.fake_runtime:
+        runtime = FakeRuntime(project_root, local_tools=tuple(TOOL_IMAGES) if args.renderer == "local" else ())
+    else:
+        runtime = Runtime()
+
+    if args.stop_renderers:
+        WarmDockerRenderer(runtime, project_root).stop()
+        return
+    renderer = select_renderer(args.renderer, runtime, project_root)
 
     if args.all:
         # Build all incentives
-        for incentive_path in sorted(incentives_dir.iterdir()):
-            if incentive_path.is_dir() and (incentive_path / "content.md").exists():
-                build_incentive(incentive_path.name, project_root)
+        names = [
+            incentive_path.name
+            for incentive_path in sorted(incentives_dir.iterdir())
+            if incentive_path.is_dir() and (incentive_path / "content.md").exists()
+        ]
     elif args.name:
-        build_incentive(args.name, project_root)
+        names = [args.name]
     else:
         parser.print_help()
         sys.exit(1)
 
+    options = BuildOptions(
+        force=args.force,
+        explain=args.explain,
+        keep_html=args.keep_html,
+        image_dpi=None if args.no_optimize_images else args.image_dpi,
+        output_dir=output_dir,
+    )
+    tracer = Tracer() if args.trace else None
+    failures = build_many({name: options for name in names}, project_root, manifest, renderer, args.jobs, tracer)
+    if tracer is not None:
+        report_trace(tracer, names, project_root, renderer, args.jobs, output_dir)
+    if args.watch:
+        # --force applies to the first build only; later ones go by the manifest
+        watch(None if args.all else names, project_root, manifest, renderer,
+              dataclasses.replace(options, force=False), args.jobs, args.poll)
+    elif failures:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+"""Offline tests for build_incentive.py's renderers, driven by FakeRuntime.
+
+Run with:  uv run --with pytest pytest scripts/tests
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "build_incentive.py"
+
+
+def load_script():
+    """Import build_incentive.py, which lives outside any package."""
+    spec = importlib.util.spec_from_file_location("build_incentive", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+bi = load_script()
+TOOLS = tuple(bi.TOOL_IMAGES)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """A project root with one incentive, `demo`, and the stylesheet."""
+    css = tmp_path / bi.CSS_FILE
+    css.parent.mkdir(parents=True)
+    css.write_text("body { margin: 0 }\n")
+    incentive = tmp_path / "incentives" / "demo"
+    incentive.mkdir(parents=True)
+    (incentive / "content.md").write_text("# Demo\n\nSome text.\n")
+    return tmp_path
+
+
+def build(project: Path, renderer, **options) -> list[str]:
+    """Build `demo` with a fresh manifest handle; return the lines it printed."""
+    manifest = bi.BuildManifest(project / bi.OUTPUT_DIR / "build-manifest.json", project)
+    log = bi.BuildLog("demo", buffered=True)
+    bi.build_incentive("demo", project, manifest, renderer, log, bi.BuildOptions(**options))
+    return [line.removeprefix(log.prefix) for line in log.lines]
+
+
+def docker(runtime, *prefix: str) -> list[list[str]]:
+    """The docker commands run so far that start with `prefix`."""
+    return [cmd for cmd in runtime.commands if cmd[:len(prefix) + 1] == ["docker", *prefix]]
+
+
+# === RENDERER SELECTION ===
+
+
+def test_auto_prefers_local_binaries(project):
+    runtime = bi.FakeRuntime(project, local_tools=TOOLS)
+    assert isinstance(bi.select_renderer("auto", runtime, project), bi.LocalRenderer)
+
+
+def test_auto_falls_back_to_docker_without_both_binaries(project):
+    runtime = bi.FakeRuntime(project, local_tools=("pandoc",))
+    renderer = bi.select_renderer("auto", runtime, project)
+    assert type(renderer) is bi.DockerRenderer
+
+
+def test_explicit_renderers(project):
+    runtime = bi.FakeRuntime(project, local_tools=TOOLS)
+    assert type(bi.select_renderer("docker", runtime, project)) is bi.DockerRenderer
+    assert type(bi.select_renderer("warm", runtime, project)) is bi.WarmDockerRenderer
+    assert type(bi.select_renderer("local", runtime, project)) is bi.LocalRenderer
+
+
+def test_local_without_binaries_exits(project):
+    with pytest.raises(SystemExit):
+        bi.select_renderer("local", bi.FakeRuntime(project), project)
+
+
+def test_renderers_build_the_pdf(project):
+    for kind, local_tools in (("docker", ()), ("warm", ()), ("local", TOOLS)):
+        runtime = bi.FakeRuntime(project, local_tools=local_tools)
+        lines = build(project, bi.select_renderer(kind, runtime, project), force=True)
+        assert any(line.startswith("Built: dist/incentives/demo/content.pdf") for line in lines), kind
+        assert (project / "dist/incentives/demo/content.pdf").read_bytes().startswith(b"%PDF")
+
+
+def test_local_renderer_runs_binaries_on_host_paths(project):
+    runtime = bi.FakeRuntime(project, local_tools=TOOLS)
+    build(project, bi.LocalRenderer(runtime, project))
+    tools = [cmd for cmd in runtime.commands if cmd[0].startswith("/fake/bin/") and "--version" not in cmd]
+    assert [Path(cmd[0]).name for cmd in tools] == ["pandoc", "weasyprint"]
+    assert str(project / "incentives/demo/content.md") in tools[0]
+    assert not any(cmd[0] == "docker" for cmd in runtime.commands)
+
+
+# === WARM CONTAINERS ===
+
+
+def test_warm_starts_each_container_once_per_build(project):
+    runtime = bi.FakeRuntime(project)
+    renderer = bi.WarmDockerRenderer(runtime, project)
+    build(project, renderer)
+    assert len(docker(runtime, "run", "-d")) == 2
+    assert set(runtime.containers) == set(renderer.containers.values())
+    # pandoc writes to the pipe; weasyprint reads the HTML from it
+    assert [cmd[2:4] for cmd in docker(runtime, "exec")] == [
+        [renderer.containers["pandoc"], "pandoc"],
+        ["-i", renderer.containers["weasyprint"]],
+    ]
+
+
+def test_warm_reuses_running_containers_across_builds(project):
+    runtime = bi.FakeRuntime(project)
+    build(project, bi.WarmDockerRenderer(runtime, project))
+    runtime.commands.clear()
+    # A later build is a new process: a new renderer finding the containers running
+    build(project, bi.WarmDockerRenderer(runtime, project), force=True)
+    assert docker(runtime, "run") == []
+    assert docker(runtime, "rm") == []
+    assert len(docker(runtime, "exec")) == 2
+
+
+def test_warm_restarts_a_stopped_container(project):
+    runtime = bi.FakeRuntime(project)
+    renderer = bi.WarmDockerRenderer(runtime, project)
+    build(project, renderer)
+    del runtime.containers[renderer.containers["weasyprint"]]
+    runtime.commands.clear()
+    build(project, bi.WarmDockerRenderer(runtime, project), force=True)
+    started = docker(runtime, "run", "-d")
+    assert len(started) == 1 and bi.WEASYPRINT_IMAGE in started[0]
+
+
+def test_warm_replaces_a_container_when_its_image_changes(project):
+    runtime = bi.FakeRuntime(project)
+    renderer = bi.WarmDockerRenderer(runtime, project)
+    build(project, renderer)
+    runtime.image_ids[bi.PANDOC_IMAGE] = "sha256:pandoc-updated"
+    runtime.commands.clear()
+    build(project, bi.WarmDockerRenderer(runtime, project), force=True)
+    pandoc = renderer.containers["pandoc"]
+    assert runtime.containers[pandoc] == "sha256:pandoc-updated"
+    assert docker(runtime, "rm") == [["docker", "rm", "-f", pandoc]]
+
+
+def test_stop_renderers_removes_the_containers(project, capsys):
+    runtime = bi.FakeRuntime(project)
+    build(project, bi.WarmDockerRenderer(runtime, project))
+    bi.WarmDockerRenderer(runtime, project).stop()
+    assert runtime.containers == {}
+    assert capsys.readouterr().out.count("Stopped: ") == 2
+
+
+# === TOOL IDENTITY AND THE MANIFEST ===
+
+
+def test_unchanged_tools_leave_the_build_up_to_date(project):
+    runtime = bi.FakeRuntime(project)
+    build(project, bi.DockerRenderer(runtime, project))
+    assert "Up to date: demo" in build(project, bi.DockerRenderer(runtime, project))
+
+
+# The pandoc ID reaches the PDF stage through the hash of the HTML inputs
+@pytest.mark.parametrize(
+    "image, reason", [(bi.PANDOC_IMAGE, "changed html"), (bi.WEASYPRINT_IMAGE, "changed weasyprint")]
+)
+def test_a_new_image_invalidates_the_pdf(project, image, reason):
+    runtime = bi.FakeRuntime(project)
+    build(project, bi.DockerRenderer(runtime, project))
+    runtime.image_ids[image] = "sha256:updated"
+    lines = build(project, bi.DockerRenderer(runtime, project), explain=True)
+    assert f"  pdf: rebuild ({reason})" in lines
+    assert "Up to date: demo" not in lines
+
+
+def test_a_new_local_binary_version_invalidates_the_pdf(project):
+    runtime = bi.FakeRuntime(project, local_tools=TOOLS)
+    build(project, bi.LocalRenderer(runtime, project))
+    runtime.versions["weasyprint"] = "0.1-fake"
+    lines = build(project, bi.LocalRenderer(runtime, project), explain=True)
+    assert "  pdf: rebuild (changed weasyprint)" in lines
+
+
+def test_switching_renderers_invalidates_the_pdf(project):
+    runtime = bi.FakeRuntime(project, local_tools=TOOLS)
+    build(project, bi.DockerRenderer(runtime, project))
+    lines = build(project, bi.LocalRenderer(runtime, project), explain=True)
+    assert "  pdf: rebuild (changed html; changed weasyprint)" in lines
+
+
+# === PIPE FAILURES ===
+
+
+@pytest.mark.parametrize("kind", ["docker", "warm", "local"])
+@pytest.mark.parametrize("tool, code", [("pandoc", 2), ("weasyprint", 3)])
+def test_pipe_failure_names_the_failing_step(project, kind, tool, code):
+    runtime = bi.FakeRuntime(project, local_tools=TOOLS if kind == "local" else (), exit_codes={tool: code})
+    with pytest.raises(bi.BuildError, match=f"^{tool} failed with exit code {code}$"):
+        build(project, bi.select_renderer(kind, runtime, project))
+    manifest = bi.BuildManifest(project / bi.OUTPUT_DIR / "build-manifest.json", project)
+    assert manifest.stale_reasons("demo", "pdf", {}, []) == ["never built"]
+
+
+@pytest.mark.parametrize(
+    "producer, consumer, message",
+    [
+        (["sh", "-c", "echo html; exit 4"], ["cat"], "pandoc failed with exit code 4"),
+        (["echo", "html"], ["sh", "-c", "cat >/dev/null; exit 5"], "weasyprint failed with exit code 5"),
+        (["sh", "-c", "exit 6"], ["sh", "-c", "cat >/dev/null; exit 7"], "pandoc failed with exit code 6"),
+    ],
+)
+def test_real_pipe_reports_the_failing_side(producer, consumer, message):
+    log = bi.BuildLog("demo", buffered=True)
+    with pytest.raises(bi.BuildError, match=f"^{message}$"):
+        bi.run_pipe(bi.Runtime(), producer, consumer, log, ("pandoc", "weasyprint"))